@@ -0,0 +1,3 @@
+"""
+Peering Buddy - benchmark suite.
+"""
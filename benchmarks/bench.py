@@ -0,0 +1,355 @@
+"""
+Peering Buddy - benchmark of the PBuddy hot paths, end to end and per stage.
+
+Every case runs peering_buddy main() in a fresh process (clean memo and peak
+RSS) against synthetic payloads served by a local transport, and records
+wall time, CPU time, peak RSS and the time spent per stage:
+
+    fetch:     HTTP client and transport, fixtures building excluded.
+    fixtures:  building the synthetic payloads.
+    parse:     JSON decoding (json.loads and the streamed iter_json).
+    render:    printing the results.
+    aggregate: everything else (PBuddy logic, summaries).
+
+usage: python -m benchmarks.bench [-s SIZE] [-c CASES] [-r REPEAT] [-w WORKERS] [-o FILE] [-b BASELINE]
+"""
+
+# pylint: disable=too-many-locals
+
+import argparse
+import functools
+import json
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import types
+from datetime import UTC, datetime
+from unittest import mock
+
+import pbuddy.jsonstream
+import pbuddy.pbuddy
+import peering_buddy
+from benchmarks.fixtures import ASN, SIZES, Fixtures, StubTransport
+
+# Case name: peering_buddy arguments ({upstream} being an ASN upstream).
+CASES = {
+    "pa": ["-pa", str(ASN), "3", "n"],
+    "pa-np": ["-np", "-pa", str(ASN), "3", "n"],
+    "tu": ["-tu", str(ASN)],
+    "ac": ["-ac", str(ASN)],
+    "ag": ["-ag", str(ASN), "{upstream}"],
+    "ap": ["-ap", str(ASN)],
+    "av": ["-av", str(ASN)],
+    "ai": ["-ai", str(ASN)],
+}
+DEFAULT_CASES = ["pa", "tu", "ac", "ag", "ap", "av", "ai"]
+
+
+class Stages:
+    """
+    Time spent per stage, added up over calls (and threads).
+
+    Attributes:
+        seconds (dict): Seconds per stage.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty Stages object.
+
+        Returns:
+            None
+        """
+        self.seconds = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        """
+        Add time to a stage.
+
+        Args:
+            stage (str): The stage name.
+            seconds (float): The time spent.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def timed(self, stage, func):
+        """
+        Wrap a function, its calls being added to a stage.
+
+        Args:
+            stage (str): The stage name.
+            func (callable): The function.
+
+        Returns:
+            callable: The timed function.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def timed_iter(self, stage, func):
+        """
+        Wrap a generator function, every step being added to a stage.
+
+        Args:
+            stage (str): The stage name.
+            func (callable): The generator function.
+
+        Returns:
+            callable: The timed generator function.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            iterator = func(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+                yield item
+
+        return wrapper
+
+
+class Sink:
+    """
+    Output stream counting and dropping what is written.
+
+    Attributes:
+        size (int): Characters written.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty Sink object.
+
+        Returns:
+            None
+        """
+        self.size = 0
+
+    def write(self, text):
+        """
+        Count written text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The text length.
+        """
+        self.size += len(text)
+        return len(text)
+
+    def flush(self):
+        """
+        Nothing to flush.
+
+        Returns:
+            None
+        """
+
+
+def run_case(case, size, workers):
+    """
+    Run a case in this process.
+
+    Args:
+        case (str): The case name (CASES key).
+        size (str): The fixture size (SIZES key).
+        workers (int): PBuddy concurrent workers.
+
+    Returns:
+        dict: The case measures.
+    """
+    fixtures = Fixtures(SIZES[size])
+    transport = StubTransport(fixtures)
+    stages = Stages()
+    sink = Sink()
+
+    class BenchPBuddy(pbuddy.pbuddy.PBuddy):
+        """
+        PBuddy served by the stub transport, without cache nor rate limits.
+        """
+
+        def __init__(self, *args, **kwargs):
+            kwargs["cache"] = False
+            super().__init__(*args, **kwargs)
+            self.http.adapter = transport
+            self.http.limiter = None
+            self.http.fetch = stages.timed("fetch", self.http.fetch)
+
+    timed_json = types.SimpleNamespace(**vars(json))
+    timed_json.loads = stages.timed("parse", json.loads)
+    pbuddy.pbuddy.json = timed_json
+    pbuddy.jsonstream.iter_json = stages.timed_iter(
+        "parse", pbuddy.jsonstream.iter_json
+    )
+    pbuddy.pbuddy.PBuddy = BenchPBuddy
+    # print() of the CLI module only, as the rendering stage.
+    render = stages.timed("render", functools.partial(print, file=sink))
+    args = [arg.format(upstream=fixtures.upstreams[0]) for arg in CASES[case]]
+    sys.argv = ["peering_buddy.py", "-nc", "-w", str(workers)] + args
+
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start, start_cpu = time.perf_counter(), time.process_time()
+    code = 0
+    try:
+        with mock.patch("peering_buddy.print", render, create=True):
+            peering_buddy.main()
+    except SystemExit as error:
+        code = error.code
+    wall, cpu = time.perf_counter() - start, time.process_time() - start_cpu
+
+    seconds = stages.seconds
+    measured = {
+        "fetch": seconds.get("fetch", 0.0) - transport.seconds,
+        "fixtures": transport.seconds,
+        "parse": seconds.get("parse", 0.0),
+        "render": seconds.get("render", 0.0),
+    }
+    measured["aggregate"] = max(0.0, wall - sum(measured.values()))
+    return {
+        "args": args,
+        "exit": code,
+        "wall": round(wall, 4),
+        "cpu": round(cpu, 4),
+        "start_rss_kb": start_rss,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "requests": transport.served,
+        "output_chars": sink.size,
+        "stages": {stage: round(value, 4) for stage, value in measured.items()},
+    }
+
+
+def spawn_case(case, size, workers):
+    """
+    Run a case in a fresh process.
+
+    Args:
+        case (str): The case name (CASES key).
+        size (str): The fixture size (SIZES key).
+        workers (int): PBuddy concurrent workers.
+
+    Returns:
+        dict: The case measures.
+    """
+    child = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench", "--child", case, "-s", size]
+        + ["-w", str(workers)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(child.stdout.splitlines()[-1])
+
+
+def git_commit():
+    """
+    Return the benchmarked commit.
+
+    Returns:
+        str: The git HEAD commit, None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """
+    Run the benchmark cases, print a summary and keep the results as JSON.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Peering Buddy benchmark.")
+    parser.add_argument("-s", "--size", choices=SIZES, default="realistic")
+    parser.add_argument(
+        "-c", "--cases", default=",".join(DEFAULT_CASES), help="Comma separated cases."
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Best of N runs.")
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("-o", "--output", metavar="FILE", help="Write results as JSON.")
+    parser.add_argument(
+        "-b", "--baseline", metavar="FILE", help="Compare with previous results."
+    )
+    parser.add_argument("--child", choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        result = run_case(args.child, args.size, args.workers)
+        sys.stdout.write(json.dumps(result) + "\n")
+        return
+
+    cases = args.cases.split(",")
+    for case in cases:
+        if case not in CASES:
+            parser.error(f"unknown case {case}, pick among {','.join(CASES)}")
+    baseline = {}
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["cases"]
+    results = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "size": args.size,
+        "fixture": SIZES[args.size],
+        "workers": args.workers,
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    header = "case", "wall", "cpu", "rss MB", "fetch", "parse", "aggregate", "render"
+    print(("{:<8}" + "{:>10}" * 7).format(*header))
+    for case in cases:
+        runs = [spawn_case(case, args.size, args.workers) for _ in range(args.repeat)]
+        result = min(runs, key=lambda run: run["wall"])
+        results["cases"][case] = result
+        stages = result["stages"]
+        line = ("{:<8}" + "{:>10.3f}" * 2 + "{:>10.1f}" + "{:>10.3f}" * 4).format(
+            case,
+            result["wall"],
+            result["cpu"],
+            result["peak_rss_kb"] / 1024,
+            stages["fetch"],
+            stages["parse"],
+            stages["aggregate"],
+            stages["render"],
+        )
+        if case in baseline:
+            line += f"  x{result['wall'] / baseline[case]['wall']:.2f} wall"
+        print(line, flush=True)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=4)
+
+
+if __name__ == "__main__":
+    main()
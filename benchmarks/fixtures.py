@@ -0,0 +1,261 @@
+"""
+Peering Buddy - synthetic RIPEstat/BGPView/IPInfo/PeeringDB payloads served
+through a local requests transport.
+"""
+
+# pylint: disable=too-many-return-statements, too-many-arguments, too-many-positional-arguments
+
+import io
+import json
+import random
+import threading
+import time
+import zlib
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+# Fixture size: prefixes announced by the ASN, RIS peers seeing each prefix,
+# RIS collectors (RRCs) and distinct transit ASNs on the paths.
+SIZES = {
+    "small": {"prefixes": 50, "peers": 60, "rrcs": 5, "transits": 50},
+    "realistic": {"prefixes": 500, "peers": 300, "rrcs": 25, "transits": 400},
+    "extreme": {"prefixes": 5000, "peers": 1200, "rrcs": 25, "transits": 2000},
+}
+
+ASN = 64500
+
+
+class Fixtures:
+    """
+    Deterministic synthetic provider payloads for an ASN.
+
+    Looking glass peers are encoded once (a pool per collector) and every
+    prefix answer is assembled from a seeded sample of them, so building an
+    answer costs little next to what PBuddy does with it.
+
+    Attributes:
+        size (dict): The SIZES entry.
+        asn (int): The benchmarked ASN.
+        prefixes (list): The ASN announced prefixes.
+        upstreams (list): The ASN upstreams (direct ASNs on part of the paths).
+    """
+
+    def __init__(self, size, asn=ASN, seed=1):
+        """
+        Initialize the Fixtures object.
+
+        Args:
+            size (dict): The SIZES entry.
+            asn (int): The benchmarked ASN.
+            seed (int): Random seed.
+
+        Returns:
+            None
+        """
+        self.size = size
+        self.asn = asn
+        self.seed = seed
+        rnd = random.Random(seed)
+        self.prefixes = [
+            f"{10 + i // 65536}.{i // 256 % 256}.{i % 256}.0/24"
+            for i in range(size["prefixes"])
+        ]
+        transits = rnd.sample(range(100, 60000), size["transits"])
+        self.upstreams = transits[:8]
+        self.peers = []
+        for rrc in range(size["rrcs"]):
+            pool = []
+            for peer in range(max(1, size["peers"] // size["rrcs"]) * 2):
+                hops = [rnd.randint(1, 65000)]
+                hops += rnd.sample(transits, rnd.randint(0, 3))
+                hops.append(rnd.choice(self.upstreams))
+                hops += [asn] * rnd.choice((1, 1, 1, 2, 3))
+                pool.append(
+                    json.dumps(
+                        {
+                            "asn_origin": str(asn),
+                            "as_path": " ".join(map(str, hops)),
+                            "community": f"{hops[0]}:100 {hops[0]}:{rrc}",
+                            "last_updated": "2024-01-01T00:00:00",
+                            "peer": f"192.0.{rrc}.{peer % 256}",
+                            "origin": "IGP",
+                            "next_hop": f"192.0.{rrc}.{peer % 256}",
+                        }
+                    ).encode()
+                )
+            self.peers.append(pool)
+
+    def looking_glass(self, pfx):
+        """
+        Return the RIPEstat looking-glass answer for a prefix.
+
+        Args:
+            pfx (str): The prefix.
+
+        Returns:
+            bytes: The JSON payload.
+        """
+        rnd = random.Random(zlib.crc32(pfx.encode()) ^ self.seed)
+        per_rrc = max(1, self.size["peers"] // self.size["rrcs"])
+        rrcs = []
+        for rrc, pool in enumerate(self.peers):
+            head = json.dumps({"rrc": f"RRC{rrc:02d}", "location": f"Location {rrc}"})
+            peers = b",".join(rnd.sample(pool, per_rrc))
+            rrcs.append(head[:-1].encode() + b', "peers": [' + peers + b"]}")
+        return b'{"data": {"rrcs": [' + b",".join(rrcs) + b"]}}"
+
+    def payload(self, url):
+        """
+        Return the payload of a provider URL.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            object: bytes or a JSON serializable object, None for unknown URLs.
+        """
+        parts = urlsplit(url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        resource = unquote(query.get("resource", ""))
+        if parts.netloc == "stat.ripe.net":
+            if "/looking-glass/" in parts.path:
+                return self.looking_glass(resource)
+            if "/announced-prefixes/" in parts.path:
+                return {"data": {"prefixes": [{"prefix": p} for p in self.prefixes]}}
+            if "/routing-status/" in parts.path:
+                visibility = {"ris_peers_seeing": 300, "total_ris_peers": 320}
+                return {"data": {"visibility": {"v4": visibility, "v6": visibility}}}
+            if "/rpki-validation/" in parts.path:
+                validity = "valid" if zlib.crc32(url.encode()) % 4 else "unknown"
+                return {"data": {"validating_roas": [{"validity": validity}]}}
+            if "/as-routing-consistency/" in parts.path:
+                prefixes = [
+                    {
+                        "prefix": pfx,
+                        "in_bgp": True,
+                        "in_whois": i % 10 != 0,
+                        "irr_sources": "RIPE" if i % 7 else "-",
+                    }
+                    for i, pfx in enumerate(self.prefixes)
+                ]
+                return {"data": {"prefixes": prefixes}}
+        if parts.netloc == "api.bgpview.io":
+            if parts.path.endswith("/upstreams"):
+                upstreams = [{"asn": asn} for asn in self.upstreams]
+                return {
+                    "data": {"ipv4_upstreams": upstreams, "ipv6_upstreams": upstreams}
+                }
+            if parts.path.startswith("/prefix/"):
+                found = zlib.crc32(parts.path.encode()) % 2
+                return {"data": {"asns": [{"asn": self.asn}] if found else []}}
+        if parts.netloc == "ipinfo.io":
+            return {"org": f"AS{self.asn} Benchmark Networks"}
+        if parts.netloc == "www.peeringdb.com" and parts.path == "/api/net":
+            return {"data": [self.pdb_net()]}
+        return None
+
+    def pdb_net(self):
+        """
+        Return a PeeringDB net object of the ASN.
+
+        Returns:
+            dict: The net object.
+        """
+        return {
+            "id": 1,
+            "name": "Benchmark Networks",
+            "aka": "",
+            "website": "https://example.net",
+            "asn": self.asn,
+            "looking_glass": "",
+            "route_server": "",
+            "irr_as_set": f"AS{self.asn}:AS-CUSTOMERS",
+            "info_type": "NSP",
+            "info_prefixes4": len(self.prefixes),
+            "info_prefixes6": 0,
+            "info_traffic": "",
+            "info_ratio": "Balanced",
+            "info_scope": "Global",
+            "info_unicast": True,
+            "info_multicast": False,
+            "info_ipv6": True,
+            "info_never_via_route_servers": False,
+            "notes": "",
+            "policy_url": "",
+            "policy_general": "Open",
+            "policy_locations": "Not Required",
+            "policy_ratio": False,
+            "policy_contracts": "Not Required",
+        }
+
+
+class StubTransport(BaseAdapter):
+    """
+    requests transport answering from Fixtures, without network.
+
+    Attributes:
+        fixtures (Fixtures): The payloads.
+        served (int): Requests answered.
+        seconds (float): Time spent building payloads.
+    """
+
+    def __init__(self, fixtures):
+        """
+        Initialize the StubTransport object.
+
+        Args:
+            fixtures (Fixtures): The payloads.
+
+        Returns:
+            None
+        """
+        super().__init__()
+        self.fixtures = fixtures
+        self.served = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        """
+        Answer a prepared request.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            stream (bool): Ignored, bodies are in memory.
+            timeout (tuple): Ignored.
+            verify (bool): Ignored.
+            cert (str): Ignored.
+            proxies (dict): Ignored.
+
+        Returns:
+            requests.Response: The response.
+        """
+        start = time.perf_counter()
+        body = self.fixtures.payload(request.url)
+        response = requests.Response()
+        response.status_code = 404 if body is None else 200
+        if body is None:
+            body = {}
+        response.raw = io.BytesIO(
+            body if isinstance(body, bytes) else json.dumps(body).encode()
+        )
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        with self.lock:
+            self.served += 1
+            self.seconds += time.perf_counter() - start
+        return response
+
+    def close(self):
+        """
+        Close the transport (nothing to release).
+
+        Returns:
+            None
+        """
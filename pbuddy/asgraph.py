@@ -0,0 +1,437 @@
+"""
+Peering Buddy - AS adjacency graph built from observed AS paths.
+"""
+
+from array import array
+from collections import Counter
+from itertools import chain, islice, repeat
+from operator import add, mul
+
+from pbuddy.config import GRAPH_BATCH
+
+
+def parse_hops(aspaths):
+    """
+    Parse AS path hops.
+
+    Args:
+        aspaths (str): AS paths hops, separated by spaces.
+
+    Returns:
+        array: The hops, or None when a token is not a 32 bits ASN.
+    """
+    try:
+        return array("I", map(int, aspaths.split()))
+    except (ValueError, OverflowError):
+        return None
+
+
+def count_edges(counts):
+    """
+    Count the observations of each AS adjacency, and collect the ASNs seen.
+
+    Paths are parsed GRAPH_BATCH observations at a time, joined with a " 0 "
+    separator (AS0 never shows up on valid paths, RFC 7607), and their hop
+    pairs counted as integer keys, prepends, path boundaries and both
+    directions of an adjacency being sorted out once per distinct pair
+    afterwards.
+
+    Args:
+        counts (dict): Observations per AS path (hops separated by spaces).
+
+    Returns:
+        tuple: (ASNs seen, Counter of observations per (lower ASN, higher
+            ASN) adjacency), ASNs of single hop paths included.
+    """
+    pairs = Counter()
+    asns = set()
+    observations = chain.from_iterable(map(repeat, counts, counts.values()))
+    while batch := list(islice(observations, GRAPH_BATCH)):
+        hops = parse_hops(" 0 ".join(batch))
+        if hops is None:
+            hops = parse_hops(
+                " 0 ".join(filter(lambda x: parse_hops(x) is not None, batch))
+            )
+        pairs.update(map(add, map(mul, hops, repeat(1 << 32)), islice(hops, 1, None)))
+        # Every hop is on a pair, but the one of a single hop batch.
+        asns.update(hops[:1])
+    edges = Counter()
+    for key, weight in pairs.items():
+        left, right = divmod(key, 1 << 32)
+        asns.add(left)
+        asns.add(right)
+        if left != right and left and right:
+            edges[(left, right) if left < right else (right, left)] += weight
+    asns.discard(0)
+    return asns, edges
+
+
+class AsGraph:
+    """
+    Compact (CSR) AS adjacency graph.
+
+    Two ASNs are adjacent when they are next to each other on an observed AS
+    path (prepends collapsed), the edge weight being the number of
+    observations. Adjacency is undirected and stored in compressed sparse
+    row form: the neighbours of the node i are indices[indptr[i]:indptr[i + 1]],
+    heaviest edges first. Every ASN observed is a node, the ones only seen
+    alone on a path (prepends included) having no neighbours. Paths holding
+    tokens that are not plain ASNs (e.g. AS_SETs "{65001,65002}") are left
+    out.
+
+    Attributes:
+        asns (array): Node ASNs, sorted.
+        index (dict): Node index of each ASN.
+        indptr (array): Start of each node row on indices, plus the end of the last one.
+        indices (array): Neighbour node indices, row after row.
+        weights (array): Observations of each edge, along indices.
+    """
+
+    def __init__(self, asns, indptr, indices, weights):
+        """
+        Initialize the AsGraph object.
+
+        Args:
+            asns (array): Node ASNs, sorted.
+            indptr (array): Row offsets on indices.
+            indices (array): Neighbour node indices.
+            weights (array): Edge observations.
+
+        Returns:
+            None
+        """
+        self.asns = asns
+        self.index = {asn: node for node, asn in enumerate(asns)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    @classmethod
+    def from_counts(cls, counts):
+        """
+        Build the graph from AS paths and their number of observations.
+
+        Args:
+            counts (dict): Observations per AS path (hops separated by spaces).
+
+        Returns:
+            AsGraph: The graph.
+        """
+        seen, edges = count_edges(counts)
+        asns = array("I", sorted(seen))
+        index = {asn: node for node, asn in enumerate(asns)}
+        rows = [[] for _ in asns]
+        for (left, right), weight in edges.items():
+            rows[index[left]].append((-weight, index[right]))
+            rows[index[right]].append((-weight, index[left]))
+        indptr = array("I", [0])
+        indices = array("I")
+        weights = array("Q")
+        for row in rows:
+            row.sort()
+            indices.extend(node for _, node in row)
+            weights.extend(-weight for weight, _ in row)
+            indptr.append(len(indices))
+        return cls(asns, indptr, indices, weights)
+
+    @classmethod
+    def from_paths(cls, aspaths):
+        """
+        Build the graph from observed AS paths.
+
+        Args:
+            aspaths (iterable): The AS paths, hops separated by spaces, once per observation.
+
+        Returns:
+            AsGraph: The graph.
+        """
+        return cls.from_counts(Counter(aspaths))
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Build the graph from the observations of an AsPathStore.
+
+        Args:
+            store (AsPathStore): The observed AS paths.
+
+        Returns:
+            AsGraph: The graph.
+        """
+        counts = Counter(store.observed_paths)
+        return cls.from_counts(
+            {store.path(path_id): count for path_id, count in counts.items()}
+        )
+
+    def __len__(self):
+        """
+        Return the number of ASNs.
+
+        Returns:
+            int: The number of nodes.
+        """
+        return len(self.asns)
+
+    def edge_count(self):
+        """
+        Return the number of adjacencies.
+
+        Returns:
+            int: The number of (undirected) edges.
+        """
+        return len(self.indices) // 2
+
+    def node(self, asn):
+        """
+        Return the node index of an ASN.
+
+        Args:
+            asn (int|str): The ASN.
+
+        Returns:
+            int: The node index, or None for ASNs never observed.
+        """
+        return self.index.get(int(asn))
+
+    def neighbours(self, asn):
+        """
+        Return the ASNs observed next to an ASN.
+
+        Args:
+            asn (int|str): The ASN.
+
+        Returns:
+            list: (neighbour ASN, observations) tuples, most observed first.
+        """
+        node = self.node(asn)
+        if node is None:
+            return []
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return list(
+            zip(
+                (self.asns[neighbour] for neighbour in self.indices[start:end]),
+                self.weights[start:end],
+            )
+        )
+
+    def row(self, node):
+        """
+        Return the neighbours of a node.
+
+        Args:
+            node (int): The node index.
+
+        Returns:
+            array: The neighbour node indices, heaviest edges first.
+        """
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end]
+
+    def rows(self):
+        """
+        Return the neighbours of every node, for searches visiting most of them.
+
+        Returns:
+            list: The row() of each node index.
+        """
+        bounds = map(slice, self.indptr, islice(self.indptr, 1, None))
+        return list(map(self.indices.__getitem__, bounds))
+
+    def levels(self, source, rows):
+        """
+        Breadth-first search from a node, level by level.
+
+        Args:
+            source (int): The source node index.
+            rows (list): The rows() of the graph.
+
+        Returns:
+            list: Sets of node indices at distance 0, 1, 2, ... of source.
+        """
+        levels = []
+        seen = {source}
+        frontier = {source}
+        while frontier:
+            levels.append(frontier)
+            reached = set()
+            for node in frontier:
+                reached.update(rows[node])
+            frontier = reached - seen
+            seen |= frontier
+        return levels
+
+    def meet(self, first, last):
+        """
+        Bidirectional breadth-first search, expanding the smaller frontier
+        until both searches meet.
+
+        Args:
+            first (int): The first node index.
+            last (int): The last node index.
+
+        Returns:
+            tuple: (levels from first, levels from last, meeting nodes), the
+                last level of both sides holding the meeting nodes, i.e. the
+                nodes of every shortest path at that distance, or None when
+                the nodes are not connected.
+        """
+        sides = ([{first}], [{last}])
+        distances = ({first: 0}, {last: 0})
+        if first == last:
+            return [{first}], [{last}], {first}
+        while True:
+            side = 0 if len(sides[0][-1]) <= len(sides[1][-1]) else 1
+            levels, distance, other = sides[side], distances[side], distances[1 - side]
+            reached = set()
+            for node in levels[-1]:
+                reached.update(self.row(node))
+            frontier = reached.difference(distance)
+            if not frontier:
+                return None
+            distance.update(dict.fromkeys(frontier, len(levels)))
+            levels.append(frontier)
+            meeting = frontier.intersection(other)
+            if meeting:
+                closest = min(map(other.__getitem__, meeting))
+                meeting = {node for node in meeting if other[node] == closest}
+                # The other side may be a level ahead of the meeting point.
+                ahead = closest + 1
+                del sides[1 - side][ahead:]
+                return sides[0], sides[1], meeting
+
+    def walk_back(self, levels, nodes):
+        """
+        Walk BFS levels back from some nodes of the last level.
+
+        Args:
+            levels (list): BFS levels.
+            nodes (set): Nodes of the last level.
+
+        Returns:
+            list: Sets of the nodes on the shortest paths towards nodes, per level.
+        """
+        walked = [nodes]
+        for level in reversed(levels[:-1]):
+            reached = set()
+            for node in walked[-1]:
+                reached.update(self.row(node))
+            walked.append(level & reached)
+        return walked[::-1]
+
+    def shortest_path(self, source, target):
+        """
+        Return a shortest AS path between two ASNs, the most observed one
+        (highest sum of its adjacency observations) on ties, then the one of
+        the lowest ASNs.
+
+        Args:
+            source (int|str): The first ASN.
+            target (int|str): The last ASN.
+
+        Returns:
+            list: The path ASNs, source and target included (empty when not connected).
+        """
+        first, last = self.node(source), self.node(target)
+        if first is None or last is None:
+            return []
+        found = self.meet(first, last)
+        if found is None:
+            return []
+        from_first, from_last, meeting = found
+        walked = self.walk_back(from_first, meeting)[:-1]
+        walked += self.walk_back(from_last, meeting)[::-1]
+        return [self.asns[node] for node in self.heaviest_path(walked)]
+
+    def heaviest_path(self, walked):
+        """
+        Pick the most observed path across the nodes of every shortest path,
+        the one of the lowest node indices (so ASNs) on ties.
+
+        Args:
+            walked (list): Sets of the nodes on the shortest paths, per level,
+                from the source node alone to the target node alone.
+
+        Returns:
+            list: The path node indices.
+        """
+        # (Heaviest path weight, -previous node) of the nodes of each level.
+        best = [{node: (0, None) for node in walked[0]}]
+        for level in walked[1:]:
+            previous = best[-1]
+            current = {}
+            for node in level:
+                start, end = self.indptr[node], self.indptr[node + 1]
+                current[node] = max(
+                    (previous[neighbour][0] + weight, -neighbour)
+                    for neighbour, weight in zip(
+                        self.indices[start:end], self.weights[start:end]
+                    )
+                    if neighbour in previous
+                )
+            best.append(current)
+        path = list(walked[-1])
+        for level in reversed(best[1:]):
+            path.append(-level[path[-1]][1])
+        return path[::-1]
+
+    def between(self, source, target):
+        """
+        Return the ASNs sitting on any shortest path between two ASNs.
+
+        Args:
+            source (int|str): The first ASN.
+            target (int|str): The last ASN.
+
+        Returns:
+            list: The ASNs in between, closest to source first (then by ASN).
+        """
+        first, last = self.node(source), self.node(target)
+        if first is None or last is None:
+            return []
+        found = self.meet(first, last)
+        if found is None:
+            return []
+        from_first, from_last, meeting = found
+        walked = self.walk_back(from_first, meeting)[:-1]
+        walked += self.walk_back(from_last, meeting)[::-1]
+        result = []
+        for nodes in walked[1:-1]:
+            result.extend(sorted(self.asns[node] for node in nodes))
+        return result
+
+    def betweenness(self, asn):
+        """
+        Rank the ASNs by the share of shortest paths towards an ASN crossing
+        them (single source Brandes dependency), i.e. how much of the observed
+        topology reaches the ASN through each of them.
+
+        Args:
+            asn (int|str): The ASN.
+
+        Returns:
+            list: (ASN, dependency) tuples, highest first, ASNs never crossed left out.
+        """
+        source = self.node(asn)
+        if source is None:
+            return []
+        rows = self.rows()
+        levels = self.levels(source, rows)
+        # Number of shortest paths from source, level after level.
+        paths = [{source: 1}]
+        for level in levels[1:]:
+            previous = paths[-1].get
+            paths.append(
+                {node: sum(map(previous, rows[node], repeat(0))) for node in level}
+            )
+        # Dependencies, back from the farthest level.
+        ranking = []
+        weight = {}
+        for level, counts in zip(reversed(levels[1:]), reversed(paths[1:])):
+            following = weight.get
+            weight = {}
+            for node in level:
+                dependency = counts[node] * sum(map(following, rows[node], repeat(0.0)))
+                if dependency > 0:
+                    ranking.append((self.asns[node], dependency))
+                weight[node] = (1 + dependency) / counts[node]
+        return sorted(ranking, reverse=True, key=lambda x: x[1])
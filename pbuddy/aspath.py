@@ -0,0 +1,554 @@
+"""
+Peering Buddy - compact store of AS paths seen on the RIS looking glass.
+"""
+
+# pylint: disable=too-many-instance-attributes, too-many-locals, too-few-public-methods, import-outside-toplevel
+
+import importlib.util
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from itertools import accumulate, islice
+
+# NumPy is only imported by the NumPy backend functions, importing it takes
+# longer than the whole CLI start up.
+NUMPY_BACKEND = importlib.util.find_spec("numpy") is not None
+
+
+class AsPathStore(Sequence):
+    """
+    Interned AS path store.
+
+    Every distinct AS path is kept once, interned as a string and as integer
+    hops on a flat array("I") buffer delimited by offsets, and each looking
+    glass observation (location, prefix, path) is three integer ids, so a
+    path seen by hundreds of RIS peers costs a single copy. Paths holding
+    tokens that are not plain ASNs (e.g. AS_SETs "{65001,65002}") get no
+    hops.
+
+    The store is a read-only sequence of the (location, " | ", prefix, " | ",
+    path) tuples ripe_bv_pfxs_aspath_length used to build, formatted on
+    access.
+
+    Attributes:
+        hops (array): Hops of all the distinct paths, back to back.
+        offsets (array): Start of each path on hops, plus the end of the last one.
+        paths (list): Interned paths, by path id.
+        raw (set): Ids of the paths not made of ASNs only (no hops).
+        locations (list): Interned locations.
+        prefixes (list): Interned prefixes.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty AsPathStore object.
+
+        Returns:
+            None
+        """
+        self.hops = array("I")
+        self.offsets = array("I", [0])
+        self.paths = []
+        self.raw = set()
+        self.path_ids = {}
+        self.locations = []
+        self.location_ids = {}
+        self.prefixes = []
+        self.prefix_ids = {}
+        self.observed_locations = array("I")
+        self.observed_prefixes = array("I")
+        self.observed_paths = array("I")
+
+    def path_hops(self, path_id):
+        """
+        Return the hops of an interned AS path.
+
+        Args:
+            path_id (int): The path id.
+
+        Returns:
+            array: The path ASNs (empty for paths not made of ASNs only).
+        """
+        start, end = self.offsets[path_id], self.offsets[path_id + 1]
+        return self.hops[start:end]
+
+    def add_hops(self, aspath):
+        """
+        Append the hops of a newly interned AS path to the hops buffer.
+
+        Args:
+            aspath (str): The AS path, hops separated by spaces.
+
+        Returns:
+            None
+        """
+        try:
+            hops = array("I", map(int, aspath.split()))
+            if " ".join(map(str, hops)) != aspath:
+                raise ValueError
+        except (ValueError, OverflowError):
+            hops = array("I")
+            self.raw.add(len(self.offsets) - 1)
+        self.hops.extend(hops)
+        self.offsets.append(len(self.hops))
+
+    def add_path(self, aspath):
+        """
+        Intern an AS path.
+
+        Args:
+            aspath (str): The AS path, hops separated by spaces.
+
+        Returns:
+            int: The path id.
+        """
+        path_id = self.path_ids.get(aspath)
+        if path_id is None:
+            path_id = self.path_ids[aspath] = len(self.paths)
+            self.paths.append(aspath)
+            self.add_hops(aspath)
+        return path_id
+
+    def add(self, location, pfx, aspath):
+        """
+        Record an AS path seen for a prefix on a location.
+
+        Args:
+            location (str): The looking glass location.
+            pfx (str): The prefix.
+            aspath (str): The AS path, hops separated by spaces.
+
+        Returns:
+            None
+        """
+        location_id = self.location_ids.get(location)
+        if location_id is None:
+            location_id = self.location_ids[location] = len(self.locations)
+            self.locations.append(location)
+        prefix_id = self.prefix_ids.get(pfx)
+        if prefix_id is None:
+            prefix_id = self.prefix_ids[pfx] = len(self.prefixes)
+            self.prefixes.append(pfx)
+        self.observed_locations.append(location_id)
+        self.observed_prefixes.append(prefix_id)
+        self.observed_paths.append(self.add_path(aspath))
+
+    def extend(self, observations):
+        """
+        Record many AS paths at once, interning each distinct path once.
+
+        Args:
+            observations (iterable): (location, prefix, AS paths list) tuples.
+
+        Returns:
+            None
+        """
+        aspaths = []
+        for location, pfx, attributes in observations:
+            location_id = self.location_ids.get(location)
+            if location_id is None:
+                location_id = self.location_ids[location] = len(self.locations)
+                self.locations.append(location)
+            prefix_id = self.prefix_ids.get(pfx)
+            if prefix_id is None:
+                prefix_id = self.prefix_ids[pfx] = len(self.prefixes)
+                self.prefixes.append(pfx)
+            self.observed_locations.extend(array("I", [location_id]) * len(attributes))
+            self.observed_prefixes.extend(array("I", [prefix_id]) * len(attributes))
+            aspaths.extend(attributes)
+        self.observed_paths.extend(self.add_paths(aspaths))
+
+    def add_paths(self, aspaths):
+        """
+        Intern many AS paths, parsing the hops of the new ones in one go.
+
+        Args:
+            aspaths (list): The AS paths, hops separated by spaces.
+
+        Returns:
+            array: The path ids.
+        """
+        known = len(self.paths)
+        added = [
+            aspath for aspath in dict.fromkeys(aspaths) if aspath not in self.path_ids
+        ]
+        self.path_ids.update(zip(added, range(known, known + len(added))))
+        self.paths.extend(added)
+        joined = " ".join(filter(None, added))
+        hops = array("I")
+        try:
+            hops = array("I", map(int, joined.split()))
+        except (ValueError, OverflowError):
+            pass
+        if " ".join(map(str, hops)) == joined:
+            # Every new path is plain ASNs, only the offsets are left to add.
+            ends = accumulate(map(len, map(str.split, added)), initial=self.offsets[-1])
+            self.offsets.extend(islice(ends, 1, None))
+            self.hops.extend(hops)
+        else:
+            for aspath in added:
+                self.add_hops(aspath)
+        return array("I", map(self.path_ids.__getitem__, aspaths))
+
+    def path(self, path_id):
+        """
+        Return an interned AS path.
+
+        Args:
+            path_id (int): The path id.
+
+        Returns:
+            str: The AS path, hops separated by spaces.
+        """
+        return self.paths[path_id]
+
+    def entry(self, index):
+        """
+        Return an observation, formatted.
+
+        Args:
+            index (int): The observation index.
+
+        Returns:
+            tuple: (location, " | ", prefix, " | ", AS path).
+        """
+        return (
+            self.locations[self.observed_locations[index]],
+            " | ",
+            self.prefixes[self.observed_prefixes[index]],
+            " | ",
+            self.path(self.observed_paths[index]),
+        )
+
+    def __getitem__(self, index):
+        """
+        Return an observation (or a list of them for a slice), formatted.
+
+        Args:
+            index (int|slice): The observation index.
+
+        Returns:
+            tuple: (location, " | ", prefix, " | ", AS path).
+        """
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("AsPathStore index out of range")
+        return self.entry(index)
+
+    def __len__(self):
+        """
+        Return the number of observations.
+
+        Returns:
+            int: The number of observations.
+        """
+        return len(self.observed_paths)
+
+    def __iter__(self):
+        """
+        Iterate over the observations, formatted.
+
+        Yields:
+            tuple: (location, " | ", prefix, " | ", AS path).
+        """
+        for index in range(len(self)):
+            yield self.entry(index)
+
+
+def aspath_length(observations, threshold, asprepend):
+    """
+    Filter AS paths by length (prepends stripped) and pick their first,
+    second, third and direct (next to the origin) ASNs.
+
+    Args:
+        observations (iterable): (location, prefix, AS paths list) tuples.
+        threshold (int): Minimum AS path length, prepends stripped.
+        asprepend (str): "y" to keep prepends on the returned paths, "n" to strip them.
+
+    The ASN lists start over after a path too short to have the hop (e.g.
+    second ASNs after a 2 hops path), resets tells which lists did so, for
+    callers adding up the results of consecutive runs.
+
+    Returns:
+        tuple: (AsPathStore of the matched paths, first ASNs, second ASNs,
+            third ASNs, direct ASNs, resets as a (first, second, third, direct)
+            tuple of bools).
+    """
+    entries = AsPathStore()
+    first_asn = []
+    second_asn = []
+    third_asn = []
+    direct = []
+    resets = [False] * 4
+    threshold = int(threshold)
+    for location, pfx, attributes in observations:
+        for attribute in attributes:
+            aspathnoprep = list(dict.fromkeys(attribute.split()))
+            apl = len(aspathnoprep)
+            if asprepend == "n":
+                attribute = " ".join(aspathnoprep)
+            if apl >= threshold:
+                if apl <= 0:
+                    first_asn = []
+                    second_asn = []
+                    third_asn = []
+                    direct = []
+                    resets = [True] * 4
+                else:
+                    first_asn.append(aspathnoprep[0])
+                    if apl >= 3:
+                        second_asn.append(aspathnoprep[1])
+                    else:
+                        second_asn = []
+                        resets[1] = True
+                    if apl >= 4:
+                        third_asn.append(aspathnoprep[2])
+                    else:
+                        third_asn = []
+                        resets[2] = True
+                    if apl == 1:
+                        direct.append(aspathnoprep[-1])
+                    else:
+                        direct.append(aspathnoprep[-2])
+                entries.add(location, pfx, attribute)
+    return entries, first_asn, second_asn, third_asn, direct, tuple(resets)
+
+
+class AsPathCounters:
+    """
+    Running counts of aspath_length() results, added up run after run (e.g.
+    prefix after prefix), the ASN counters starting over where the lists do.
+
+    Attributes:
+        locations (Counter): Matched paths per location.
+        first_asn (Counter): First ASNs.
+        second_asn (Counter): Second ASNs.
+        third_asn (Counter): Third ASNs.
+        direct (Counter): Direct ASNs.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty AsPathCounters object.
+
+        Returns:
+            None
+        """
+        self.locations = Counter()
+        self.first_asn = Counter()
+        self.second_asn = Counter()
+        self.third_asn = Counter()
+        self.direct = Counter()
+
+    def update(self, result):
+        """
+        Add up an aspath_length() result.
+
+        Args:
+            result (tuple): The aspath_length() (or aspath_length_numpy()) result.
+
+        Returns:
+            None
+        """
+        entries, *asns, resets = result
+        counters = (self.first_asn, self.second_asn, self.third_asn, self.direct)
+        for counter, values, reset in zip(counters, asns, resets):
+            if reset:
+                counter.clear()
+            counter.update(values)
+        self.locations.update(
+            map(entries.locations.__getitem__, entries.observed_locations)
+        )
+
+
+class TransientCounters:
+    """
+    Running counts of AS paths crossing upstreams on transient paths.
+
+    Attributes:
+        aspaths (Counter): ASNs seen on the transient paths, origin side hops excluded.
+        full_aspaths (Counter): ASNs seen on all the paths.
+        all_locations (Counter): Paths per location.
+        locations (Counter): Transient paths per location.
+        upstreams (dict): Lowest matched upstream of each transient path, in first seen order.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty TransientCounters object.
+
+        Returns:
+            None
+        """
+        self.aspaths = Counter()
+        self.full_aspaths = Counter()
+        self.all_locations = Counter()
+        self.locations = Counter()
+        self.upstreams = {}
+
+    def update(self, entry, match):
+        """
+        Add up an AS path.
+
+        Args:
+            entry (tuple): The (location, " | ", prefix, " | ", AS path) entry.
+            match (list): The upstreams matched on the path, sorted (empty for
+                non transient paths).
+
+        Returns:
+            None
+        """
+        aspath = entry[-1].split()
+        self.full_aspaths.update(aspath)
+        self.all_locations[entry[0]] += 1
+        if match:
+            self.locations[entry[0]] += 1
+            self.upstreams.setdefault(match[0])
+            self.aspaths.update(aspath[:-2])
+
+
+def asn_strings(asns):
+    """
+    Convert an ASN array to a list of strings, converting each distinct ASN once.
+
+    Args:
+        asns (numpy.ndarray): The ASNs.
+
+    Returns:
+        list: The ASNs as strings.
+    """
+    import numpy
+
+    distinct, inverse = numpy.unique(asns, return_inverse=True)
+    names = numpy.array([str(asn) for asn in distinct.tolist()], dtype=object)
+    return names[inverse].tolist()
+
+
+def strip_prepends(store):
+    """
+    Strip prepends (and loops) off every path of a store, keeping the first
+    occurrence of each ASN, with a lexsort on (path, ASN, position).
+
+    Args:
+        store (AsPathStore): The store, with paths made of ASNs only.
+
+    Returns:
+        tuple: (path lengths, stripped hops, stripped path lengths, stripped
+            path offsets), as NumPy arrays.
+    """
+    import numpy
+
+    hops = numpy.frombuffer(store.hops, dtype=f"u{store.hops.itemsize}")
+    offsets = numpy.frombuffer(store.offsets, dtype=f"u{store.offsets.itemsize}")
+    lengths = numpy.diff(offsets.astype(numpy.int64))
+    paths = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    positions = numpy.arange(len(hops)) - numpy.repeat(offsets[:-1], lengths)
+    order = numpy.lexsort((positions, hops, paths))
+    first_seen = numpy.ones(len(hops), dtype=bool)
+    first_seen[1:] = (paths[order][1:] != paths[order][:-1]) | (
+        hops[order][1:] != hops[order][:-1]
+    )
+    keep = numpy.empty(len(hops), dtype=bool)
+    keep[order] = first_seen
+    stripped_lengths = numpy.bincount(paths[keep], minlength=len(lengths))
+    stripped_offsets = numpy.concatenate(([0], numpy.cumsum(stripped_lengths)))
+    return lengths, hops[keep], stripped_lengths, stripped_offsets
+
+
+def aspath_length_numpy(observations, threshold, asprepend):
+    """
+    NumPy version of aspath_length(), same arguments and same result.
+
+    All the distinct paths are handled at once as ragged arrays (the store
+    hops and offsets): prepends are stripped, then lengths, threshold masks
+    and the hops at positions 0/1/2 and -1/-2 are computed in bulk. Runs
+    seeing paths that are not made of ASNs only fall back to aspath_length().
+
+    Args:
+        observations (iterable): (location, prefix, AS paths list) tuples.
+        threshold (int): Minimum AS path length, prepends stripped.
+        asprepend (str): "y" to keep prepends on the returned paths, "n" to strip them.
+
+    Returns:
+        tuple: (AsPathStore of the matched paths, first ASNs, second ASNs,
+            third ASNs, direct ASNs, resets).
+    """
+    import numpy
+
+    store = AsPathStore()
+    store.extend(observations)
+    if store.raw:
+        return aspath_length(
+            (
+                (store.locations[location], store.prefixes[pfx], [store.paths[path]])
+                for location, pfx, path in zip(
+                    store.observed_locations,
+                    store.observed_prefixes,
+                    store.observed_paths,
+                )
+            ),
+            threshold,
+            asprepend,
+        )
+    lengths, stripped, stripped_lengths, stripped_offsets = strip_prepends(store)
+    observed_paths = numpy.frombuffer(
+        store.observed_paths, dtype=f"u{store.observed_paths.itemsize}"
+    )
+    apl = stripped_lengths[observed_paths]
+    matched = numpy.nonzero(apl >= int(threshold))[0]
+    matched_apl = apl[matched]
+
+    def hop_at(position, since):
+        """
+        Return the hops at a stripped path position for the matched paths
+        following the last one shorter than since, and whether there was one.
+        """
+        resets = numpy.nonzero(matched_apl < since)[0]
+        start = resets[-1] + 1 if len(resets) else 0
+        selected = observed_paths[matched[start:]]
+        if position < 0:
+            # Single hop paths are their own direct ASN.
+            position = numpy.maximum(stripped_lengths[selected] + position, 0)
+        return (
+            asn_strings(stripped[stripped_offsets[selected] + position]),
+            len(resets) > 0,
+        )
+
+    first_asn, first_reset = hop_at(0, 1)
+    second_asn, second_reset = hop_at(1, 3)
+    third_asn, third_reset = hop_at(2, 4)
+    direct, _ = hop_at(-2, 1)
+    resets = (first_reset, second_reset, third_reset, first_reset)
+
+    entries = AsPathStore()
+    entries.locations = store.locations
+    entries.location_ids = store.location_ids
+    entries.prefixes = store.prefixes
+    entries.prefix_ids = store.prefix_ids
+    for name in ("observed_locations", "observed_prefixes"):
+        observed = numpy.frombuffer(getattr(store, name), dtype=observed_paths.dtype)
+        getattr(entries, name).frombytes(observed[matched].tobytes())
+    if asprepend == "n":
+        path_map = numpy.zeros(len(lengths), dtype=observed_paths.dtype)
+        used = numpy.unique(observed_paths[matched]).tolist()
+        names = asn_strings(stripped)
+        starts = stripped_offsets.tolist()
+        aspaths = []
+        for path_id, prepended in zip(
+            used, (stripped_lengths[used] != lengths[used]).tolist()
+        ):
+            if prepended:
+                start, end = starts[path_id], starts[path_id + 1]
+                aspaths.append(" ".join(names[start:end]))
+            else:
+                aspaths.append(store.paths[path_id])
+        path_map[used] = entries.add_paths(aspaths)
+        entries.observed_paths.frombytes(path_map[observed_paths[matched]].tobytes())
+    else:
+        for name in ("hops", "offsets", "paths", "raw", "path_ids"):
+            setattr(entries, name, getattr(store, name))
+        entries.observed_paths.frombytes(observed_paths[matched].tobytes())
+    return entries, first_asn, second_asn, third_asn, direct, resets
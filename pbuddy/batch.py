@@ -0,0 +1,121 @@
+"""
+Peering Buddy - multi-ASN batch mode over a pool of worker processes.
+"""
+
+import contextlib
+import io
+import re
+import time
+
+ASN_RE = re.compile(r"^[0-9]{1,10}$")
+
+# Check name: function of (pbuddy, asn) returning a JSON serializable result.
+CHECKS = {
+    "ac": lambda pbuddy, asn: [
+        "".join(map(str, item)) for item in pbuddy.ripe_asn_announces_consistency(asn)
+    ],
+    "ar": lambda pbuddy, asn: {
+        prefix: pbuddy.ripe_vrp_check(asn, prefix)
+        for prefix in pbuddy.ripe_asn_announced_pfx(asn)
+    },
+    "av": lambda pbuddy, asn: pbuddy.ripe_asn_visibility(asn),
+    "ai": lambda pbuddy, asn: pbuddy.pdb_asn_info(asn),
+}
+
+# PBuddy of the worker process, and the ASN its memo holds the results of.
+WORKER = {}
+
+
+def read_asns(source):
+    """
+    Read ASNs, one per line (AS prefix allowed, # comments and blank lines skipped).
+
+    Args:
+        source (file): The opened ASNs file (or stdin).
+
+    Returns:
+        list: The ASNs, as written once stripped, in order, without duplicates.
+    """
+    asns = []
+    for line in source:
+        asn = line.split("#", 1)[0].strip()
+        if asn[:2].upper() == "AS":
+            asn = asn[2:]
+        if asn:
+            asns.append(asn)
+    return list(dict.fromkeys(asns))
+
+
+def init_worker(options):
+    """
+    Create the PBuddy object of a worker process.
+
+    Args:
+        options (dict): PBuddy keyword arguments.
+
+    Returns:
+        None
+    """
+    # Imported here, so the CLI gets CHECKS without importing PBuddy.
+    from pbuddy.pbuddy import PBuddy  # pylint: disable=import-outside-toplevel
+
+    WORKER["pbuddy"] = PBuddy(**options)
+
+
+def run_check(asn, check):
+    """
+    Run a check for an ASN, isolating its failures (the sys.exit() of PBuddy
+    on provider errors, requests errors, unexpected payloads) into the record.
+
+    Args:
+        asn (str): ASN number.
+        check (str): The check name (CHECKS key).
+
+    Returns:
+        dict: {"asn", "check", "result" or "error", "elapsed"} record.
+    """
+    record = {"asn": asn, "check": check}
+    start = time.monotonic()
+    output = io.StringIO()
+    try:
+        if ASN_RE.match(asn) is None:
+            raise ValueError("invalid ASN")
+        if WORKER.get("asn") != asn:
+            # The memo only shares requests between the checks of an ASN,
+            # so it does not grow with the batch.
+            WORKER["pbuddy"].memo.clear()
+            WORKER["asn"] = asn
+        with contextlib.redirect_stdout(output):
+            record["result"] = CHECKS[check](WORKER["pbuddy"], asn)
+    except (SystemExit, OSError, ValueError, LookupError, TypeError) as error:
+        record["error"] = output.getvalue().strip() or repr(error)
+    record["elapsed"] = round(time.monotonic() - start, 3)
+    return record
+
+
+def run_batch(asns, checks, workers, options):
+    """
+    Run the checks for every ASN over a pool of worker processes, sharing the
+    on-disk response cache and rate limiter budget.
+
+    Args:
+        asns (list): ASN numbers.
+        checks (list): Check names (CHECKS keys).
+        workers (int): Number of worker processes.
+        options (dict): PBuddy keyword arguments.
+
+    Yields:
+        dict: One record per ASN and check, as soon as it is done.
+    """
+    # Imported here, so the CLI gets CHECKS without concurrent.futures, which
+    # loads its process pool (multiprocessing) on first use.
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(options,)
+    ) as executor:
+        futures = [
+            executor.submit(run_check, asn, check) for asn in asns for check in checks
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
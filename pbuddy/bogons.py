@@ -0,0 +1,144 @@
+"""
+Peering Buddy - compiled bogon prefix index with bulk membership checks.
+"""
+
+import ipaddress
+import json
+import os
+from bisect import bisect_right
+
+FULLBOGONS = (
+    "https://www.team-cymru.org/Services/Bogons/fullbogons-ipv4.txt",
+    "https://www.team-cymru.org/Services/Bogons/fullbogons-ipv6.txt",
+)
+
+
+def parse_resource(resource):
+    """
+    Parse an IP address or prefix into its version and address range.
+
+    Parameters:
+        resource (str): The IP address or prefix.
+
+    Returns:
+        tuple: (version, first address as int, last address as int).
+    """
+    network = ipaddress.ip_network(resource.strip(), strict=False)
+    return (
+        network.version,
+        int(network.network_address),
+        int(network.broadcast_address),
+    )
+
+
+class BogonIndex:
+    """
+    Bogon prefixes compiled into sorted, merged address intervals per family.
+
+    Membership is a binary search on the interval starts, so checking an IP
+    or prefix costs O(log n) whatever the size of the bogons list.
+
+    Attributes:
+        starts (dict): {version: sorted interval first addresses}.
+        ends (dict): {version: interval last addresses}.
+    """
+
+    def __init__(self, starts=None, ends=None):
+        """
+        Initialize the BogonIndex object.
+
+        Args:
+            starts (dict): {version: sorted interval first addresses}.
+            ends (dict): {version: interval last addresses}.
+
+        Returns:
+            None
+        """
+        self.starts = starts or {4: [], 6: []}
+        self.ends = ends or {4: [], 6: []}
+
+    @classmethod
+    def from_prefixes(cls, prefixes):
+        """
+        Compile a list of bogon prefixes.
+
+        Args:
+            prefixes (list): Bogon prefixes.
+
+        Returns:
+            BogonIndex: The compiled index.
+        """
+        index = cls()
+        for version, first, last in sorted(map(parse_resource, prefixes)):
+            ends = index.ends[version]
+            if ends and first <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], last)
+            else:
+                index.starts[version].append(first)
+                ends.append(last)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a compiled index saved with save().
+
+        Args:
+            path (str): Path to the compiled index.
+
+        Returns:
+            BogonIndex: The compiled index.
+        """
+        with open(path, encoding="utf-8") as indexfile:
+            data = json.load(indexfile)
+        return cls(
+            {int(version): starts for version, starts in data["starts"].items()},
+            {int(version): ends for version, ends in data["ends"].items()},
+        )
+
+    def save(self, path):
+        """
+        Save the compiled index.
+
+        Args:
+            path (str): Path to the compiled index.
+
+        Returns:
+            None
+        """
+        tmp = f"{path}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as indexfile:
+            json.dump({"starts": self.starts, "ends": self.ends}, indexfile)
+        os.replace(tmp, path)
+
+    def contains(self, resource):
+        """
+        Check whether an IP address or prefix is entirely bogon space.
+
+        Args:
+            resource (str): The IP address or prefix.
+
+        Returns:
+            bool: True if the resource is within a bogon prefix.
+        """
+        version, first, last = parse_resource(resource)
+        position = bisect_right(self.starts[version], first) - 1
+        return position >= 0 and last <= self.ends[version][position]
+
+    def classify(self, resources):
+        """
+        Classify many IP addresses or prefixes.
+
+        Args:
+            resources (iterable): IP addresses or prefixes.
+
+        Returns:
+            list: (resource, True/False, or None when not a valid IP/prefix).
+        """
+        result = []
+        for resource in resources:
+            try:
+                result.append((resource, self.contains(resource)))
+            except ValueError:
+                result.append((resource, None))
+        return result
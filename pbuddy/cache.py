@@ -0,0 +1,315 @@
+"""
+Peering Buddy - persistent on-disk cache for provider responses.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pbuddy.config import CACHE_TTL
+from pbuddy.providers import url_provider
+
+STORE_BLOCK_SIZE = 1024 * 1024
+
+
+def normalize_url(url):
+    """
+    Normalize an URL so equivalent requests share the same cache key.
+
+    Parameters:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The URL with lowercase scheme/host and sorted query parameters.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+def cache_ttl(url):
+    """
+    Return the cache TTL for an URL, based on the provider serving it.
+
+    Parameters:
+        url (str): The URL to check.
+
+    Returns:
+        int: The TTL in seconds.
+    """
+    provider = url_provider(url)
+    if provider == "ripe" and "/looking-glass/" in url:
+        provider = "ripe-lg"
+    return CACHE_TTL.get(provider, CACHE_TTL["default"])
+
+
+def cached_response(url, status, body):
+    """
+    Build a requests.Response from a cached body.
+
+    Parameters:
+        url (str): The URL the body was fetched from.
+        status (int): The HTTP status code.
+        body (bytes): The response body.
+
+    Returns:
+        requests.Response: The rebuilt response.
+    """
+    import requests  # pylint: disable=import-outside-toplevel
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.encoding = "utf-8"
+    response._content = body  # pylint: disable=protected-access
+    response._content_consumed = True  # pylint: disable=protected-access
+    return response
+
+
+class CachingReader:
+    """
+    Wrapper around a streamed response raw reader, spooling the body to a
+    temporary file while it is read and storing it on the cache once the
+    whole body went through.
+
+    Attributes:
+        raw (urllib3.response.HTTPResponse): The wrapped raw reader.
+    """
+
+    def __init__(self, cache, url, response, auth=None):
+        """
+        Initialize the CachingReader object.
+
+        Args:
+            cache (ResponseCache): The cache to store the body on.
+            url (str): The requested URL.
+            response (requests.Response): The streamed response.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            None
+        """
+        self.cache = cache
+        self.url = url
+        self.response = response
+        self.auth = auth
+        self.raw = response.raw
+
+    def stream(self, amt=None, decode_content=None):
+        """
+        Yield the body chunks, storing the body on the cache at the end.
+
+        Args:
+            amt (int): Chunk size.
+            decode_content (bool): Whether to decode the content encoding.
+
+        Yields:
+            bytes: Body chunks.
+        """
+        with tempfile.TemporaryFile() as spool:
+            for chunk in self.raw.stream(amt, decode_content=decode_content):
+                spool.write(chunk)
+                yield chunk
+            spool.seek(0)
+            self.cache.store(self.url, self.response, self.auth, body=spool)
+
+    def __getattr__(self, name):
+        """
+        Delegate everything else to the wrapped raw reader.
+
+        Args:
+            name (str): Attribute name.
+
+        Returns:
+            object: The raw reader attribute.
+        """
+        return getattr(self.raw, name)
+
+
+class ResponseCache:
+    """
+    SQLite backed response cache with per-provider TTLs and LRU eviction.
+
+    Attributes:
+        path (str): Path to the SQLite database.
+        max_size (int): Maximum size in bytes of the cached bodies.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        """
+        Initialize the ResponseCache object.
+
+        Args:
+            cache_dir (str): Directory holding the cache database.
+            max_size (int): Maximum size in bytes of the cached bodies.
+
+        Returns:
+            None
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status INTEGER, body BLOB, etag TEXT, "
+                "last_modified TEXT, stored REAL, accessed REAL, size INTEGER)"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed)"
+            )
+
+    def key(self, url, auth=None):
+        """
+        Return the cache key for a request.
+
+        Args:
+            url (str): The requested URL.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            str: The cache key.
+        """
+        key = normalize_url(url)
+        if auth:
+            key = f"{key}|{auth[0]}"
+        return key
+
+    def lookup(self, url, auth=None):
+        """
+        Return the cached entry for a request.
+
+        Args:
+            url (str): The requested URL.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            dict: The entry (response, fresh, etag, last_modified) or None.
+        """
+        key = self.key(url, auth)
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute(
+                "SELECT status, body, etag, last_modified, stored "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+        status, body, etag, last_modified, stored = row
+        return {
+            "response": cached_response(url, status, body),
+            "fresh": now - stored < cache_ttl(url),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def store(self, url, response, auth=None, body=None):
+        """
+        Store a response on the cache, evicting the least recently used ones.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The response to store.
+            auth (tuple): Optional (username, password) used on the request.
+            body (file): Optional spooled body, copied to the cache in blocks
+                instead of using response.content.
+
+        Returns:
+            None
+        """
+        if body is None:
+            content = response.content
+            size = len(content)
+        else:
+            size = os.fstat(body.fileno()).st_size
+            content = None
+            if not hasattr(self.db, "blobopen"):
+                content = body.read()
+        now = time.time()
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES "
+                "(?, ?, COALESCE(?, zeroblob(?)), ?, ?, ?, ?, ?)",
+                (
+                    self.key(url, auth),
+                    response.status_code,
+                    content,
+                    size,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    now,
+                    now,
+                    size,
+                ),
+            )
+            if content is None:
+                with self.db.blobopen("responses", "body", cursor.lastrowid) as blob:
+                    for block in iter(lambda: body.read(STORE_BLOCK_SIZE), b""):
+                        blob.write(block)
+            self.evict()
+
+    def tee(self, url, response, auth=None):
+        """
+        Make a streamed response store its body on the cache once read.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The streamed response.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            requests.Response: The same response, reading through the cache.
+        """
+        response.raw = CachingReader(self, url, response, auth)
+        return response
+
+    def touch(self, url, auth=None):
+        """
+        Mark a cached entry as fresh again (after a 304 Not Modified).
+
+        Args:
+            url (str): The requested URL.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE responses SET stored = ?, accessed = ? WHERE key = ?",
+                (now, now, self.key(url, auth)),
+            )
+
+    def evict(self):
+        """
+        Drop least recently used entries until the cache fits max_size.
+
+        Must be called holding the lock, inside a transaction.
+
+        Returns:
+            None
+        """
+        total = self.db.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        if not total or total <= self.max_size:
+            return
+        rows = self.db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
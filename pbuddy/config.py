@@ -4,7 +4,138 @@ PeeringDB authentication configuration
 default:
 PDB_USERNAME = ""
 PDB_PASSWORD = ""
+PDB_IN_CHUNK = 150
+
+HTTP client configuration
+
+default:
+HTTP_POOL_SIZE = 16
+HTTP_TIMEOUT = (10, 60)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+Concurrency configuration
+
+default:
+WORKERS = 8
+PROVIDER_WORKERS = {"ripe": 8, "bv": 4, "ii": 4, "pdb": 2}
+
+Per-run memo of shared requests and datasets (entries kept, least recently used forgotten first)
+
+default:
+MEMO_SIZE = 256
+
+AS path analytics backend ("python", or "numpy" when NumPy is installed) AS graph build batch (paths) and ranking size
+
+default:
+ASPATH_BACKEND = "python"
+GRAPH_BATCH = 100000
+GRAPH_TOP = 20
+
+-tu AS paths held in memory while their upstreams are not seen as direct yet (the next ones wait on a temporary file)
+
+default:
+TRANSIENT_PENDING = 10000
+
+RIS Live stream (websocket) and report interval (seconds)
+
+default:
+RIS_LIVE_URL = "wss://ris-live.ripe.net/v1/ws/?client=peering_buddy"
+RIS_LIVE_REPORT = 60
+
+--stats provider request latency histogram buckets (seconds) and percentiles window (requests per endpoint)
+
+default:
+STATS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+STATS_WINDOW = 10000
+
+Batch mode worker processes and default checks
+
+default:
+BATCH_WORKERS = 4
+BATCH_CHECKS = ("ac", "ar", "av", "ai")
+
+API server mode listen address and lifetime of the in-memory results (seconds)
+
+default:
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8179
+SERVER_MEMO_TTL = 60
+
+Watch mode freshness window (seconds between two polls) per dataset
+
+default:
+WATCH_INTERVALS = {"visibility": 300, "announced": 300, "consistency": 3600}
+
+Response cache and rate limiter configuration (TTLs in seconds, rates in (requests, seconds))
+
+default:
+CACHE_DIR = "~/.cache/peering_buddy"
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+RATE_LIMITS = {"pdb:anonymous": (20, 60), "pdb:authenticated": (40, 60), "ripe": (20, 1),
+               "bv": (2, 1), "ii": (2, 1), "nlnog": (2, 1)}
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 5
+CACHE_TTL = {"default": 300, "ripe": 300, "ripe-lg": 60, "pdb": 3600, "bv": 3600,
+             "ii": 86400, "nlnog": 3600, "tc": 86400, "ntt": 86400}
 """
 
+import os
+
 PDB_USERNAME = ""
 PDB_PASSWORD = ""
+PDB_IN_CHUNK = 150
+
+HTTP_POOL_SIZE = 16
+HTTP_TIMEOUT = (10, 60)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+WORKERS = 8
+PROVIDER_WORKERS = {"ripe": 8, "bv": 4, "ii": 4, "pdb": 2}
+
+MEMO_SIZE = 256
+
+ASPATH_BACKEND = "python"
+GRAPH_BATCH = 100000
+GRAPH_TOP = 20
+
+TRANSIENT_PENDING = 10000
+
+RIS_LIVE_URL = "wss://ris-live.ripe.net/v1/ws/?client=peering_buddy"
+RIS_LIVE_REPORT = 60
+
+STATS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+STATS_WINDOW = 10000
+
+BATCH_WORKERS = 4
+BATCH_CHECKS = ("ac", "ar", "av", "ai")
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8179
+SERVER_MEMO_TTL = 60
+
+WATCH_INTERVALS = {"visibility": 300, "announced": 300, "consistency": 3600}
+
+CACHE_DIR = os.path.expanduser("~/.cache/peering_buddy")
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+CACHE_TTL = {
+    "default": 300,
+    "ripe": 300,
+    "ripe-lg": 60,
+    "pdb": 3600,
+    "bv": 3600,
+    "ii": 86400,
+    "nlnog": 3600,
+    "tc": 86400,
+    "ntt": 86400,
+}
+
+RATE_LIMITS = {
+    "pdb:anonymous": (20, 60),
+    "pdb:authenticated": (40, 60),
+    "ripe": (20, 1),
+    "bv": (2, 1),
+    "ii": (2, 1),
+    "nlnog": (2, 1),
+}
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 5
@@ -0,0 +1,367 @@
+"""
+Peering Buddy - shared HTTP client used by all data providers.
+"""
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments, too-many-positional-arguments, import-outside-toplevel
+
+import threading
+import time
+
+from pbuddy.config import (
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    RATE_LIMIT_BACKOFF,
+    RATE_LIMIT_RETRIES,
+)
+from pbuddy.providers import PROVIDERS, ProviderError, url_provider
+
+
+class HttpClient:
+    """
+    Long-lived HTTP client with keep-alive connection pools.
+
+    A single HTTPAdapter (and so a single urllib3 PoolManager, holding one
+    connection pool per host) is shared by every thread, while each thread
+    gets its own lightweight requests.Session on top of it, so the client is
+    safe to use from worker threads.
+
+    Attributes:
+        pool_size (int): Maximum number of kept-alive connections per host.
+        timeout (tuple): Default (connect, read) timeout in seconds.
+        cache (ResponseCache): The on-disk response cache, None when disabled.
+        limiter (RateLimiter): The per-provider rate limiter, None when disabled.
+    """
+
+    def __init__(
+        self,
+        pool_size=HTTP_POOL_SIZE,
+        timeout=HTTP_TIMEOUT,
+        state_dir=None,
+        cache_size=None,
+        rates=None,
+        memo=None,
+        snapshot=None,
+        stats=None,
+    ):
+        """
+        Initialize the HttpClient object.
+
+        Args:
+            pool_size (int): Maximum number of kept-alive connections per host.
+            timeout (tuple): Default (connect, read) timeout in seconds.
+            state_dir (str): Directory holding the response cache and the
+                rate limiter state, None for neither of them.
+            cache_size (int): Response cache maximum size in bytes, None for
+                no response cache.
+            rates (dict): Optional (requests, seconds) budget per provider, None
+                for no rate limiter.
+            memo (SingleFlight): Optional per-run memo, sharing the responses of
+                identical (non streamed) requests.
+            snapshot (Snapshot): Optional snapshot archive, recording every
+                response or serving them all (replay).
+            stats (Stats): Optional run statistics, counting requests, cache
+                lookups and the fetch stage.
+
+        Returns:
+            None
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.state_dir = state_dir
+        self.cache_size = cache_size
+        self.rates = rates
+        self.memo = memo
+        self.snapshot = snapshot
+        self.stats = stats
+        self.cache_refresh = False
+        # Created with the first session: requests alone takes longer to
+        # import than the whole CLI startup, runs without HTTP skip it.
+        self.adapter = None
+        # Same for the response cache (SQLite) and the rate limiter, which
+        # also create state_dir on disk: opened on first use.
+        self.components = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def component(self, name, build):
+        """
+        Return a component of the client, building it on first use.
+
+        Args:
+            name (str): The component name.
+            build (callable): Builds the component (None when disabled).
+
+        Returns:
+            object: The component, None when disabled.
+        """
+        if name not in self.components:
+            with self.lock:
+                if name not in self.components:
+                    self.components[name] = build()
+        return self.components[name]
+
+    def open_cache(self):
+        """
+        Open the on-disk response cache.
+
+        Returns:
+            ResponseCache: The response cache, None when disabled.
+        """
+        if self.state_dir is None or self.cache_size is None:
+            return None
+        from pbuddy.cache import ResponseCache
+
+        return ResponseCache(self.state_dir, self.cache_size)
+
+    def open_limiter(self):
+        """
+        Open the per-provider rate limiter.
+
+        Returns:
+            RateLimiter: The rate limiter, None when disabled.
+        """
+        if self.state_dir is None or self.rates is None:
+            return None
+        from pbuddy.ratelimit import RateLimiter
+
+        return RateLimiter(self.state_dir, self.rates)
+
+    @property
+    def cache(self):
+        """
+        The on-disk response cache, opened on first use.
+
+        Returns:
+            ResponseCache: The response cache, None when disabled.
+        """
+        return self.component("cache", self.open_cache)
+
+    @cache.setter
+    def cache(self, cache):
+        self.components["cache"] = cache
+
+    @property
+    def limiter(self):
+        """
+        The per-provider rate limiter, opened on first use.
+
+        Returns:
+            RateLimiter: The rate limiter, None when disabled.
+        """
+        return self.component("limiter", self.open_limiter)
+
+    @limiter.setter
+    def limiter(self, limiter):
+        self.components["limiter"] = limiter
+
+    def session(self):
+        """
+        Return the requests.Session bound to the calling thread.
+
+        Returns:
+            requests.Session: A session mounted on the shared adapter.
+        """
+        session = getattr(self.local, "session", None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            with self.lock:
+                if self.adapter is None:
+                    # One connection pool per host, not per provider (ripe
+                    # is served by two hosts).
+                    self.adapter = HTTPAdapter(
+                        pool_connections=len(PROVIDERS),
+                        pool_maxsize=self.pool_size,
+                        pool_block=True,
+                    )
+            session = requests.Session()
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self.local.session = session
+        return session
+
+    def get(self, url, auth=None, timeout=None, stream=False):
+        """
+        Issue a GET request through the shared connection pool.
+
+        Fresh cached responses are served without network, expired ones are
+        revalidated with If-None-Match/If-Modified-Since. With a memo, identical
+        requests of a run share a single response (streamed bodies can only be
+        read once, they are not shared). With a snapshot, responses are
+        recorded on it, or served from it alone when replaying.
+
+        Args:
+            url (str): URL to fetch.
+            auth (tuple): Optional (username, password) for basic auth.
+            timeout (tuple): Optional timeout overriding the default one.
+            stream (bool): Whether to leave the body unread, to be consumed with
+                response.iter_content() (stored on the cache once read).
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        timeout = timeout or self.timeout
+        if self.stats is None:
+            return self.shared_get(url, auth, timeout, stream)
+        with self.stats.stage("fetch"):
+            return self.shared_get(url, auth, timeout, stream)
+
+    def shared_get(self, url, auth, timeout, stream=False):
+        """
+        Issue a GET request through the per-run memo, when enabled.
+
+        Args:
+            url (str): URL to fetch.
+            auth (tuple): Optional (username, password) for basic auth.
+            timeout (tuple): Request timeout.
+            stream (bool): Whether to leave the body unread.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if self.memo is not None and stream is False:
+            return self.memo.do(
+                ("GET", url, auth), self.snapshot_get, url, auth, timeout
+            )
+        return self.snapshot_get(url, auth, timeout, stream)
+
+    def snapshot_get(self, url, auth, timeout, stream=False):
+        """
+        Issue a GET request through the snapshot archive, when enabled.
+
+        Args:
+            url (str): URL to fetch.
+            auth (tuple): Optional (username, password) for basic auth.
+            timeout (tuple): Request timeout.
+            stream (bool): Whether to leave the body unread.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if self.snapshot is None:
+            return self.cached_get(url, auth, timeout, stream)
+        if self.snapshot.replay:
+            response = self.snapshot.lookup(url, auth)
+            if response is None:
+                raise ProviderError(
+                    f"{url} not recorded on snapshot {self.snapshot.path}"
+                )
+            return response
+        response = self.cached_get(url, auth, timeout, stream)
+        if stream:
+            return self.snapshot.tee(url, response, auth)
+        self.snapshot.store(url, response, auth)
+        return response
+
+    def cached_get(self, url, auth, timeout, stream=False):
+        """
+        Issue a GET request through the response cache, when enabled.
+
+        Args:
+            url (str): URL to fetch.
+            auth (tuple): Optional (username, password) for basic auth.
+            timeout (tuple): Request timeout.
+            stream (bool): Whether to leave the body unread.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if self.cache is None:
+            return self.fetch(url, auth, timeout, stream=stream)
+        headers = {}
+        entry = self.cache.lookup(url, auth)
+        if entry is not None:
+            if entry["fresh"] and not self.cache_refresh:
+                self.cache_lookup("hit")
+                return entry["response"]
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.fetch(url, auth, timeout, headers, stream)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.touch(url, auth)
+            self.cache_lookup("revalidated")
+            return entry["response"]
+        self.cache_lookup("miss")
+        if response.status_code == 200:
+            if stream:
+                return self.cache.tee(url, response, auth)
+            self.cache.store(url, response, auth)
+        return response
+
+    def fetch(self, url, auth, timeout, headers=None, stream=False):
+        """
+        Issue a GET request on the network, within the provider rate budget.
+
+        Rate-limited (429) requests are queued again after Retry-After (or an
+        exponential backoff) instead of failing straight away.
+
+        Args:
+            url (str): URL to fetch.
+            auth (tuple): Optional (username, password) for basic auth.
+            timeout (tuple): Request timeout.
+            headers (dict): Optional extra request headers.
+            stream (bool): Whether to leave the body unread.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        key = url_provider(url)
+        if key == "pdb":
+            key = f"{key}:{'authenticated' if auth else 'anonymous'}"
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire(key)
+            start = time.perf_counter()
+            response = self.session().get(
+                url, auth=auth, timeout=timeout, headers=headers, stream=stream
+            )
+            if self.stats is not None:
+                self.stats.request(
+                    url,
+                    response.status_code,
+                    time.perf_counter() - start,
+                    0 if stream else len(response.content),
+                )
+            if response.status_code != 429 or attempt >= RATE_LIMIT_RETRIES:
+                if self.stats is not None and stream:
+                    return self.stats.tee(url, response)
+                return response
+            response.close()
+            if self.stats is not None:
+                self.stats.retry(url)
+            from pbuddy.ratelimit import retry_after
+
+            wait = retry_after(response, RATE_LIMIT_BACKOFF * 2**attempt)
+            if self.limiter is not None:
+                self.limiter.block(key, wait)
+            else:
+                time.sleep(wait)
+            attempt += 1
+
+    def cache_lookup(self, outcome):
+        """
+        Count a response cache lookup on the run statistics, when enabled.
+
+        Args:
+            outcome (str): hit, revalidated (304) or miss.
+
+        Returns:
+            None
+        """
+        if self.stats is not None:
+            self.stats.cache_lookup(outcome)
+
+    def close(self):
+        """
+        Close the pooled connections.
+
+        Returns:
+            None
+        """
+        if self.adapter is not None:
+            self.adapter.close()
@@ -0,0 +1,254 @@
+"""
+Peering Buddy - streaming JSON decoding of large provider payloads.
+"""
+
+import codecs
+import json
+import re
+
+STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+STRUCTURAL = re.compile(r'["{}\[\]]')
+SCALAR_END = re.compile(r"[,}\]\s]")
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+DECODER = json.JSONDecoder()
+
+
+def iter_json(chunks, *paths):
+    """
+    Decode the values found at some paths of a JSON document, incrementally.
+
+    Paths are tuples of object keys, with "*" matching every array item (or
+    every object key). Only the values at the end of a path are decoded,
+    everything else is skipped while scanning the bytes, so memory stays
+    bound to the size of a single matched value.
+
+    Example:
+        iter_json(chunks, ("data", "rrcs", "*", "peers", "*", "as_path"))
+        yields (("data", "rrcs", 0, "peers", 0, "as_path"), "3333 1299"), ...
+
+    Parameters:
+        chunks (iterable): The JSON document as bytes chunks.
+        *paths (tuple): Paths of the values to decode.
+
+    Yields:
+        tuple: (concrete path, decoded value), in document order.
+    """
+    stream = JsonStream(chunks)
+    yield from stream.walk(paths, ())
+    # Read the document to its end, so readers spooling it see it all.
+    if stream.peek() != "":
+        raise ValueError("Extra data after JSON document")
+
+
+class JsonStream:
+    """
+    Minimal pull scanner over a JSON document split in bytes chunks.
+
+    Attributes:
+        buf (str): Decoded text not consumed yet.
+        pos (int): Scan position on buf.
+        mark (int): Start of the value being decoded, kept on buf when refilling.
+    """
+
+    def __init__(self, chunks):
+        """
+        Initialize the JsonStream object.
+
+        Args:
+            chunks (iterable): The JSON document as bytes chunks.
+
+        Returns:
+            None
+        """
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.mark = None
+        self.eof = False
+
+    def fill(self):
+        """
+        Drop consumed text and read the next chunk.
+
+        Returns:
+            bool: False once the document is exhausted.
+        """
+        if self.eof:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:]
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark -= keep
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self.decoder.decode(b"", final=True)
+        self.eof = True
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character.
+
+        Returns:
+            str: The next character, or "" at the end of the document.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def skip_string(self):
+        """
+        Move past the string starting at the scan position.
+
+        Returns:
+            str: The raw string, quotes and escapes included.
+        """
+        while True:
+            match = STRING.match(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return match.group()
+            if not self.fill():
+                raise ValueError("Unterminated JSON string")
+
+    def skip_value(self):
+        """
+        Move past the value starting at the scan position, without decoding it.
+
+        Returns:
+            None
+        """
+        char = self.peek()
+        if char == "":
+            raise ValueError("Unexpected end of JSON document")
+        if char == '"':
+            self.skip_string()
+            return
+        if char in "{[":
+            self.pos += 1
+            depth = 1
+            while depth:
+                match = STRUCTURAL.search(self.buf, self.pos)
+                if match is None:
+                    self.pos = len(self.buf)
+                    if not self.fill():
+                        raise ValueError("Unexpected end of JSON document")
+                    continue
+                self.pos = match.start()
+                if match.group() == '"':
+                    self.skip_string()
+                    continue
+                depth += 1 if match.group() in "{[" else -1
+                self.pos += 1
+            return
+        while True:
+            match = SCALAR_END.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return
+            if not self.fill():
+                self.pos = len(self.buf)
+                return
+
+    def value(self):
+        """
+        Decode the value starting at the scan position.
+
+        The value is decoded in one go by the C decoder, reading more chunks
+        (at least doubling the buffer, so retries stay linear) while it is cut
+        short by the end of the buffer.
+
+        Returns:
+            object: The decoded value.
+        """
+        char = self.peek()
+        self.mark = self.pos
+        if char in "-0123456789":
+            # Numbers have no closing delimiter, read until one is buffered.
+            while SCALAR_END.search(self.buf, self.mark) is None and self.fill():
+                pass
+        while True:
+            try:
+                result, self.pos = DECODER.raw_decode(self.buf, self.mark)
+                break
+            except ValueError:
+                if self.eof:
+                    raise
+                size = len(self.buf) - self.mark
+                while len(self.buf) - self.mark < 2 * size and self.fill():
+                    pass
+        self.mark = None
+        return result
+
+    def key(self):
+        """
+        Decode the object key at the scan position and move past its colon.
+
+        Returns:
+            str: The decoded key.
+        """
+        key = json.loads(self.skip_string())
+        if self.peek() != ":":
+            raise ValueError("Expected ':' after JSON object key")
+        self.pos += 1
+        return key
+
+    def walk(self, paths, prefix):
+        """
+        Yield the values matching paths, below the value at the scan position.
+
+        Args:
+            paths (tuple): Remaining path elements to match.
+            prefix (tuple): Concrete path of the current value.
+
+        Yields:
+            tuple: (concrete path, decoded value).
+        """
+        if () in paths:
+            yield prefix, self.value()
+            return
+        char = self.peek()
+        if char == "{" and all(len(path) == 1 and path[0] != "*" for path in paths):
+            # Objects holding only leaves (e.g. a looking glass peer) are small,
+            # decode them at once and project the requested keys.
+            value = self.value()
+            for key in value:
+                if (key,) in paths:
+                    yield prefix + (key,), value[key]
+            return
+        if char not in ("{", "["):
+            self.skip_value()
+            return
+        closing = "}" if char == "{" else "]"
+        self.pos += 1
+        index = 0
+        while True:
+            char = self.peek()
+            if char == closing:
+                self.pos += 1
+                return
+            if char == ",":
+                self.pos += 1
+                continue
+            if closing == "}":
+                key = self.key()
+            else:
+                key = index
+                index += 1
+            children = tuple(
+                path[1:]
+                for path in paths
+                if path[0] == "*" or (closing == "}" and path[0] == key)
+            )
+            if children:
+                yield from self.walk(children, prefix + (key,))
+            else:
+                self.skip_value()
@@ -0,0 +1,147 @@
+"""
+Peering Buddy - single-flight memo shared by every consumer of a run.
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Per-run memo of requests and derived datasets.
+
+    The first caller of a key computes it, concurrent callers of the same key
+    wait for that result instead of computing it again, and later callers get
+    it straight away. Failures are not kept, so the next caller tries again.
+
+    Results are kept for the whole run, or for ttl seconds in long running
+    processes (server mode), expired ones being computed again. At most size
+    results are kept, the least recently used ones being forgotten first, so
+    per-prefix fan-outs do not pile up for the whole run.
+
+    Attributes:
+        results (dict): Futures of the computed (or in flight) keys, least
+            recently used first.
+        expires (dict): Expiry time (time.monotonic()) of the computed keys.
+        ttl (float): Seconds a result is kept, None for the whole run.
+        size (int): Maximum number of results kept, None for no limit.
+    """
+
+    def __init__(self, ttl=None, size=None):
+        """
+        Initialize an empty SingleFlight object.
+
+        Args:
+            ttl (float): Seconds a result is kept, None for the whole run.
+            size (int): Maximum number of results kept, None for no limit.
+
+        Returns:
+            None
+        """
+        self.results = {}
+        self.expires = {}
+        self.ttl = ttl
+        self.size = size
+        self.sweep = 0.0
+        self.lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Return the result of func(*args, **kwargs), computed once per key.
+
+        Args:
+            key (hashable): The request or dataset key.
+            func (callable): The function computing the result.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            object: The (shared) result.
+        """
+        with self.lock:
+            if self.ttl is not None:
+                self.expire(key)
+            future = self.results.pop(key, None)
+            owner = future is None
+            if owner:
+                future = Future()
+            self.results[key] = future
+            if self.size is not None and len(self.results) > self.size:
+                oldest = next(iter(self.results))
+                del self.results[oldest]
+                self.expires.pop(oldest, None)
+        if owner:
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as error:
+                with self.lock:
+                    # clear() may have run meanwhile (watch mode cycles).
+                    self.results.pop(key, None)
+                future.set_exception(error)
+                raise
+            if self.ttl is not None:
+                with self.lock:
+                    self.expires[key] = time.monotonic() + self.ttl
+        return future.result()
+
+    def expire(self, key):
+        """
+        Forget the result of a key once expired, and every expired result at
+        most once per ttl, so a long running process does not keep them all.
+        The lock must be held.
+
+        Args:
+            key (hashable): The request or dataset key.
+
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        if now >= self.sweep:
+            self.sweep = now + self.ttl
+            expired = [each for each, expires in self.expires.items() if expires <= now]
+        elif self.expires.get(key, now + 1) <= now:
+            expired = [key]
+        else:
+            return
+        for each in expired:
+            self.results.pop(each, None)
+            del self.expires[each]
+
+    def clear(self):
+        """
+        Forget every computed result, starting a new run.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.results.clear()
+            self.expires.clear()
+
+
+def memoized(method):
+    """
+    Share a method results through the instance memo (self.memo), keyed on
+    the method name and arguments. Calls with unhashable arguments are not
+    memoized.
+
+    Args:
+        method (callable): The method to memoize.
+
+    Returns:
+        callable: The memoized method.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self.memo.do(key, method, self, *args, **kwargs)
+
+    return wrapper
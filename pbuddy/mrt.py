@@ -0,0 +1,544 @@
+"""
+Peering Buddy - looking glass over local MRT TABLE_DUMP_V2 RIB dumps (RFC 6396).
+"""
+
+import bz2
+import functools
+import gzip
+import ipaddress
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+MRT_HEADER = struct.Struct("!IHHI")
+TABLE_DUMP_V2 = 13
+PEER_INDEX_TABLE = 1
+# RIB subtype: (IP version, ADD-PATH path identifiers, RFC 8050)
+RIB_SUBTYPES = {2: (4, False), 4: (6, False), 8: (4, True), 10: (6, True)}
+
+ORIGIN = 1
+AS_PATH = 2
+NEXT_HOP = 3
+COMMUNITIES = 8
+MP_REACH_NLRI = 14
+LARGE_COMMUNITIES = 32
+ORIGINS = {0: "IGP", 1: "EGP", 2: "INCOMPLETE"}
+# AS_SET and AS_CONFED_SET segments
+AS_SETS = (1, 4)
+
+COLLECTOR_RE = re.compile(r"(rrc\d+|route-views[\w.-]*\w)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=65536)
+def format_address(packed):
+    """
+    Format a packed IPv4/IPv6 address, memoized (peers and next hops repeat a lot).
+
+    Parameters:
+        packed (bytes): The packed address.
+
+    Returns:
+        str: The address.
+    """
+    return str(ipaddress.ip_address(packed))
+
+
+@functools.lru_cache(maxsize=65536)
+def format_time(timestamp):
+    """
+    Format a UNIX timestamp as the RIPE RIS looking glass does, memoized.
+
+    Parameters:
+        timestamp (int): Seconds since the epoch.
+
+    Returns:
+        str: The UTC time, e.g. 2024-01-01T00:00:00.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp))
+
+
+def iter_records(path):
+    """
+    Stream the TABLE_DUMP_V2 records of an MRT file. Uncompressed dumps are
+    memory-mapped, gzip and bzip2 ones are decompressed on the fly.
+
+    Parameters:
+        path (str): Path to the MRT dump.
+
+    Yields:
+        tuple: (subtype, buffer, start, end), the record body being
+            buffer[start:end], only valid until the next record.
+    """
+    with open(path, "rb") as dump:
+        magic = dump.read(3)
+        dump.seek(0)
+        if magic[:2] == b"\x1f\x8b":
+            with gzip.GzipFile(fileobj=dump) as stream:
+                yield from streamed_records(stream)
+        elif magic == b"BZh":
+            with bz2.BZ2File(dump) as stream:
+                yield from streamed_records(stream)
+        elif os.fstat(dump.fileno()).st_size > 0:
+            with mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from mapped_records(buffer)
+
+
+def mapped_records(buffer):
+    """
+    Walk the TABLE_DUMP_V2 records of a memory-mapped MRT dump, in place.
+
+    Parameters:
+        buffer (mmap): The mapped dump.
+
+    Yields:
+        tuple: (subtype, buffer, start, end).
+    """
+    offset = 0
+    size = len(buffer)
+    while offset + MRT_HEADER.size <= size:
+        _, mrt_type, subtype, length = MRT_HEADER.unpack_from(buffer, offset)
+        start = offset + MRT_HEADER.size
+        offset = start + length
+        if mrt_type == TABLE_DUMP_V2 and offset <= size:
+            yield subtype, buffer, start, offset
+
+
+def streamed_records(stream):
+    """
+    Read the TABLE_DUMP_V2 records of a compressed MRT dump, one at a time.
+
+    Parameters:
+        stream (file): The decompressed dump stream.
+
+    Yields:
+        tuple: (subtype, body, 0, body length).
+    """
+    while len(header := stream.read(MRT_HEADER.size)) == MRT_HEADER.size:
+        _, mrt_type, subtype, length = MRT_HEADER.unpack(header)
+        body = stream.read(length)
+        if len(body) < length:
+            return
+        if mrt_type == TABLE_DUMP_V2:
+            yield subtype, body, 0, length
+
+
+def read_peers(buffer, offset):
+    """
+    Parse a PEER_INDEX_TABLE record.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the record body.
+
+    Returns:
+        tuple: (view name, list of peer IP addresses, in peer index order).
+    """
+    offset += 4
+    (name_length,) = struct.unpack_from("!H", buffer, offset)
+    start, offset = offset + 2, offset + 2 + name_length
+    view = bytes(buffer[start:offset]).decode(errors="replace")
+    (count,) = struct.unpack_from("!H", buffer, offset)
+    offset += 2
+    peers = []
+    for _ in range(count):
+        peer_type = buffer[offset]
+        offset += 5
+        end = offset + (16 if peer_type & 1 else 4)
+        peers.append(format_address(bytes(buffer[offset:end])))
+        offset = end + (4 if peer_type & 2 else 2)
+    return view, peers
+
+
+def prefix_key(pfx):
+    """
+    Return the key a prefix is matched with against RIB records.
+
+    Parameters:
+        pfx (str): The prefix.
+
+    Returns:
+        tuple: (IP version, prefix length, significant network address bytes).
+    """
+    network = ipaddress.ip_network(pfx, strict=False)
+    end = (network.prefixlen + 7) // 8
+    return network.version, network.prefixlen, network.network_address.packed[:end]
+
+
+def key_prefix(key):
+    """
+    Format a prefix_key() back into a prefix.
+
+    Parameters:
+        key (tuple): (IP version, prefix length, significant network address bytes).
+
+    Returns:
+        str: The prefix.
+    """
+    version, length, address = key
+    size = 4 if version == 4 else 16
+    network = ipaddress.ip_network((address.ljust(size, b"\0"), length), strict=False)
+    return str(network)
+
+
+def read_aspath(buffer, offset, end):
+    """
+    Format an AS_PATH attribute (4 bytes ASNs), AS_SETs as {65001,65002}.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the attribute value.
+        end (int): End of the attribute value.
+
+    Returns:
+        str: The AS path, hops separated by spaces.
+    """
+    hops = []
+    while offset < end:
+        segment, count = buffer[offset], buffer[offset + 1]
+        asns = struct.unpack_from(f"!{count}I", buffer, offset + 2)
+        offset += 2 + 4 * count
+        if segment in AS_SETS:
+            hops.append("{" + ",".join(map(str, asns)) + "}")
+        else:
+            hops.extend(map(str, asns))
+    return " ".join(hops)
+
+
+def read_route(buffer, offset, end):
+    """
+    Parse the BGP path attributes of a RIB entry into a looking glass route.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the attributes.
+        end (int): End of the attributes.
+
+    Returns:
+        dict: The route attributes, keyed as the RIPE RIS looking glass peers.
+    """
+    route = {
+        "asn_origin": "",
+        "as_path": "",
+        "community": "",
+        "largeCommunity": "",
+        "origin": "",
+        "next_hop": "",
+    }
+    while offset < end:
+        flags, code = buffer[offset], buffer[offset + 1]
+        if flags & 0x10:
+            (length,) = struct.unpack_from("!H", buffer, offset + 2)
+            offset += 4
+        else:
+            length = buffer[offset + 2]
+            offset += 3
+        stop = offset + length
+        if code == ORIGIN:
+            route["origin"] = ORIGINS.get(buffer[offset], "")
+        elif code == AS_PATH:
+            route["as_path"] = read_aspath(buffer, offset, stop)
+            route["asn_origin"] = route["as_path"].rpartition(" ")[2]
+        elif code == NEXT_HOP:
+            route["next_hop"] = format_address(bytes(buffer[offset:stop]))
+        elif code == MP_REACH_NLRI and length:
+            # RFC 6396 keeps only the next hop length and address, some
+            # implementations dump the full attribute (AFI, SAFI first).
+            next_hop = offset + 1
+            hop_length = buffer[offset]
+            if hop_length + 1 > length:
+                next_hop = offset + 4
+                hop_length = buffer[offset + 3]
+            hop_end = next_hop + (16 if hop_length >= 16 else 4)
+            route["next_hop"] = format_address(bytes(buffer[next_hop:hop_end]))
+        elif code == COMMUNITIES:
+            values = struct.unpack_from(f"!{length // 2}H", buffer, offset)
+            route["community"] = " ".join(
+                f"{values[i]}:{values[i + 1]}" for i in range(0, len(values), 2)
+            )
+        elif code == LARGE_COMMUNITIES:
+            values = struct.unpack_from(f"!{length // 4}I", buffer, offset)
+            route["largeCommunity"] = " ".join(
+                f"{values[i]}:{values[i + 1]}:{values[i + 2]}"
+                for i in range(0, len(values), 3)
+            )
+        offset = stop
+    return route
+
+
+def read_origin(buffer, offset, end):
+    """
+    Return the origin ASN of a RIB entry, reading the AS_PATH attribute only.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the attributes.
+        end (int): End of the attributes.
+
+    Returns:
+        int: The origin ASN, or None when the AS path is empty or ends with an AS_SET.
+    """
+    while offset < end:
+        flags, code = buffer[offset], buffer[offset + 1]
+        if flags & 0x10:
+            (length,) = struct.unpack_from("!H", buffer, offset + 2)
+            offset += 4
+        else:
+            length = buffer[offset + 2]
+            offset += 3
+        if code == AS_PATH:
+            origin = None
+            stop = offset + length
+            while offset < stop:
+                segment, count = buffer[offset], buffer[offset + 1]
+                offset += 2 + 4 * count
+                origin = None
+                if count and segment not in AS_SETS:
+                    (origin,) = struct.unpack_from("!I", buffer, offset - 4)
+            return origin
+        offset += length
+    return None
+
+
+def rib_origins(buffer, offset, addpath):
+    """
+    Return the origin ASNs of the entries of a RIB record.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the entries (entry count).
+        addpath (bool): Whether entries carry a path identifier (RFC 8050).
+
+    Returns:
+        set: The origin ASNs.
+    """
+    origins = set()
+    (count,) = struct.unpack_from("!H", buffer, offset)
+    offset += 2
+    for _ in range(count):
+        offset += 10 if addpath else 6
+        (length,) = struct.unpack_from("!H", buffer, offset)
+        offset += 2
+        origins.add(read_origin(buffer, offset, offset + length))
+        offset += length
+    return origins
+
+
+def read_rib(buffer, offset, end, addpath):
+    """
+    Parse the entries of a RIB record.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        offset (int): Start of the entries (entry count).
+        end (int): End of the record body.
+        addpath (bool): Whether entries carry a path identifier (RFC 8050).
+
+    Returns:
+        list: (peer index, originated time, route) tuples.
+    """
+    entries = []
+    (count,) = struct.unpack_from("!H", buffer, offset)
+    offset += 2
+    for _ in range(count):
+        peer, originated = struct.unpack_from("!HI", buffer, offset)
+        offset += 10 if addpath else 6
+        (length,) = struct.unpack_from("!H", buffer, offset)
+        offset += 2
+        if offset + length > end:
+            break
+        entries.append((peer, originated, read_route(buffer, offset, offset + length)))
+        offset += length
+    return entries
+
+
+def rib_prefix(buffer, start, subtype):
+    """
+    Parse the prefix of a RIB record.
+
+    Parameters:
+        buffer (bytes|mmap): The dump buffer.
+        start (int): Start of the record body.
+        subtype (int): The RIB subtype (RIB_SUBTYPES key).
+
+    Returns:
+        tuple: (prefix_key(), start of the entries, ADD-PATH entries).
+    """
+    version, addpath = RIB_SUBTYPES[subtype]
+    length = buffer[start + 4]
+    address = start + 5
+    offset = address + (length + 7) // 8
+    return (version, length, bytes(buffer[address:offset])), offset, addpath
+
+
+def peer_routes(entries, pfx, peers):
+    """
+    Complete read_rib() entries into looking glass routes.
+
+    Parameters:
+        entries (list): (peer index, originated time, route) tuples.
+        pfx (str): The prefix.
+        peers (list): Peer IP addresses, in peer index order.
+
+    Returns:
+        list: The routes.
+    """
+    routes = []
+    for peer, originated, route in entries:
+        updated = format_time(originated)
+        route["prefix"] = pfx
+        route["peer"] = peers[peer] if peer < len(peers) else ""
+        route["last_updated"] = updated
+        route["latest_time"] = updated
+        routes.append(route)
+    return routes
+
+
+def collector_name(path, view):
+    """
+    Name the collector of a dump after its path (rrc00, route-views2, ...),
+    or else its view name or file name.
+
+    Parameters:
+        path (str): Path to the MRT dump.
+        view (str): View name of the PEER_INDEX_TABLE.
+
+    Returns:
+        str: The collector name.
+    """
+    found = COLLECTOR_RE.search(path)
+    if found is not None:
+        name = found.group(1)
+        return name.upper() if name.lower().startswith("rrc") else name
+    return view or os.path.basename(path)
+
+
+def scan_dump(path, origin=None, prefixes=None):
+    """
+    Scan an MRT dump for the routes of some prefixes, or of the prefixes some
+    origin ASN announces (every route of those, MOAS included).
+
+    Records are filtered before their entries get parsed: on the prefix for
+    a prefix set, on the origin ASN bytes showing up at all in the record,
+    then on the entries AS path last hop, for an origin.
+
+    Parameters:
+        path (str): Path to the MRT dump.
+        origin (int): Origin ASN to keep the prefixes of.
+        prefixes (set): prefix_key() of the prefixes to keep.
+
+    Returns:
+        tuple: (collector name, {prefix: [looking glass routes]}).
+    """
+    view, peers = "", []
+    needle = struct.pack("!I", origin) if origin is not None else None
+    routes = {}
+    for subtype, buffer, start, end in iter_records(path):
+        if subtype == PEER_INDEX_TABLE:
+            view, peers = read_peers(buffer, start)
+            continue
+        if subtype not in RIB_SUBTYPES:
+            continue
+        key, offset, addpath = rib_prefix(buffer, start, subtype)
+        if prefixes is not None and key not in prefixes:
+            continue
+        if needle is not None and (
+            buffer.find(needle, offset, end) < 0
+            or origin not in rib_origins(buffer, offset, addpath)
+        ):
+            continue
+        pfx = key_prefix(key)
+        routes.setdefault(pfx, []).extend(
+            peer_routes(read_rib(buffer, offset, end, addpath), pfx, peers)
+        )
+    return collector_name(path, view), routes
+
+
+class MrtRib:
+    """
+    Looking glass over local MRT TABLE_DUMP_V2 RIB dumps (RIS bview,
+    RouteViews RIB), answering as the RIPE RIS looking glass does, one
+    collector per dump.
+
+    Dumps are scanned once per origin ASN (or prefix not seen yet), the
+    routes found being kept for the following lookups.
+
+    Attributes:
+        paths (list): Paths to the MRT dumps.
+        routes (dict): {prefix: {collector: [routes]}} of the scanned prefixes.
+        origins (dict): {origin ASN: [prefixes]} of the scanned origins.
+    """
+
+    def __init__(self, paths):
+        """
+        Initialize the MrtRib object.
+
+        Parameters:
+            paths (list): Paths to the MRT dumps.
+
+        Returns:
+            None
+        """
+        self.paths = list(paths)
+        self.routes = {}
+        self.origins = {}
+        self.lock = threading.Lock()
+
+    def scan(self, origin=None, prefixes=None):
+        """
+        Scan every dump, keeping the routes found.
+
+        Parameters:
+            origin (int): Origin ASN to keep the prefixes of.
+            prefixes (set): prefix_key() of the prefixes to keep.
+
+        Returns:
+            list: The prefixes found, in dump order.
+        """
+        found = {}
+        for path in self.paths:
+            collector, routes = scan_dump(path, origin, prefixes)
+            for pfx, peers in routes.items():
+                found.setdefault(pfx, {}).setdefault(collector, []).extend(peers)
+        with self.lock:
+            self.routes.update(found)
+        return list(found)
+
+    def origin_prefixes(self, asn):
+        """
+        Return the prefixes an ASN originates on the dumps.
+
+        Parameters:
+            asn (int|str): The origin ASN.
+
+        Returns:
+            list: The prefixes, in dump order.
+        """
+        asn = int(str(asn).upper().removeprefix("AS"))
+        if asn not in self.origins:
+            self.origins[asn] = self.scan(origin=asn)
+        return self.origins[asn]
+
+    def looking_glass(self, pfx):
+        """
+        Return the routes of a prefix, shaped as the RIPE RIS looking glass
+        "rrcs" (one per collector).
+
+        Parameters:
+            pfx (str): The prefix.
+
+        Returns:
+            list: [{"rrc": collector, "location": collector, "peers": [routes]}].
+        """
+        pfx = str(ipaddress.ip_network(pfx, strict=False))
+        if pfx not in self.routes:
+            self.scan(prefixes={prefix_key(pfx)})
+            with self.lock:
+                self.routes.setdefault(pfx, {})
+        collectors = self.routes.get(pfx, {})
+        return [
+            {"rrc": collector, "location": collector, "peers": peers}
+            for collector, peers in collectors.items()
+        ]
@@ -0,0 +1,196 @@
+"""
+Peering Buddy - local PeeringDB mirror with incremental sync.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from pbuddy.providers import ProviderError
+
+# PeeringDB objects mirrored locally and the fields indexed for queries.
+OBJECTS = {
+    "net": ("asn",),
+    "ix": ("country",),
+    "ixlan": ("ix_id",),
+    "ixpfx": ("ixlan_id",),
+    "netixlan": ("asn", "net_id"),
+    "poc": ("net_id",),
+}
+TEXT_FIELDS = ("country",)
+
+
+class PeeringDBMirror:
+    """
+    SQLite backed PeeringDB mirror.
+
+    Every object is stored as its API JSON, next to indexed columns for the
+    fields the pdb_* methods filter on. The first sync pulls full tables,
+    following ones only ask PeeringDB for objects changed since the last
+    sync (since= parameter), dropping the ones flagged as deleted.
+
+    Attributes:
+        path (str): Path to the SQLite database.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initialize the PeeringDBMirror object.
+
+        Args:
+            cache_dir (str): Directory holding the mirror database.
+
+        Returns:
+            None
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "peeringdb.sqlite")
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS sync (obj TEXT PRIMARY KEY, since INTEGER)"
+            )
+            for obj, fields in OBJECTS.items():
+                columns = "".join(
+                    f", {field} {'TEXT' if field in TEXT_FIELDS else 'INTEGER'}"
+                    for field in fields
+                )
+                self.db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {obj} "
+                    f"(id INTEGER PRIMARY KEY, data TEXT{columns})"
+                )
+                for field in fields:
+                    self.db.execute(
+                        f"CREATE INDEX IF NOT EXISTS {obj}_{field} ON {obj} ({field})"
+                    )
+
+    def last_sync(self, obj):
+        """
+        Return when an object type was last synced.
+
+        Args:
+            obj (str): PeeringDB object type.
+
+        Returns:
+            int: Unix timestamp of the last sync, or None if never synced.
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT since FROM sync WHERE obj = ?", (obj,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, fetch, dump_dir=None):
+        """
+        Sync the mirror from PeeringDB or from a recorded dump.
+
+        Args:
+            fetch (callable): fetch(obj, **filters) returning the API "data" list.
+            dump_dir (str): Optional directory with <obj>.json API dumps to load
+                instead of querying PeeringDB.
+
+        Returns:
+            dict: Number of objects updated and deleted per object type.
+        """
+        result = {}
+        for obj in OBJECTS:
+            started = int(time.time())
+            if dump_dir:
+                with open(
+                    os.path.join(dump_dir, f"{obj}.json"), encoding="utf-8"
+                ) as dump:
+                    rows = json.load(dump)["data"]
+            else:
+                since = self.last_sync(obj)
+                if since is None:
+                    rows = fetch(obj)
+                else:
+                    rows = fetch(obj, since=since)
+            result[obj] = self.apply(obj, rows, started)
+        return result
+
+    def apply(self, obj, rows, since):
+        """
+        Upsert (or delete) a batch of objects and record the sync time.
+
+        Args:
+            obj (str): PeeringDB object type.
+            rows (list): API objects.
+            since (int): Unix timestamp to use as since= on the next sync.
+
+        Returns:
+            dict: Number of objects updated and deleted.
+        """
+        fields = OBJECTS[obj]
+        placeholders = ", ".join("?" * (len(fields) + 2))
+        updated = 0
+        deleted = 0
+        with self.lock, self.db:
+            for row in rows:
+                if row.get("status") == "deleted":
+                    self.db.execute(f"DELETE FROM {obj} WHERE id = ?", (row["id"],))
+                    deleted += 1
+                    continue
+                values = [row["id"], json.dumps(row)]
+                values.extend(row.get(field) for field in fields)
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO {obj} VALUES ({placeholders})", values
+                )
+                updated += 1
+            self.db.execute("INSERT OR REPLACE INTO sync VALUES (?, ?)", (obj, since))
+        return {"updated": updated, "deleted": deleted}
+
+    def query(self, obj, **filters):
+        """
+        Query mirrored objects, API style (field=value or field__in=values).
+
+        Args:
+            obj (str): PeeringDB object type.
+            **filters: Filters on indexed fields.
+
+        Returns:
+            list: The matching API objects.
+        """
+        # An empty table is no answer: PeeringDB was never synced.
+        if self.last_sync(obj) is None:
+            raise ProviderError(
+                f"PeeringDB mirror has no {obj} objects, run -ps/--pdb-sync first."
+            )
+        where = []
+        values = []
+        for key, value in filters.items():
+            field, _, operator = key.partition("__")
+            if field not in OBJECTS[obj]:
+                raise ValueError(f"{obj}.{field} is not indexed on the mirror")
+            if operator == "in":
+                where.append(f"{field} IN ({', '.join('?' * len(value))})")
+                values.extend(value)
+            elif field in TEXT_FIELDS:
+                where.append(f"{field} = ? COLLATE NOCASE")
+                values.append(value)
+            else:
+                where.append(f"{field} = ?")
+                values.append(value)
+        sql = f"SELECT data FROM {obj}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.lock:
+            rows = self.db.execute(sql + " ORDER BY id", values).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def as_set(self, asn):
+        """
+        Return the ASN as-set, as the PeeringDB as_set endpoint does.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: A list with an {asn: as-set} dictionary.
+        """
+        return [
+            {str(net["asn"]): net["irr_as_set"]} for net in self.query("net", asn=asn)
+        ]
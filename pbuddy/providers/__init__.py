@@ -0,0 +1,77 @@
+"""
+Peering Buddy - data provider registry.
+
+PBuddy methods are named after the provider serving them (ripe_*, pdb_*,
+bv_*, ...). Each provider lives in its own module, imported the first time
+one of its methods is used, so a run only loads the providers it needs.
+"""
+
+import importlib
+from urllib.parse import urlsplit
+
+# Method name prefix: (provider module, provider class).
+REGISTRY = {
+    "ripe": ("pbuddy.providers.ripe", "Ripe"),
+    "ris": ("pbuddy.providers.ripe", "Ripe"),
+    "pdb": ("pbuddy.providers.peeringdb", "PeeringDB"),
+    "bv": ("pbuddy.providers.bgpview", "BGPView"),
+    "ii": ("pbuddy.providers.ipinfo", "IPInfo"),
+    "nlnog": ("pbuddy.providers.nlnog", "Nlnog"),
+    "tc": ("pbuddy.providers.teamcymru", "TeamCymru"),
+    "ntt": ("pbuddy.providers.ntt", "Ntt"),
+}
+
+# Provider host: provider short name (rate limits, statistics, cache TTLs).
+PROVIDERS = {
+    "stat.ripe.net": "ripe",
+    "rest.db.ripe.net": "ripe",
+    "www.peeringdb.com": "pdb",
+    "api.bgpview.io": "bv",
+    "ipinfo.io": "ii",
+    "irrexplorer.nlnog.net": "nlnog",
+    "www.team-cymru.org": "tc",
+    "as2914.net": "ntt",
+}
+
+
+def url_provider(url):
+    """
+    Map an URL to the data provider serving it.
+
+    Parameters:
+        url (str): The URL to map.
+
+    Returns:
+        str: The provider short name, or the hostname for unknown hosts.
+    """
+    host = urlsplit(url).hostname or ""
+    return PROVIDERS.get(host, host)
+
+
+class ProviderError(OSError):
+    """
+    A provider answer PBuddy can not use (rate limit, HTTP error, ...).
+
+    Raised rather than exiting, as provider methods also run in batch
+    workers, the API server and watch mode (catching OSError); the CLI
+    prints it and exits.
+    """
+
+
+def provider_method(name):
+    """
+    Return the provider function implementing a PBuddy method, importing
+    the provider module if needed.
+
+    Parameters:
+        name (str): The method name (e.g. ripe_asn_visibility).
+
+    Returns:
+        callable: The function (taking the PBuddy object as self), None when
+            no provider implements the method.
+    """
+    entry = REGISTRY.get(name.split("_", 1)[0])
+    if entry is None:
+        return None
+    module, provider = entry
+    return vars(getattr(importlib.import_module(module), provider)).get(name)
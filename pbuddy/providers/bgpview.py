@@ -0,0 +1,134 @@
+"""
+Peering Buddy - BGPView provider methods.
+"""
+
+# pylint: disable=no-member, duplicate-code
+
+import sys
+
+
+class BGPView:
+    """
+    BGPView methods of PBuddy (bv_*).
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def bv_asn_upstreams(self, asn):
+        """
+        Return ASN upstreams from BGPView.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: List of ASN upstreams.
+        """
+        url = f"https://api.bgpview.io/asn/{asn}/upstreams"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def bv_asn_downstreams(self, asn):
+        """
+        Return ASN downstreams from BGPView.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: List of ASN downstreams.
+        """
+        url = f"https://api.bgpview.io/asn/{asn}/downstreams"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def bv_asn_whois(self, asn):
+        """
+        Return ASN whois information from BGPView.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            dict: ASN whois information.
+        """
+        url = f"https://api.bgpview.io/asn/{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def bv_pfx_whois(self, pfx):
+        """
+        Return prefix whois information from BGPView.
+
+        Args:
+            pfx (str): IP prefix.
+
+        Returns:
+            dict: Prefix whois information.
+        """
+        url = f"https://api.bgpview.io/prefix/{pfx}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def bv_asn_upstreams_asns(self, asn):
+        """
+        Return ASN upstreams (IPv4 and IPv6) from BGPView.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: Sorted list of upstream ASNs.
+        """
+        asns = []
+        upstreams = self.bv_asn_upstreams(asn)
+        for upstream in upstreams["ipv4_upstreams"]:
+            asn_ups = str(upstream["asn"])
+            asns.append(asn_ups)
+        for upstream in upstreams["ipv6_upstreams"]:
+            asn_ups = str(upstream["asn"])
+            asns.append(asn_ups)
+        return sorted(set(asns))
+
+    def bv_asn_transit(self, asn, direct):
+        """
+        Split the ASNs directly attached to an ASN into non-transit and transit.
+
+        Args:
+            asn (str): ASN number.
+            direct (iterable): Direct ASNs seen on the AS paths.
+
+        Returns:
+            tuple: (non-transit ASNs, transit ASNs) lists.
+        """
+        upstreams_s = self.bv_asn_upstreams_asns(asn)
+        transit_m = set(upstreams_s).intersection(set(direct))
+        nontransit_m = set(direct).difference(set(upstreams_s))
+        nontransit = list(nontransit_m)
+        transit = list(transit_m)
+        return nontransit, transit
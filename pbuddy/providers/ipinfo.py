@@ -0,0 +1,35 @@
+"""
+Peering Buddy - IPInfo provider methods.
+"""
+
+# pylint: disable=no-member, too-few-public-methods
+
+import sys
+
+
+class IPInfo:
+    """
+    IPInfo methods of PBuddy (ii_*).
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def ii_ip_whois(self, ipaddr):
+        """
+        Return IP whois information from ipinfo.io.
+
+        Args:
+            ipaddr (str): IP address.
+
+        Returns:
+            dict: IP whois information.
+        """
+        url = f"https://ipinfo.io/{ipaddr}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            result = self.loads(response)
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
@@ -0,0 +1,71 @@
+"""
+Peering Buddy - NLNOG IRR explorer provider methods.
+"""
+
+# pylint: disable=no-member
+
+import sys
+
+
+class Nlnog:
+    """
+    NLNOG IRR explorer methods of PBuddy (nlnog_*).
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def nlnog_expand_asset(self, asset):
+        """
+        Expand AS-SET.
+
+        Args:
+            asset (str): AS-SET to expand.
+
+        Returns:
+            dict: Expanded AS-SET information.
+        """
+        url = f"https://irrexplorer.nlnog.net/api/sets/expand/{asset}"
+        response = self.http.get(url, timeout=30)
+        if response.status_code == 200:
+            asset_json = self.loads(response)
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return asset_json
+
+    def nlnog_resource_health_check(self, resource, resource_type):
+        """
+        Resource health check.
+
+        Args:
+            resource (str): Resource identifier (ASN or prefix).
+            resource_type (str): Type of resource ("asn" or "prefix").
+
+        Returns:
+            dict: Resource health information.
+        """
+        url = None
+        direct_origin = None
+        resource_data = {}
+        if resource_type == "asn":
+            url = f"https://irrexplorer.nlnog.net/api/prefixes/asn/AS{resource}"
+        elif resource_type == "prefix":
+            url = f"https://irrexplorer.nlnog.net/api/prefixes/prefix/{resource}"
+        response = self.http.get(url, timeout=30)
+        if response.status_code == 200:
+            data = self.loads(response)
+            if resource_type == "asn":
+                direct_origin = data["directOrigin"]
+            elif resource_type == "prefix":
+                direct_origin = data
+            for each in direct_origin:
+                resource_data[each["prefix"]] = {
+                    "origin": each["bgpOrigins"],
+                    "status": each["messages"],
+                    "score": each["goodnessOverall"],
+                }
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return resource_data
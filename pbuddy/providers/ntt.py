@@ -0,0 +1,32 @@
+"""
+Peering Buddy - NTT provider methods.
+"""
+
+# pylint: disable=no-member, too-few-public-methods
+
+import sys
+
+
+class Ntt:
+    """
+    NTT methods of PBuddy (ntt_*).
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def ntt_bogons_asn(self):
+        """
+        Return ASN bogons list and examples from NTT.
+
+        Returns:
+            str: ASN bogons list and examples.
+        """
+        url = "http://as2914.net/bogon_asns/configuration_examples.txt"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = response.text
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return data
@@ -0,0 +1,326 @@
+"""
+Peering Buddy - PeeringDB provider methods.
+"""
+
+# pylint: disable=no-member
+
+from urllib.parse import urlencode
+
+from pbuddy.config import (
+    CACHE_DIR,
+    PDB_IN_CHUNK,
+    PDB_PASSWORD,
+    PDB_USERNAME,
+    STREAM_CHUNK_SIZE,
+)
+from pbuddy.memo import memoized
+from pbuddy.pdb_mirror import PeeringDBMirror
+from pbuddy.providers import ProviderError
+
+
+class PeeringDB:
+    """
+    PeeringDB methods of PBuddy (pdb_*), answered by the API or the local mirror.
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def pdb_auth(self):
+        """
+        Return PeeringDB basic auth credentials, if configured.
+
+        Returns:
+            tuple: (username, password) or None for anonymous requests.
+        """
+        if PDB_USERNAME != "" and PDB_PASSWORD != "":
+            return (PDB_USERNAME, PDB_PASSWORD)
+        return None
+
+    def pdb_error(self, response):
+        """
+        Return the error of a failed PeeringDB API response.
+
+        Args:
+            response (requests.Response): The API response (status != 200).
+
+        Returns:
+            ProviderError: The error to raise.
+        """
+        if response.status_code == 429:
+            return ProviderError("PeeringDB rate-limit.")
+        return ProviderError("HTTP status != 200")
+
+    def pdb_asn_asset(self, asn):
+        """
+        Return ASN as-set from PeeringDB.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            dict: ASN as-set information.
+        """
+        if self.pdb_mirror is not None:
+            return self.pdb_mirror.as_set(asn)
+        url = f"https://www.peeringdb.com/api/as_set/{asn}"
+        response = self.http.get(url, auth=self.pdb_auth())
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            raise self.pdb_error(response)
+        return result
+
+    def pdb_url(self, obj, **filters):
+        """
+        Build a PeeringDB API object list URL.
+
+        Args:
+            obj (str): PeeringDB object type (net, ix, netixlan, poc, ...).
+            **filters: API filters, field=value or field__in=values.
+
+        Returns:
+            str: The API URL.
+        """
+        query = {}
+        for key, value in filters.items():
+            if key.endswith("__in"):
+                value = ",".join(map(str, value))
+            query[key] = value
+        url = f"https://www.peeringdb.com/api/{obj}"
+        if query:
+            url = f"{url}?{urlencode(query, safe=',')}"
+        return url
+
+    def pdb_api(self, obj, **filters):
+        """
+        Query a PeeringDB API object list.
+
+        Args:
+            obj (str): PeeringDB object type (net, ix, netixlan, poc, ...).
+            **filters: API filters, field=value or field__in=values.
+
+        Returns:
+            list: The API "data" list.
+        """
+        url = self.pdb_url(obj, **filters)
+        response = self.http.get(url, auth=self.pdb_auth())
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            raise self.pdb_error(response)
+        return result
+
+    @memoized
+    def pdb_api_values(self, obj, field, **filters):
+        """
+        Return a single field of a PeeringDB API object list, decoding the
+        response as a stream so the full object list is never built.
+
+        Args:
+            obj (str): PeeringDB object type (net, ix, netixlan, poc, ...).
+            field (str): The object field to return.
+            **filters: API filters, field=value or field__in=values.
+
+        Returns:
+            list: The field values, in API order.
+        """
+        url = self.pdb_url(obj, **filters)
+        response = self.http.get(url, auth=self.pdb_auth(), stream=True)
+        if response.status_code == 200:
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+            result = [
+                value for _, value in self.stream_json(chunks, ("data", "*", field))
+            ]
+        else:
+            raise self.pdb_error(response)
+        return result
+
+    @memoized
+    def pdb_query(self, obj, **filters):
+        """
+        Query PeeringDB objects, from the local mirror when enabled.
+
+        Args:
+            obj (str): PeeringDB object type (net, ix, netixlan, poc, ...).
+            **filters: API filters, field=value or field__in=values.
+
+        Returns:
+            list: The matching PeeringDB objects.
+        """
+        if self.pdb_mirror is not None:
+            return self.pdb_mirror.query(obj, **filters)
+        return self.pdb_api(obj, **filters)
+
+    def pdb_sync(self, dump_dir=None):
+        """
+        Sync the local PeeringDB mirror (incrementally after the first sync).
+
+        Args:
+            dump_dir (str): Optional directory with <obj>.json API dumps to load
+                instead of querying PeeringDB.
+
+        Returns:
+            dict: Number of objects updated and deleted per object type.
+        """
+        mirror = self.pdb_mirror or PeeringDBMirror(CACHE_DIR)
+        result = mirror.sync(self.pdb_api, dump_dir)
+        # Queries answered before the sync are stale now.
+        self.memo.clear()
+        return result
+
+    def pdb_ixps_pfxs(self):
+        """
+        Return IXP prefixes from PeeringDB.
+
+        Returns:
+            list: List of IXP prefixes.
+        """
+        if self.pdb_mirror is not None:
+            result = []
+            for each in self.pdb_mirror.query("ixpfx"):
+                prefix = each["prefix"]
+                result.append(prefix)
+        else:
+            result = self.pdb_api_values("ixpfx", "prefix")
+        return sorted(result)
+
+    def pdb_asn_info(self, asn):
+        """
+        Return ASN info on PeeringDB.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: List of ASN information.
+        """
+        result = []
+        for each in self.pdb_query("net", asn=asn):
+            selected = (
+                "Name: " + each["name"],
+                "Aka: " + each["aka"],
+                "Website: " + each["website"],
+                "ASN: " + str(each["asn"]),
+                "LookingGlass: " + each["looking_glass"],
+                "RouteServer " + each["route_server"],
+                "IRR AS-SET: " + each["irr_as_set"],
+                "Type: " + each["info_type"],
+                "IPv4 Prefixes: " + str(each["info_prefixes4"]),
+                "IPv6 Prefixes: " + str(each["info_prefixes6"]),
+                "Traffic: " + each["info_traffic"],
+                "Ratio: " + each["info_ratio"],
+                "Scope: " + each["info_scope"],
+                "Unicast: " + str(each["info_unicast"]),
+                "Multicast: " + str(each["info_multicast"]),
+                "IPv6: " + str(each["info_ipv6"]),
+                "Never via RS: " + str(each["info_never_via_route_servers"]),
+                "Notes: " + each["notes"],
+                "Policy url: " + each["policy_url"],
+                "Policy: " + each["policy_general"],
+                "Policy locations: " + each["policy_locations"],
+                "Policy Ratio Requirement: " + str(each["policy_ratio"]),
+                "Policy Contracts: " + each["policy_contracts"],
+            )
+            result.append(selected)
+        return result
+
+    def pdb_asn_ixps_ips(self, asn):
+        """
+        Return ASN IPs allocated on IXPs from PeeringDB.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: List of ASN IPs allocated on IXPs.
+        """
+        ixps = []
+        for each in self.pdb_query("netixlan", asn=asn):
+            selected = (
+                each["name"],
+                " | Speed: ",
+                each["speed"],
+                " | IP4: ",
+                each["ipaddr4"],
+                " | IP6: ",
+                each["ipaddr6"],
+                " | RS: ",
+                each["is_rs_peer"],
+            )
+            ixps.append(selected)
+        return ixps
+
+    def pdb_asn_contacts(self, asn):
+        """
+        Return ASN contacts from PeeringDB.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            list: List of ASN contacts.
+        """
+        netid = []
+        for each in self.pdb_query("netixlan", asn=asn):
+            selected = each["net_id"]
+            netid.append(selected)
+        netid = sorted(set(netid))
+        chunks = []
+        for start in range(0, len(netid), PDB_IN_CHUNK):
+            stop = start + PDB_IN_CHUNK
+            chunks.append(netid[start:stop])
+        contacts = {}
+        for chunk in self.concurrent_map(
+            lambda chunk: self.pdb_query("poc", net_id__in=chunk),
+            chunks,
+            self.provider_workers("pdb"),
+        ):
+            for contact in chunk:
+                contacts[contact["id"]] = contact
+        result = []
+        for contact in sorted(contacts.values(), key=lambda x: (x["net_id"], x["id"])):
+            selected = (
+                "Role: " + contact["role"],
+                "Name: " + contact["name"],
+                "Phone: " + contact["phone"],
+                "Email: " + contact["email"],
+                "URL " + contact["url"],
+            )
+            result.append(selected)
+        return result
+
+    def pdb_ixps_by_cc(self, ccode):
+        """
+        Return IXPs by country code iso-3166-1 alpha-2 from PeeringDB.
+
+        Args:
+            ccode (str): Country code iso-3166-1 alpha-2.
+
+        Returns:
+            list: List of IXPs in the specified country.
+        """
+        result = []
+        for each in self.pdb_query("ix", country=ccode):
+            selected = (
+                "Name: " + each["name"],
+                "Long_name: " + each["name_long"],
+                "City: " + each["city"],
+                "Country: " + each["country"],
+                "Continent: " + each["region_continent"],
+                "Notes: " + each["notes"],
+                "Unicast: " + str(each["proto_unicast"]),
+                "Multicast: " + str(each["proto_multicast"]),
+                "IPv6: " + str(each["proto_ipv6"]),
+                "URL: " + each["website"],
+                "URL Stats: " + each["url_stats"],
+                "Tech Email: " + each["tech_email"],
+                "Tech Phone: " + each["tech_phone"],
+                "Policy Email: " + each["policy_email"],
+                "Policy Phone: " + each["policy_phone"],
+                "Networks[ASN]: " + str(each["net_count"]),
+            )
+            result.append(selected)
+        return result
@@ -0,0 +1,589 @@
+"""
+Peering Buddy - RIPEstat and RIPE RIS (looking glass, RIS Live) provider methods.
+"""
+
+# pylint: disable=no-member, too-many-locals, too-many-nested-blocks, duplicate-code
+
+import contextlib
+import json
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pbuddy.asgraph import AsGraph
+from pbuddy.aspath import AsPathStore
+from pbuddy.config import RIS_LIVE_URL, STREAM_CHUNK_SIZE, TRANSIENT_PENDING
+from pbuddy.memo import memoized
+from pbuddy.rislive import WEBSOCKET_CLIENT, RouteTable, live_messages, replay_messages
+
+
+class Ripe:
+    """
+    RIPEstat/RIPE RIS methods of PBuddy (ripe_*, ris_*), AS path analytics
+    crossing them with BGPView included.
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def ripe_asn_visibility(self, asn):
+        """
+        Retrieves ASN visibility using RIPE RIS.
+
+        Parameters:
+            asn (int): The ASN to check visibility for.
+
+        Returns:
+            dict: A dictionary containing visibility percentages for each AFI.
+        """
+        url = f"https://stat.ripe.net/data/routing-status/data.json?resource=AS{asn}"
+        visibility_dict = {}
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+            for afi in result["visibility"]:
+                visibility_perc = (
+                    result["visibility"][afi]["ris_peers_seeing"]
+                    / result["visibility"][afi]["total_ris_peers"]
+                ) * 100
+                visibility_dict[afi] = visibility_perc
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return visibility_dict
+
+    @memoized
+    def ripe_ris_peers(self, asn):
+        """
+        Retrieves the number of RIPE RIS peers per AFI.
+
+        Parameters:
+            asn (int): The ASN whose routing status is queried.
+
+        Returns:
+            dict: Total RIS peers for each AFI.
+        """
+        url = f"https://stat.ripe.net/data/routing-status/data.json?resource=AS{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            visibility = data["data"]["visibility"]
+            peers = {afi: visibility[afi]["total_ris_peers"] for afi in visibility}
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return peers
+
+    @memoized
+    def ripe_asn_announced_pfx(self, asn):
+        """
+        Retrieves announced prefixes to the internet using RIPE RIS.
+
+        Parameters:
+            asn (int): The ASN to retrieve announced prefixes for.
+
+        Returns:
+            list: A list of announced prefixes for the specified ASN.
+        """
+        if self.mrt is not None:
+            return sorted(self.mrt.origin_prefixes(asn))
+        url = (
+            f"https://stat.ripe.net/data/announced-prefixes/data.json?resource=AS{asn}"
+        )
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            pfxs = []
+            for each in data["data"]["prefixes"]:
+                pfxs.append(each["prefix"])
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return sorted(pfxs)
+
+    def ripe_vrp_check(self, asn, pfx):
+        """
+        Checks ASN and prefix ROA validation using RIPE RIS.
+
+        Parameters:
+            asn (int): The ASN to check ROA validation for.
+            pfx (str): The prefix to check ROA validation for.
+
+        Returns:
+            str: The validity status of the ASN and prefix ROA.
+        """
+        if self.vrps is not None:
+            return self.vrps.validate(asn, pfx)
+        url = f"https://stat.ripe.net/data/rpki-validation/data.json?resource={asn}&prefix={pfx}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            try:
+                vrp = data["data"]["validating_roas"][0]["validity"]
+            except IndexError:
+                vrp = data["data"]["status"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return vrp
+
+    def ripe_ris_lg(self, pfx, field):
+        """
+        Retrieves RIPE RIS looking glass data for a given prefix.
+
+        Not memoized, the answers of every prefix would be kept for the whole
+        run: a second crawl (e.g. -tu after -pa) reads the response cache.
+
+        Parameters:
+            pfx (str): The prefix to retrieve looking glass data for.
+            field (str): The field to filter the data on.
+
+        Returns:
+            dict: A dictionary containing the filtered looking glass data.
+                If no field is provided, returns the raw looking glass data.
+        """
+        if self.mrt is not None:
+            rrcs = self.mrt.looking_glass(pfx)
+            if field:
+                return {
+                    ris["location"]: {pfx: [peer[field] for peer in ris["peers"]]}
+                    for ris in rrcs
+                }
+            return rrcs
+        url = f"https://stat.ripe.net/data/looking-glass/data.json?resource={pfx}"
+        response = self.http.get(url, stream=True)
+        if response.status_code == 200:
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+            if field:
+                locations = {}
+                attributes = {}
+                for path, value in self.stream_json(
+                    chunks,
+                    ("data", "rrcs", "*", "location"),
+                    ("data", "rrcs", "*", "peers", "*", field),
+                ):
+                    if path[3] == "location":
+                        locations[path[2]] = value
+                    else:
+                        attributes.setdefault(path[2], []).append(value)
+                filtered = {}
+                for ris, location in sorted(locations.items()):
+                    pfxattr = {}
+                    pfxattr[pfx] = attributes.get(ris, [])
+                    filtered[location] = pfxattr
+                result = filtered
+            else:
+                result = [
+                    ris for _, ris in self.stream_json(chunks, ("data", "rrcs", "*"))
+                ]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def ripe_aspth_length_overview(self, asn):
+        """
+        Retrieves AS-Path length overview for a given ASN.
+
+        Parameters:
+            asn (int): The ASN to retrieve AS-Path length overview for.
+
+        Returns:
+            tuple: A tuple containing the stripped and unstripped
+                max, min, and average AS-Path lengths.
+        """
+        url = f"https://stat.ripe.net/data/as-path-length/data.json?resource=AS{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            aspath_s_max = []
+            aspath_s_min = []
+            aspath_s_avg = []
+            aspath_u_max = []
+            aspath_u_min = []
+            aspath_u_avg = []
+            for each in data["data"]["stats"]:
+                aspath_s_max.append(each["stripped"]["max"])
+                aspath_s_min.append(each["stripped"]["min"])
+                aspath_s_avg.append(each["stripped"]["avg"])
+                aspath_u_max.append(each["unstripped"]["max"])
+                aspath_u_min.append(each["unstripped"]["min"])
+                aspath_u_avg.append(each["unstripped"]["avg"])
+            stripped_max = max(aspath_s_max)
+            stripped_min = min(aspath_s_min)
+            stripped_avg = round(self.list_avg(aspath_s_avg), 2)
+            unstripped_max = max(aspath_u_max)
+            unstripped_min = min(aspath_u_min)
+            unstripped_avg = round(self.list_avg(aspath_u_avg), 2)
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return (
+            stripped_max,
+            stripped_min,
+            stripped_avg,
+            unstripped_max,
+            unstripped_min,
+            unstripped_avg,
+        )
+
+    def ripe_aspath_length(self, asn, view, func, threshold):
+        """
+        Checks RIPE RIS detailed view for the ASN AS-Path length.
+
+        Parameters:
+            asn (int): The ASN to check AS-Path length for.
+            view (str): The view to retrieve AS-Path length for.
+            func (list): A list of functions to apply on the data.
+            threshold (dict): A dictionary containing threshold filters.
+
+        Returns:
+            list: A list containing location and AS-Path length information.
+        """
+        url = f"https://stat.ripe.net/data/as-path-length/data.json?resource=AS{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            aspathlength = []
+            for each in data["data"]["stats"]:
+                if func:
+                    control = None
+                    match = None
+                    for metric in func:
+                        if threshold[metric]:
+                            if each[view][metric] >= int(threshold[metric]):
+                                if control is not True or control is None:
+                                    match = True
+                            else:
+                                match = False
+                                control = True
+                    if match is True:
+                        aspathlength.append(each["location"])
+                        aspathlength.append(each[view])
+                else:
+                    aspathlength.append(each["location"])
+                    aspathlength.append(each[view])
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return aspathlength
+
+    def ripe_asn_resources_overview(self, asn):
+        """
+        Retrieves ASN public resources overview.
+
+        Parameters:
+            asn (int): The ASN to retrieve public resources overview for.
+
+        Returns:
+            dict: A dictionary containing public resources overview data.
+        """
+        url = f"https://stat.ripe.net/data/routing-status/data.json?resource=AS{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            result = data["data"]
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    def ripe_asn_announces_consistency(self, asn):
+        """
+        Checks the consistency of ASN announces.
+
+        RPKI, BGPView and IPInfo lookups for all prefixes are issued concurrently
+        (bounded per provider), then every prefix is classified once its inputs are in.
+
+        Parameters:
+            asn (int): The ASN to check consistency for.
+
+        Returns:
+            list: A list containing information about the consistency of the ASN announces.
+        """
+        url = f"https://stat.ripe.net/data/as-routing-consistency/data.json?resource=AS{asn}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            prefixes = data["data"]["prefixes"]
+            with (
+                ThreadPoolExecutor(self.provider_workers("ripe")) as ripe_pool,
+                ThreadPoolExecutor(self.provider_workers("bv")) as bv_pool,
+                ThreadPoolExecutor(self.provider_workers("ii")) as ii_pool,
+            ):
+                vrps = [
+                    ripe_pool.submit(self.ripe_vrp_check, asn, each["prefix"])
+                    for each in prefixes
+                ]
+                bv_whois = {
+                    bv_pool.submit(self.bv_pfx_whois, each["prefix"]): each["prefix"]
+                    for each in prefixes
+                    if each["in_whois"] is False
+                }
+                retried = {}
+                ii_whois = {}
+                for future in as_completed(bv_whois):
+                    prefix = bv_whois[future]
+                    retrywhois = future.result()
+                    try:
+                        bvasn = retrywhois["asns"][0]["asn"]
+                        retried[prefix] = bvasn == int(asn)
+                    except IndexError:
+                        ipnet = str(prefix).split("/")
+                        ii_whois[prefix] = ii_pool.submit(self.ii_ip_whois, ipnet[0])
+                for prefix, future in ii_whois.items():
+                    org = future.result()["org"]
+                    orgitems = str(org).split()
+                    iiasn = orgitems[0].strip("AS")
+                    retried[prefix] = iiasn == asn
+                vrps = [future.result() for future in vrps]
+            acons = []
+            for each, vrp in zip(prefixes, vrps):
+                whois = each["in_whois"]
+                if retried.get(each["prefix"]) is True:
+                    whois = True
+                result = self.announce_consistency_result(
+                    each["prefix"], whois, each["irr_sources"], each["in_bgp"], vrp
+                )
+                acons.append(result)
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return acons
+
+    def ripe_expand_asset(self, asset):
+        """
+        Expand AS-SET. (Deprecated)
+
+        Args:
+            asset (str): AS-SET to expand.
+
+        Returns:
+            dict: Expanded AS-SET information.
+        """
+        url = f"https://rest.db.ripe.net/search.json?query-string={asset}&type-filter=as-set&flags=no-referenced&flags=no-irt"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = self.loads(response)
+            objects = data["objects"]["object"]
+            result = []
+            result_dict = {}
+            for obj in objects:
+                for attribute in obj["attributes"]["attribute"]:
+                    if attribute["name"] == "members":
+                        result.append(attribute["value"])
+            result_dict[asset] = result
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result_dict
+
+    def ripe_lg_observations(self, prefixes_lgs):
+        """
+        Flatten looking glass AS paths per location, padded per prefix.
+
+        Args:
+            prefixes_lgs (list): ripe_ris_lg(prefix, "as_path") results.
+
+        Yields:
+            tuple: (location, prefix, AS paths list).
+        """
+        for lgs in prefixes_lgs:
+            size = []
+            for ris in lgs:
+                size.append(len(ris))
+            msize = max(size)
+            for ris in lgs:
+                location = f"{ris:<{msize}}"
+                nlri = lgs[ris]
+                for pfx in nlri:
+                    yield location, pfx, nlri[pfx]
+
+    @memoized
+    def ripe_as_graph(self, asn):
+        """
+        Build the AS adjacency graph of the AS paths seen on the RIPE RIS
+        looking glass for the ASN prefixes.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            AsGraph: The graph, edges weighted by observations.
+        """
+        store = AsPathStore()
+        prefixes = self.ripe_asn_announced_pfx(asn)
+        for lgs in self.concurrent_imap(
+            lambda prefix: self.ripe_ris_lg(prefix, "as_path"), prefixes
+        ):
+            store.extend(self.ripe_lg_observations([lgs]))
+        return AsGraph.from_store(store)
+
+    def ris_live_table(self, asn):
+        """
+        Build a route table of the ASN prefixes, seeded with the RIPE RIS
+        looking glass current routes, to be kept up to date by RIS Live.
+
+        Args:
+            asn (str): ASN number.
+
+        Returns:
+            RouteTable: The seeded table.
+        """
+        table = RouteTable()
+        if self.mrt is None:
+            table.total_peers = self.ripe_ris_peers(asn)
+        prefixes = self.ripe_asn_announced_pfx(asn)
+        for prefix, rrcs in zip(
+            prefixes,
+            self.concurrent_imap(
+                lambda prefix: self.ripe_ris_lg(prefix, None), prefixes
+            ),
+        ):
+            table.seed(prefix, rrcs)
+        table.updates = 0
+        return table
+
+    def ris_live_messages(self, asn, table, replay=None):
+        """
+        Return the RIS Live messages following the ASN routes.
+
+        Args:
+            asn (str): ASN number.
+            table (RouteTable): The seeded table (its prefixes get followed).
+            replay (str): Optional replay file (one JSON message per line) read instead of the websocket.
+
+        Returns:
+            iterator: The messages.
+        """
+        if replay is not None:
+            return replay_messages(replay)
+        if WEBSOCKET_CLIENT is False:
+            print("ERROR | RIS Live needs websocket-client, which is not installed.")
+            sys.exit(1)
+        return live_messages(RIS_LIVE_URL, asn, table.announced(asn))
+
+    def ripe_bv_pfxs_aspath_length(self, asn, threshold, asprepend):
+        """
+        Check AS paths of the ASN prefixes, prefix by prefix, as soon as each
+        looking glass answer is in.
+
+        Args:
+            asn (str): ASN number.
+            threshold (int): Threshold value for AS path length.
+            asprepend (str): Whether to consider AS path prepending.
+
+        Yields:
+            tuple: aspath_length() result for a prefix (matched AS paths, first,
+                second, third and direct ASNs, resets), to be added up with
+                AsPathCounters.
+        """
+        prefixes = self.ripe_asn_announced_pfx(asn)
+        for lgs in self.concurrent_imap(
+            lambda prefix: self.ripe_ris_lg(prefix, "as_path"), prefixes
+        ):
+            yield self.aspath_length(
+                self.ripe_lg_observations([lgs]), threshold, asprepend
+            )
+
+    def ripe_bv_upstreams_transient_path(self, asn):
+        """
+        Check ASN upstreams on transient paths, path by path.
+
+        Upstreams are the BGPView ones seen as direct ASNs, so a path crossing
+        an upstream not seen as direct yet is held back (with the ones after it,
+        keeping the order) until it is, or until every prefix is checked. Past
+        TRANSIENT_PENDING held paths, the next ones wait on a temporary file
+        until every prefix is checked, so memory stays bound.
+
+        Args:
+            asn (str): ASN number.
+
+        Yields:
+            tuple: ((location, " | ", prefix, " | ", AS path), sorted upstreams
+                matched on the path, empty for non transient paths), to be added
+                up with TransientCounters.
+        """
+        upstreams = set(self.bv_asn_upstreams_asns(asn))
+        direct = set()
+        pending = deque()
+        with contextlib.ExitStack() as stack:
+            spill = None
+            for result in self.ripe_bv_pfxs_aspath_length(asn, 0, "n"):
+                direct.update(result[4])
+                for each in result[0]:
+                    aspath_l = each[-1].split()
+                    del aspath_l[-2:]
+                    match = upstreams.intersection(aspath_l)
+                    if spill is None and len(pending) >= TRANSIENT_PENDING:
+                        spill = stack.enter_context(
+                            tempfile.TemporaryFile("w+", encoding="utf-8")
+                        )
+                    if spill is None:
+                        pending.append((each, match))
+                    else:
+                        spill.write(json.dumps([each, sorted(match)]) + "\n")
+                while pending and pending[0][1] <= direct:
+                    each, match = pending.popleft()
+                    yield each, sorted(match)
+            for each, match in pending:
+                yield each, sorted(match & direct)
+            if spill is not None:
+                spill.seek(0)
+                for line in spill:
+                    each, match = json.loads(line)
+                    yield tuple(each), sorted(direct.intersection(match))
+
+    def ripe_bv_upstreams_transient_summary(self, counters):
+        """
+        Create upstreams on transient paths summary.
+
+        Args:
+            counters (TransientCounters): Counts of the checked AS paths.
+
+        Returns:
+            tuple: Lists of (upstream ASN, matches, total AS paths) and
+                (location, transient paths, total AS paths), most seen first.
+        """
+        transient_upstreams_d = [
+            (upstream, count, counters.full_aspaths[upstream])
+            for upstream, count in self.ranked_counts(
+                counters.aspaths, counters.upstreams
+            )
+        ]
+        locations_d = [
+            (location, count, counters.all_locations[location])
+            for location, count in self.ranked_counts(counters.locations)
+        ]
+        return transient_upstreams_d, locations_d
+
+    def ripe_bv_pfxs_aspath_length_summary(self, counters, nontransit, transit):
+        """
+        Create AS path summary.
+
+        Args:
+            counters (AsPathCounters): Counts of the matched AS paths.
+            nontransit (list): List of non-transit ASNs.
+            transit (list): List of transit ASNs.
+
+        Returns:
+            tuple: Tuple containing AS path summary.
+        """
+        first_asn_d = self.ranked_counts(counters.first_asn, sorted(counters.first_asn))
+        second_asn_d = self.ranked_counts(
+            counters.second_asn, sorted(counters.second_asn)
+        )
+        third_asn_d = self.ranked_counts(counters.third_asn, sorted(counters.third_asn))
+        nontransit_d = self.ranked_counts(counters.direct, sorted(set(nontransit)))
+        transit_d = self.ranked_counts(counters.direct, sorted(set(transit)))
+        locations_d = self.ranked_counts(counters.locations)
+        return (
+            locations_d,
+            first_asn_d,
+            second_asn_d,
+            third_asn_d,
+            nontransit_d,
+            transit_d,
+        )
@@ -0,0 +1,101 @@
+"""
+Peering Buddy - Team Cymru provider methods.
+"""
+
+# pylint: disable=no-member
+
+import os
+import re
+import socket
+import sys
+import time
+
+from pbuddy.bogons import FULLBOGONS, BogonIndex
+from pbuddy.config import CACHE_DIR, CACHE_TTL
+from pbuddy.memo import memoized
+
+
+class TeamCymru:
+    """
+    Team Cymru methods of PBuddy (tc_*): bogons lists and public looking glasses.
+
+    Resolved by PBuddy through the provider registry (pbuddy.providers),
+    self being the PBuddy object.
+    """
+
+    def tc_public_lg(self):
+        """
+        Use sentex.ca DNS entries to get public looking glass available. (Deprecated)
+
+        Returns:
+            dict: A dictionary containing the reverse DNS and IP addresses of available looking glasses.
+        """
+        lgs = {}
+        for i in range(1, 16):
+            hostname = "routeserver" + str(i) + ".sentex.ca"
+            try:
+                answer = socket.gethostbyname_ex(hostname)
+                rdns = answer[0]
+                ipaddr = answer[2]
+                lgs[rdns] = ipaddr
+            except socket.gaierror:
+                pass
+        return lgs
+
+    def tc_bogons_pfxs(self, url):
+        """
+        Return a list of bogons prefixes.
+
+        Args:
+            url (str): URL to fetch bogons prefixes.
+
+        Returns:
+            list: List of bogons prefixes.
+        """
+        url = f"{url}"
+        response = self.http.get(url)
+        if response.status_code == 200:
+            data = response.text
+            result = []
+            for line in data.splitlines():
+                if not re.match(r"^#", line) and not re.match(r"^\s*$", line):
+                    result.append(line)
+        else:
+            print("ERROR | HTTP status != 200")
+            sys.exit(1)
+        return result
+
+    @memoized
+    def tc_bogons_index(self, urls=FULLBOGONS):
+        """
+        Return the bogons lists compiled into a BogonIndex.
+
+        The compiled index is kept on disk next to the response cache, and
+        goes with it: without cache (-nc), on refresh (-rc) or with a
+        snapshot (recorded or replayed), it is compiled from the lists
+        fetched through the HTTP client.
+
+        Args:
+            urls (tuple): URLs of the bogons lists to compile.
+
+        Returns:
+            BogonIndex: The compiled bogons index.
+        """
+        path = None
+        if self.http.cache is not None and self.http.snapshot is None:
+            name = "-".join(os.path.basename(url).removesuffix(".txt") for url in urls)
+            path = os.path.join(CACHE_DIR, f"bogons-{name}.json")
+        if path is not None and self.http.cache_refresh is False:
+            try:
+                if time.time() - os.path.getmtime(path) < CACHE_TTL["tc"]:
+                    return BogonIndex.load(path)
+            except (OSError, ValueError):
+                pass
+        prefixes = []
+        for url in urls:
+            prefixes.extend(self.tc_bogons_pfxs(url))
+        index = BogonIndex.from_prefixes(prefixes)
+        if path is not None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            index.save(path)
+        return index
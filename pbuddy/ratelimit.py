@@ -0,0 +1,159 @@
+"""
+Peering Buddy - per-provider token bucket rate limiter shared across processes.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def retry_after(response, default):
+    """
+    Return how long to wait before retrying a rate-limited request.
+
+    Parameters:
+        response (requests.Response): The 429 response.
+        default (float): Seconds to wait when no valid Retry-After header is sent.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return default
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """
+    Token buckets per provider and credential type (e.g. pdb:anonymous).
+
+    Bucket state lives in a JSON file guarded by an exclusive lock file, so
+    every peering_buddy process running on the host draws from the same
+    budget. Requests wait for a token instead of failing, and a bucket can
+    be blocked for a while after a 429 (Retry-After), buckets without a rate
+    included.
+
+    Attributes:
+        path (str): Path to the JSON state file.
+        rates (dict): (requests, seconds) allowed per bucket key.
+    """
+
+    def __init__(self, state_dir, rates):
+        """
+        Initialize the RateLimiter object.
+
+        Args:
+            state_dir (str): Directory holding the shared state and lock files.
+            rates (dict): (requests, seconds) allowed per bucket key.
+
+        Returns:
+            None
+        """
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, "ratelimit.json")
+        self.rates = rates
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def locked_state(self):
+        """
+        Lock the shared state (threads and processes) and yield it.
+
+        The state dictionary is written back when the context exits.
+
+        Yields:
+            dict: Bucket state, key => [tokens, timestamp, blocked_until].
+        """
+        with self.lock, open(f"{self.path}.lock", "a", encoding="utf-8") as lockfile:
+            if fcntl is not None:
+                fcntl.flock(lockfile, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path, encoding="utf-8") as statefile:
+                        state = json.load(statefile)
+                except (OSError, ValueError):
+                    state = {}
+                yield state
+                tmp = f"{self.path}.{os.getpid()}"
+                with open(tmp, "w", encoding="utf-8") as statefile:
+                    json.dump(state, statefile)
+                os.replace(tmp, self.path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+    def take(self, key):
+        """
+        Try to take a token from a bucket.
+
+        Args:
+            key (str): Bucket key (provider:credential).
+
+        Returns:
+            float: 0 if a token was taken (or the bucket has no rate and is
+                not blocked), otherwise seconds to wait.
+        """
+        budget, seconds = self.rates.get(key, (None, None))
+        now = time.time()
+        with self.locked_state() as state:
+            tokens, stamp, blocked = state.get(key, [budget, now, 0])
+            if blocked > now:
+                return blocked - now
+            if budget is None:
+                return 0
+            tokens = min(budget, tokens + (now - stamp) * budget / seconds)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) * seconds / budget
+            state[key] = [tokens, now, blocked]
+        return wait
+
+    def acquire(self, key):
+        """
+        Wait until a bucket has a token, then take it.
+
+        Args:
+            key (str): Bucket key (provider:credential).
+
+        Returns:
+            float: Total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self.take(key)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def block(self, key, seconds):
+        """
+        Empty a bucket and block it for a while (e.g. after a 429).
+
+        Args:
+            key (str): Bucket key (provider:credential).
+            seconds (float): Seconds to block the bucket for.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        with self.locked_state() as state:
+            blocked = state.get(key, [0, now, 0])[2]
+            state[key] = [0, now, max(blocked, now + seconds)]
@@ -0,0 +1,294 @@
+"""
+Peering Buddy - prefix/path table kept up to date by RIS Live BGP updates.
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+import json
+from collections import Counter
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+WEBSOCKET_CLIENT = websocket is not None
+
+
+def format_path(path):
+    """
+    Format a RIS Live AS path, AS_SETs (nested lists) as {65001,65002}.
+
+    Args:
+        path (list): The path hops, ASNs or lists of ASNs.
+
+    Returns:
+        str: The AS path, hops separated by spaces.
+    """
+    return " ".join(
+        ("{" + ",".join(map(str, hop)) + "}" if isinstance(hop, list) else str(hop))
+        for hop in path
+    )
+
+
+def replay_messages(path):
+    """
+    Read RIS Live messages from a replay file, one JSON message per line.
+
+    Args:
+        path (str): Path to the replay file.
+
+    Yields:
+        dict: The messages.
+    """
+    with open(path, encoding="utf-8") as replay:
+        for line in replay:
+            if line.strip():
+                yield json.loads(line)
+
+
+def live_messages(url, asn, prefixes):
+    """
+    Read RIS Live messages from the websocket, subscribed to the paths
+    originated by an ASN and to its prefixes (withdrawals carry no path).
+
+    Args:
+        url (str): The RIS Live websocket URL.
+        asn (str): The origin ASN.
+        prefixes (list): The prefixes to follow, more specifics included.
+
+    Yields:
+        dict: The messages.
+    """
+    connection = websocket.create_connection(url)
+    try:
+        subscriptions = [{"path": f"{asn}$"}]
+        subscriptions += [{"prefix": pfx, "moreSpecific": True} for pfx in prefixes]
+        for subscription in subscriptions:
+            subscription["type"] = "UPDATE"
+            connection.send(json.dumps({"type": "ris_subscribe", "data": subscription}))
+        while True:
+            yield json.loads(connection.recv())
+    finally:
+        connection.close()
+
+
+class RouteTable:
+    """
+    Prefix -> peer -> AS path table, kept up to date by BGP updates.
+
+    Every announcement or withdrawal takes the replaced route out of the per
+    origin aggregates (visibility, prefixes, AS path lengths) and adds the
+    new one, so queries answer from the current state in constant time
+    instead of crawling the looking glass again.
+
+    Attributes:
+        routes (dict): {prefix: {(collector, peer IP): AS path}}.
+        locations (dict): Location name of each collector.
+        peers (dict): {"v4"/"v6": Counter of routes per (collector, peer IP)}.
+        total_peers (dict): RIS peers per family, when known (at least the peers seen).
+        origin_peers (dict): {origin ASN: {"v4"/"v6": Counter of routes per peer}}.
+        origin_prefixes (dict): {origin ASN: Counter of routes per prefix}.
+        lengths (dict): {origin ASN: Counter of AS path lengths, prepends stripped}.
+        updates (int): Announcements and withdrawals applied.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty RouteTable object.
+
+        Returns:
+            None
+        """
+        self.routes = {}
+        self.locations = {}
+        self.peers = {"v4": Counter(), "v6": Counter()}
+        self.total_peers = {}
+        self.origin_peers = {}
+        self.origin_prefixes = {}
+        self.lengths = {}
+        self.updates = 0
+
+    def account(self, pfx, peer, aspath, change):
+        """
+        Add (change=1) or take out (change=-1) a route of the aggregates.
+
+        Args:
+            pfx (str): The route prefix.
+            peer (tuple): (collector, peer IP).
+            aspath (str): The route AS path.
+            change (int): 1 or -1.
+
+        Returns:
+            None
+        """
+        hops = list(dict.fromkeys(aspath.split()))
+        origin = hops[-1] if hops else ""
+        afi = "v6" if ":" in pfx else "v4"
+        counters = (
+            (self.peers[afi], peer),
+            (self.origin_peers.setdefault(origin, {}).setdefault(afi, Counter()), peer),
+            (self.origin_prefixes.setdefault(origin, Counter()), pfx),
+            (self.lengths.setdefault(origin, Counter()), len(hops)),
+        )
+        for counter, key in counters:
+            counter[key] += change
+            if counter[key] <= 0:
+                del counter[key]
+        # Origins and families left without routes are dropped too.
+        if not self.origin_peers[origin][afi]:
+            del self.origin_peers[origin][afi]
+        if not self.origin_prefixes[origin]:
+            del self.origin_peers[origin]
+            del self.origin_prefixes[origin]
+            del self.lengths[origin]
+
+    def announce(self, collector, peer, pfx, aspath):
+        """
+        Apply an announcement, replacing the peer route of the prefix.
+
+        Args:
+            collector (str): The collector (e.g. RRC00).
+            peer (str): The peer IP.
+            pfx (str): The prefix.
+            aspath (str): The AS path.
+
+        Returns:
+            None
+        """
+        key = (collector, peer)
+        peers = self.routes.setdefault(pfx, {})
+        previous = peers.get(key)
+        if previous is not None:
+            self.account(pfx, key, previous, -1)
+        peers[key] = aspath
+        self.account(pfx, key, aspath, 1)
+        self.updates += 1
+
+    def withdraw(self, collector, peer, pfx):
+        """
+        Apply a withdrawal of the peer route of a prefix.
+
+        Args:
+            collector (str): The collector (e.g. RRC00).
+            peer (str): The peer IP.
+            pfx (str): The prefix.
+
+        Returns:
+            None
+        """
+        key = (collector, peer)
+        peers = self.routes.get(pfx, {})
+        previous = peers.pop(key, None)
+        if previous is not None:
+            self.account(pfx, key, previous, -1)
+            if not peers:
+                del self.routes[pfx]
+        self.updates += 1
+
+    def seed(self, pfx, rrcs):
+        """
+        Load the current routes of a prefix from the RIPE RIS looking glass.
+
+        Args:
+            pfx (str): The prefix.
+            rrcs (list): ripe_ris_lg(pfx, None) result.
+
+        Returns:
+            None
+        """
+        for ris in rrcs:
+            collector = ris["rrc"].upper()
+            self.locations[collector] = ris.get("location", collector)
+            for peer in ris["peers"]:
+                self.announce(collector, peer["peer"], pfx, peer["as_path"])
+
+    def apply(self, message):
+        """
+        Apply a RIS Live message (or its "data"), UPDATEs only.
+
+        Args:
+            message (dict): The message.
+
+        Returns:
+            int: The number of announcements and withdrawals applied.
+        """
+        data = message.get("data", message)
+        if data.get("type") != "UPDATE":
+            return 0
+        collector = data.get("host", "").split(".")[0].upper()
+        peer = data.get("peer", "")
+        applied = 0
+        aspath = format_path(data.get("path", []))
+        for announcement in data.get("announcements", []):
+            for pfx in announcement.get("prefixes", []):
+                self.announce(collector, peer, pfx, aspath)
+                applied += 1
+        for pfx in data.get("withdrawals", []):
+            self.withdraw(collector, peer, pfx)
+            applied += 1
+        return applied
+
+    def visibility(self, asn):
+        """
+        Return the share of RIS peers seeing at least one route of an ASN.
+
+        Args:
+            asn (str): The origin ASN.
+
+        Returns:
+            dict: Visibility percentage per AFI (v4, v6).
+        """
+        result = {}
+        seeing = self.origin_peers.get(str(asn), {})
+        for afi, peers in self.peers.items():
+            total = max(self.total_peers.get(afi, 0), len(peers))
+            if total:
+                result[afi] = len(seeing.get(afi, ())) / total * 100
+        return result
+
+    def announced(self, asn):
+        """
+        Return the prefixes an ASN currently originates.
+
+        Args:
+            asn (str): The origin ASN.
+
+        Returns:
+            list: The sorted prefixes.
+        """
+        return sorted(self.origin_prefixes.get(str(asn), ()))
+
+    def aspath_lengths(self, asn):
+        """
+        Return the AS path length (prepends stripped) aggregates of an ASN.
+
+        Args:
+            asn (str): The origin ASN.
+
+        Returns:
+            tuple: (paths, max, min, average length), None for an ASN without routes.
+        """
+        lengths = self.lengths.get(str(asn))
+        if not lengths:
+            return None
+        paths = lengths.total()
+        average = sum(length * count for length, count in lengths.items()) / paths
+        return paths, max(lengths), min(lengths), average
+
+    def looking_glass(self, pfx):
+        """
+        Return the current AS paths of a prefix, shaped as
+        ripe_ris_lg(pfx, "as_path").
+
+        Args:
+            pfx (str): The prefix.
+
+        Returns:
+            dict: {location: {prefix: [AS paths]}}.
+        """
+        result = {}
+        for (collector, _), aspath in sorted(self.routes.get(pfx, {}).items()):
+            location = self.locations.get(collector, collector)
+            result.setdefault(location, {pfx: []})[pfx].append(aspath)
+        return result
@@ -0,0 +1,154 @@
+"""
+Peering Buddy - offline RPKI origin validation (RFC 6811) from a local VRP export.
+"""
+
+import csv
+import ipaddress
+import json
+
+
+def parse_asn(asn):
+    """
+    Parse an ASN written as 65000, "65000" or "AS65000".
+
+    Parameters:
+        asn (int|str): The ASN.
+
+    Returns:
+        int: The ASN number.
+    """
+    return int(str(asn).upper().removeprefix("AS"))
+
+
+def parse_prefix(pfx):
+    """
+    Parse a prefix into its version, network address and length.
+
+    Parameters:
+        pfx (str): The prefix.
+
+    Returns:
+        tuple: (version, network address as int, prefix length).
+    """
+    network = ipaddress.ip_network(pfx, strict=False)
+    return network.version, int(network.network_address), network.prefixlen
+
+
+class VrpIndex:
+    """
+    VRP set indexed per address family and prefix length.
+
+    Every VRP is stored under its network bits (address >> host bits) on a
+    hash table per prefix length, so finding the VRPs covering a prefix is
+    one lookup per distinct VRP length shorter or equal to the prefix length,
+    walking the prefix tree from the root down.
+
+    Attributes:
+        tables (dict): {version: {length: {network_bits: [(asn, max_length)]}}}.
+        lengths (dict): {version: sorted VRP prefix lengths}.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty VrpIndex object.
+
+        Returns:
+            None
+        """
+        self.tables = {4: {}, 6: {}}
+        self.lengths = {4: [], 6: []}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a VRP export, rpki-client/routinator JSON ({"roas": [...]}) or CSV
+        (ASN,IP Prefix,Max Length[,Trust Anchor]).
+
+        Parameters:
+            path (str): Path to the VRP export.
+
+        Returns:
+            VrpIndex: The loaded index.
+        """
+        index = cls()
+        with open(path, encoding="utf-8") as vrpfile:
+            if vrpfile.read(1) in ("{", "["):
+                vrpfile.seek(0)
+                data = json.load(vrpfile)
+                roas = data["roas"] if isinstance(data, dict) else data
+                for roa in roas:
+                    index.add(roa["asn"], roa["prefix"], roa.get("maxLength"))
+            else:
+                vrpfile.seek(0)
+                for row in csv.reader(vrpfile):
+                    if (
+                        not row
+                        or not row[0].strip().upper().removeprefix("AS").isdigit()
+                    ):
+                        continue
+                    index.add(row[0], row[1], row[2] or None)
+        return index
+
+    def add(self, asn, pfx, max_length=None):
+        """
+        Add a VRP to the index.
+
+        Parameters:
+            asn (int|str): The authorized origin ASN.
+            pfx (str): The VRP prefix.
+            max_length (int): The VRP maxLength, defaults to the prefix length.
+
+        Returns:
+            None
+        """
+        version, address, length = parse_prefix(pfx)
+        bits = 32 if version == 4 else 128
+        max_length = int(max_length) if max_length else length
+        table = self.tables[version].get(length)
+        if table is None:
+            table = self.tables[version][length] = {}
+            self.lengths[version] = sorted(self.tables[version])
+        table.setdefault(address >> (bits - length), []).append(
+            (parse_asn(asn), max_length)
+        )
+
+    def validate(self, asn, pfx):
+        """
+        Validate a route origin against the VRP set (RFC 6811).
+
+        Parameters:
+            asn (int|str): The route origin ASN.
+            pfx (str): The route prefix.
+
+        Returns:
+            str: "valid", "invalid" or "unknown" (not covered by any VRP).
+        """
+        origin = parse_asn(asn)
+        version, address, length = parse_prefix(pfx)
+        bits = 32 if version == 4 else 128
+        covered = False
+        for vrp_length in self.lengths[version]:
+            if vrp_length > length:
+                break
+            vrps = self.tables[version][vrp_length].get(address >> (bits - vrp_length))
+            if vrps is None:
+                continue
+            covered = True
+            for vrp_asn, max_length in vrps:
+                if vrp_asn == origin and vrp_asn != 0 and length <= max_length:
+                    return "valid"
+        if covered:
+            return "invalid"
+        return "unknown"
+
+    def validate_many(self, routes):
+        """
+        Validate many (origin, prefix) pairs.
+
+        Parameters:
+            routes (iterable): (asn, prefix) pairs.
+
+        Returns:
+            list: The validity of each pair, in order.
+        """
+        return [self.validate(asn, pfx) for asn, pfx in routes]
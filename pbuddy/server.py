@@ -0,0 +1,455 @@
+"""
+Peering Buddy - local HTTP/JSON API server over a long-lived PBuddy.
+"""
+
+import contextlib
+import io
+import json
+import signal
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from pbuddy.aspath import AsPathCounters, TransientCounters
+from pbuddy.batch import ASN_RE, CHECKS
+from pbuddy.config import SERVER_HOST, SERVER_PORT
+
+# Parameter: (validation of (pbuddy, value), error message).
+PARAMS = {
+    "asn": (
+        lambda pbuddy, value: ASN_RE.match(value) is not None,
+        "Invalid ASN, please type the ASN without the suffix AS.",
+    ),
+    "prefix": (
+        lambda pbuddy, value: pbuddy.pfx_validation(value),
+        "Invalid prefix (v4/v6), please type prefix/mask.",
+    ),
+    "ip": (
+        lambda pbuddy, value: pbuddy.ip_validation(value),
+        "That's not a valid IP, please type the IP without the network mask.",
+    ),
+    "resource": (
+        lambda pbuddy, value: ASN_RE.match(value) is not None
+        or pbuddy.pfx_validation(value),
+        "That's not a valid ASN or prefix, please type the ASN without the suffix AS.",
+    ),
+    "threshold": (
+        lambda pbuddy, value: pbuddy.regex_validation("^[0-9]{1,2}$", value),
+        "That's not a valid integer, please type an integer from 1 to 2 digits.",
+    ),
+    "prepend": (
+        lambda pbuddy, value: pbuddy.regex_validation("^[yn]$", value),
+        "That's not a valid option, please type an y [yes] or n [no].",
+    ),
+    "cc": (
+        lambda pbuddy, value: pbuddy.regex_validation("^[a-zA-Z]{2}$", value),
+        "That's not a valid Country Code, please type the CC with two letters (IBAN Alpha-2).",
+    ),
+}
+
+
+def joined(items):
+    """
+    Join the printed pieces of each item, as the CLI prints them.
+
+    Parameters:
+        items (list): Tuples of pieces.
+
+    Returns:
+        list: One string per item.
+    """
+    return ["".join(map(str, item)) for item in items]
+
+
+def aspath_length_overview(pbuddy, asn):
+    """
+    -al answer: AS path length overview of an ASN.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        asn (str): ASN number.
+
+    Returns:
+        dict: Stripped and unstripped max, min and avg AS path lengths.
+    """
+    names = ("stripped_max", "stripped_min", "stripped_avg")
+    names += ("unstripped_max", "unstripped_min", "unstripped_avg")
+    return dict(zip(names, pbuddy.ripe_aspth_length_overview(asn)))
+
+
+def pfxs_aspath_length(pbuddy, asn, threshold, prepend):
+    """
+    -pa answer: AS paths of the ASN prefixes longer than a threshold, and
+    their summary.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        asn (str): ASN number.
+        threshold (str): AS path length threshold.
+        prepend (str): Whether to consider AS path prepending (y or n).
+
+    Returns:
+        dict: Matched AS paths and [ASN, count] rankings.
+    """
+    counters = AsPathCounters()
+    aspaths = []
+    for result in pbuddy.ripe_bv_pfxs_aspath_length(asn, threshold, prepend):
+        aspaths.extend(joined(result[0]))
+        counters.update(result)
+    nontransit, transit = pbuddy.bv_asn_transit(asn, counters.direct)
+    summary = pbuddy.ripe_bv_pfxs_aspath_length_summary(counters, nontransit, transit)
+    names = ("locations", "first_asn", "second_asn", "third_asn")
+    names += ("nontransit", "transit")
+    return {"aspaths": aspaths, **dict(zip(names, summary))}
+
+
+def upstreams_transient(pbuddy, asn):
+    """
+    -tu answer: ASN upstreams on transient paths.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        asn (str): ASN number.
+
+    Returns:
+        dict: Transient AS paths, [upstream, matches, total AS paths] and
+            [location, transient paths, total AS paths] rankings.
+    """
+    counters = TransientCounters()
+    aspaths = []
+    for item, match in pbuddy.ripe_bv_upstreams_transient_path(asn):
+        if match:
+            aspaths.append("".join(map(str, item)))
+        counters.update(item, match)
+    upstreams, locations = pbuddy.ripe_bv_upstreams_transient_summary(counters)
+    return {"aspaths": aspaths, "upstreams": upstreams, "locations": locations}
+
+
+def whois(pbuddy, resource):
+    """
+    -gw answer: BGPView whois of an ASN or a prefix.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        resource (str): ASN number or prefix.
+
+    Returns:
+        dict: The whois information.
+    """
+    if ASN_RE.match(resource) is not None:
+        return pbuddy.bv_asn_whois(resource)
+    return pbuddy.bv_pfx_whois(resource)
+
+
+def asset(pbuddy, asn):
+    """
+    -aa answer: the ASN AS-SET (PeeringDB), expanded.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        asn (str): ASN number.
+
+    Returns:
+        list: The expanded AS-SET.
+    """
+    return pbuddy.nlnog_expand_asset(pbuddy.pdb_asn_asset(asn)[0][asn])
+
+
+def resource_health_check(pbuddy, resource):
+    """
+    -rh answer: NLNOG IRR explorer health check of an ASN or a prefix.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        resource (str): ASN number or prefix.
+
+    Returns:
+        object: The health check.
+    """
+    resource_type = "asn" if ASN_RE.match(resource) is not None else "prefix"
+    return pbuddy.nlnog_resource_health_check(resource, resource_type)
+
+
+def bogons_check(pbuddy, prefix):
+    """
+    -bc answer: whether an IP or prefix is a (full) bogon.
+
+    Parameters:
+        pbuddy (PBuddy): The server PBuddy.
+        prefix (str): IP or prefix.
+
+    Returns:
+        bool: Whether it is a bogon.
+    """
+    return pbuddy.tc_bogons_index().contains(prefix)
+
+
+# Endpoint (the CLI long option): (parameters, function of (pbuddy, *parameters)
+# returning a JSON serializable result).
+ROUTES = {
+    "/asn-visibility": (("asn",), CHECKS["av"]),
+    "/asn-announced-pfxs": (
+        ("asn",),
+        lambda pbuddy, asn: pbuddy.ripe_asn_announced_pfx(asn),
+    ),
+    "/asn-roa-validation": (("asn",), CHECKS["ar"]),
+    "/looking-glass": (
+        ("prefix",),
+        lambda pbuddy, prefix: pbuddy.ripe_ris_lg(prefix, None),
+    ),
+    "/aspath-length-overview": (("asn",), aspath_length_overview),
+    "/asn-overview": (
+        ("asn",),
+        lambda pbuddy, asn: pbuddy.ripe_asn_resources_overview(asn),
+    ),
+    "/asn-announce-consistency": (("asn",), CHECKS["ac"]),
+    "/asn-pfxs-aspath-length": (("asn", "threshold", "prepend"), pfxs_aspath_length),
+    "/asn-upstreams-transient": (("asn",), upstreams_transient),
+    "/asn-upstreams": (("asn",), lambda pbuddy, asn: pbuddy.bv_asn_upstreams(asn)),
+    "/asn-downstreams": (
+        ("asn",),
+        lambda pbuddy, asn: pbuddy.bv_asn_downstreams(asn),
+    ),
+    "/whois": (("resource",), whois),
+    "/whois-ip": (("ip",), lambda pbuddy, ip: pbuddy.ii_ip_whois(ip)),
+    "/pdb-asn-info": (("asn",), CHECKS["ai"]),
+    "/pdb-asn-ips": (
+        ("asn",),
+        lambda pbuddy, asn: joined(pbuddy.pdb_asn_ixps_ips(asn)),
+    ),
+    "/pdb-asn-contact": (("asn",), lambda pbuddy, asn: pbuddy.pdb_asn_contacts(asn)),
+    "/pdb-ixp-bycc": (("cc",), lambda pbuddy, cc: pbuddy.pdb_ixps_by_cc(cc)),
+    "/pdb-ixp-pfxs": ((), lambda pbuddy: joined(pbuddy.pdb_ixps_pfxs())),
+    "/lgs": ((), lambda pbuddy: pbuddy.tc_public_lg()),
+    "/asset": (("asn",), asset),
+    "/resource-health-check": (("resource",), resource_health_check),
+    "/bogons-asn": ((), lambda pbuddy: pbuddy.ntt_bogons_asn()),
+    "/bogons-check": (("prefix",), bogons_check),
+}
+
+
+def listen_address(value):
+    """
+    Parse a -sv listen address.
+
+    Parameters:
+        value (str): [HOST:]PORT, empty for SERVER_HOST:SERVER_PORT.
+
+    Returns:
+        tuple: (host, port).
+
+    Raises:
+        ValueError: On an invalid port.
+    """
+    host, _, port = value.rpartition(":")
+    port = int(port) if port else SERVER_PORT
+    if not 0 < port < 65536:
+        raise ValueError(f"invalid port {port}")
+    return host.strip("[]") or SERVER_HOST, port
+
+
+class ThreadOutput:
+    """
+    sys.stdout proxy keeping what a request thread prints (the PBuddy error
+    messages preceding its sys.exit()) for its answer, output of the other
+    threads passing through.
+
+    Attributes:
+        stream (file): The wrapped output stream.
+    """
+
+    def __init__(self, stream):
+        """
+        Initialize the ThreadOutput object.
+
+        Args:
+            stream (file): The output stream to wrap.
+
+        Returns:
+            None
+        """
+        self.stream = stream
+        self.local = threading.local()
+
+    @contextlib.contextmanager
+    def capture(self):
+        """
+        Keep what the calling thread prints within the block.
+
+        Yields:
+            io.StringIO: The printed text.
+        """
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+    def write(self, text):
+        """
+        Write text to the calling thread capture, or to the stream.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The text length.
+        """
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        """
+        Flush the wrapped stream.
+
+        Returns:
+            None
+        """
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        """
+        Delegate everything else to the wrapped stream.
+
+        Args:
+            name (str): The attribute name.
+
+        Returns:
+            object: The stream attribute.
+        """
+        return getattr(self.stream, name)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    GET /<endpoint>?<parameters> handler, answering JSON ({"result"} or
+    {"error"}) from the server PBuddy, and the -st statistics on /metrics.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "peering_buddy"
+    # Idle keep-alive connections are dropped, so shutdown does not wait on them.
+    timeout = 10
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Answer a GET request.
+
+        Returns:
+            None
+        """
+        status, content_type, body = self.server.answer(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering every request from the same PBuddy, so
+    connection pools, rate limiter, response cache, parsed datasets (bogons,
+    VRPs, MRT dumps, PeeringDB mirror) and the memo stay warm across requests.
+
+    Attributes:
+        pbuddy (PBuddy): The PBuddy answering the requests.
+        output (ThreadOutput): sys.stdout while serving.
+    """
+
+    # server_close() waits for the requests in flight.
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, address, pbuddy):
+        """
+        Initialize the ApiServer object, listening on the address.
+
+        Args:
+            address (tuple): (host, port) to listen on.
+            pbuddy (PBuddy): The PBuddy answering the requests.
+
+        Returns:
+            None
+        """
+        if ":" in address[0]:
+            self.address_family = socket.AF_INET6
+        super().__init__(address, ApiHandler)
+        self.pbuddy = pbuddy
+        self.output = ThreadOutput(sys.stdout)
+
+    def answer(self, path):
+        """
+        Answer an API request.
+
+        Args:
+            path (str): The requested path and query string.
+
+        Returns:
+            tuple: (HTTP status, content type, body bytes).
+        """
+        parts = urlsplit(path)
+        if parts.path == "/metrics":
+            metrics = self.pbuddy.stats.prometheus()
+            return 200, "text/plain; version=0.0.4", metrics.encode()
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        status, answer = self.call(parts.path, query)
+        return status, "application/json", json.dumps(answer).encode()
+
+    def call(self, endpoint, query):
+        """
+        Call the PBuddy method of an endpoint, isolating its failures (the
+        sys.exit() of PBuddy on provider errors, requests errors, unexpected
+        payloads) into the answer.
+
+        Args:
+            endpoint (str): The endpoint (ROUTES key, / listing them).
+            query (dict): The query string parameters.
+
+        Returns:
+            tuple: (HTTP status, {"result"} or {"error"} answer).
+        """
+        if endpoint == "/":
+            return 200, {"result": {path: route[0] for path, route in ROUTES.items()}}
+        if endpoint not in ROUTES:
+            return 404, {"error": f"unknown endpoint {endpoint}"}
+        params, func = ROUTES[endpoint]
+        for param in params:
+            if param not in query:
+                return 400, {"error": f"missing parameter {param}"}
+            valid, message = PARAMS[param]
+            if not valid(self.pbuddy, query[param]):
+                return 400, {"error": message}
+        with self.output.capture() as output:
+            try:
+                result = func(self.pbuddy, *(query[param] for param in params))
+            except (SystemExit, OSError, ValueError, LookupError, TypeError) as error:
+                return 502, {"error": output.getvalue().strip() or repr(error)}
+        return 200, {"result": result}
+
+    def serve(self):
+        """
+        Serve requests until SIGTERM/SIGINT, then stop accepting new ones,
+        let the ones in flight finish and close the pooled connections.
+
+        Returns:
+            None
+        """
+
+        def stop(signum, frame):  # pylint: disable=unused-argument
+            # shutdown() waits for serve_forever(), running on this thread.
+            threading.Thread(target=self.shutdown).start()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, stop)
+        stdout, sys.stdout = sys.stdout, self.output
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            sys.stdout = stdout
+            self.pbuddy.http.close()
@@ -0,0 +1,156 @@
+"""
+Peering Buddy - snapshot archive of the provider responses of a run.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from pbuddy.cache import STORE_BLOCK_SIZE, CachingReader, cached_response, normalize_url
+
+
+class Snapshot:
+    """
+    Compressed, indexed archive of provider responses, recorded during a run
+    and replayed later instead of the providers.
+
+    Bodies are zlib compressed and indexed by normalized URL (and username),
+    in a single SQLite file, so a replayed run reads only what it asks for.
+
+    Attributes:
+        path (str): Path to the archive.
+        replay (bool): Whether responses are served from the archive (instead
+            of recorded on it).
+    """
+
+    def __init__(self, path, replay=False):
+        """
+        Initialize the Snapshot object.
+
+        Args:
+            path (str): Path to the archive (created when recording).
+            replay (bool): Whether to serve responses from the archive.
+
+        Returns:
+            None
+        """
+        if replay and not os.path.isfile(path):
+            raise FileNotFoundError(f"snapshot {path} not found")
+        self.path = path
+        self.replay = replay
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if replay:
+            return
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status INTEGER, body BLOB, "
+                "size INTEGER, recorded REAL)"
+            )
+
+    def key(self, url, auth=None):
+        """
+        Return the archive key for a request.
+
+        Args:
+            url (str): The requested URL.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            str: The archive key.
+        """
+        key = normalize_url(url)
+        if auth:
+            key = f"{key}|{auth[0]}"
+        return key
+
+    def lookup(self, url, auth=None):
+        """
+        Return the archived response of a request.
+
+        Args:
+            url (str): The requested URL.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            requests.Response: The archived response, None when not recorded.
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, body FROM responses WHERE key = ?",
+                (self.key(url, auth),),
+            ).fetchone()
+        if row is None:
+            return None
+        status, body = row
+        return cached_response(url, status, zlib.decompress(body))
+
+    def store(self, url, response, auth=None, body=None):
+        """
+        Record a response on the archive, replacing a previous one.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The response to record.
+            auth (tuple): Optional (username, password) used on the request.
+            body (file): Optional spooled body, compressed in blocks instead
+                of using response.content.
+
+        Returns:
+            None
+        """
+        if body is None:
+            size = len(response.content)
+            content = zlib.compress(response.content)
+        else:
+            size = 0
+            compressor = zlib.compressobj()
+            blocks = []
+            for block in iter(lambda: body.read(STORE_BLOCK_SIZE), b""):
+                size += len(block)
+                blocks.append(compressor.compress(block))
+            blocks.append(compressor.flush())
+            content = b"".join(blocks)
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(url, auth),
+                    url,
+                    response.status_code,
+                    content,
+                    size,
+                    time.time(),
+                ),
+            )
+
+    def tee(self, url, response, auth=None):
+        """
+        Make a streamed response record its body on the archive once read.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The streamed response.
+            auth (tuple): Optional (username, password) used on the request.
+
+        Returns:
+            requests.Response: The same response, reading through the archive.
+        """
+        if response.raw is None:
+            self.store(url, response, auth)
+        else:
+            response.raw = CachingReader(self, url, response, auth)
+        return response
+
+    def close(self):
+        """
+        Close the archive.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.db.close()
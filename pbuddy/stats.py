@@ -0,0 +1,694 @@
+"""
+Peering Buddy - run statistics: provider requests, cache lookups and stage timings.
+"""
+
+# pylint: disable=too-many-instance-attributes, too-many-locals, import-outside-toplevel
+
+import bisect
+import contextlib
+import functools
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+from pbuddy.config import STATS_BUCKETS, STATS_WINDOW
+from pbuddy.providers import url_provider
+
+STAGES = ("fetch", "parse", "aggregate", "render")
+CACHE_OUTCOMES = ("hit", "revalidated", "miss")
+DIGITS_RE = re.compile(r"[0-9]")
+
+
+def url_endpoint(url):
+    """
+    Map an URL to its provider endpoint, path segments holding numbers
+    (ASNs, prefixes, IPs) replaced by *.
+
+    Parameters:
+        url (str): The URL to map.
+
+    Returns:
+        str: The endpoint path (e.g. /data/looking-glass/data.json, /asn/*/upstreams).
+    """
+    segments = urlsplit(url).path.split("/")
+    return "/".join(
+        "*" if DIGITS_RE.search(segment) else segment for segment in segments
+    )
+
+
+def percentile(values, share):
+    """
+    Return the nearest-rank percentile of sorted values.
+
+    Parameters:
+        values (list): Sorted values.
+        share (float): The percentile, from 0 to 1.
+
+    Returns:
+        float: The percentile, 0 without values.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def label(**labels):
+    """
+    Format Prometheus labels.
+
+    Parameters:
+        **labels: Label names and values.
+
+    Returns:
+        str: The {name="value",...} labels.
+    """
+    escaped = {
+        name: str(value).replace("\\", "\\\\").replace('"', '\\"')
+        for name, value in labels.items()
+    }
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+
+class Stats:
+    """
+    Thread-safe counters of a run: provider requests per endpoint (statuses,
+    latencies, bytes, retries), response cache lookups and time per stage.
+
+    Stages are exclusive: a stage entered within another one (e.g. a body
+    chunk read while parsing a streamed answer) pauses it, so the time of
+    each thread is counted once. Stage seconds are summed over threads: the
+    aggregate stage is the time of worker threads out of the other stages,
+    plus the time of the main thread out of any stage (waiting for workers
+    being the "wait" stage, not reported).
+
+    Memory stays bounded in long running processes (server mode): latency
+    histograms are counted as requests come, percentiles are taken over the
+    last window requests of each endpoint, and the stage seconds of finished
+    threads are added up in retired.
+
+    Attributes:
+        buckets (tuple): Latency histogram upper bounds, in seconds.
+        window (int): Latencies kept per endpoint for the percentiles.
+        endpoints (dict): {(provider, endpoint): {"statuses", "latencies", "count", "sum", "max", "buckets", "bytes", "retries"}}.
+        cache (Counter): Response cache lookups per outcome (hit, revalidated, miss).
+        threads (list): (thread, thread_stages()) of every running thread timed.
+        retired (Counter): Stage seconds of the finished threads.
+        started (float): time.perf_counter() at the start of the run.
+        main (int): Identifier of the main thread (the one creating the object).
+    """
+
+    def __init__(self, buckets=STATS_BUCKETS, window=STATS_WINDOW):
+        """
+        Initialize an empty Stats object.
+
+        Args:
+            buckets (tuple): Latency histogram upper bounds, in seconds.
+            window (int): Latencies kept per endpoint for the percentiles.
+
+        Returns:
+            None
+        """
+        self.buckets = buckets
+        self.window = window
+        self.endpoints = {}
+        self.cache = Counter()
+        self.threads = []
+        self.retired = Counter()
+        self.started = time.perf_counter()
+        self.main = threading.get_ident()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def endpoint(self, url):
+        """
+        Return the counters of an URL endpoint, must be called holding the lock.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            dict: The endpoint counters.
+        """
+        key = (url_provider(url), url_endpoint(url))
+        counters = self.endpoints.get(key)
+        if counters is None:
+            counters = self.endpoints[key] = {
+                "statuses": Counter(),
+                "latencies": deque(maxlen=self.window),
+                "count": 0,
+                "sum": 0.0,
+                "max": 0.0,
+                # Requests per bucket, the last one past the upper bound.
+                "buckets": [0] * (len(self.buckets) + 1),
+                "bytes": 0,
+                "retries": 0,
+            }
+        return counters
+
+    def request(self, url, status, seconds, size=0):
+        """
+        Count a network request.
+
+        Args:
+            url (str): The requested URL.
+            status (int): The HTTP status code.
+            seconds (float): Time until the response (headers, and body unless streamed).
+            size (int): Body bytes read along with the response.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            counters = self.endpoint(url)
+            counters["statuses"][status] += 1
+            counters["latencies"].append(seconds)
+            counters["count"] += 1
+            counters["sum"] += seconds
+            counters["max"] = max(counters["max"], seconds)
+            counters["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+            counters["bytes"] += size
+
+    def retry(self, url):
+        """
+        Count a request queued again (after a 429).
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.endpoint(url)["retries"] += 1
+
+    def received(self, url, size):
+        """
+        Count streamed body bytes.
+
+        Args:
+            url (str): The requested URL.
+            size (int): Bytes read.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.endpoint(url)["bytes"] += size
+
+    def cache_lookup(self, outcome):
+        """
+        Count a response cache lookup.
+
+        Args:
+            outcome (str): hit, revalidated (304) or miss.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.cache[outcome] += 1
+
+    def thread_stages(self):
+        """
+        Return the stage stack and seconds of the calling thread, kept per
+        thread so timing a stage takes no lock.
+
+        Returns:
+            tuple: ([[stage, start], ...] stack, {stage: seconds}).
+        """
+        state = getattr(self.local, "state", None)
+        if state is None:
+            state = self.local.state = ([], {})
+            with self.lock:
+                # Threads come and go (server mode), finished ones are folded.
+                running = [(threading.current_thread(), state)]
+                for thread, stages in self.threads:
+                    if thread.is_alive():
+                        running.append((thread, stages))
+                    else:
+                        self.retired.update(stages[1])
+                self.threads = running
+        return state
+
+    def enter(self, state, name):
+        """
+        Enter a stage, pausing the current one.
+
+        Args:
+            state (tuple): thread_stages() of the calling thread.
+            name (str): The stage name.
+
+        Returns:
+            None
+        """
+        stack, seconds = state
+        now = time.perf_counter()
+        if stack:
+            current = stack[-1]
+            seconds[current[0]] = seconds.get(current[0], 0.0) + now - current[1]
+        stack.append([name, now])
+
+    def leave(self, state):
+        """
+        Leave the current stage, resuming the enclosing one.
+
+        Args:
+            state (tuple): thread_stages() of the calling thread.
+
+        Returns:
+            None
+        """
+        stack, seconds = state
+        now = time.perf_counter()
+        name, start = stack.pop()
+        seconds[name] = seconds.get(name, 0.0) + now - start
+        if stack:
+            stack[-1][1] = now
+
+    def tee(self, url, response):
+        """
+        Make a streamed response count its body bytes and read time (raw
+        readers without stream(), read as a whole, are left as they are).
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The streamed response.
+
+        Returns:
+            requests.Response: The same response, reading through the counters.
+        """
+        if hasattr(response.raw, "stream"):
+            response.raw = CountingReader(self, url, response.raw)
+        return response
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Count the time of the calling thread in a stage, pausing the
+        enclosing one.
+
+        Args:
+            name (str): The stage name.
+
+        Yields:
+            None
+        """
+        state = self.thread_stages()
+        self.enter(state, name)
+        try:
+            yield
+        finally:
+            self.leave(state)
+
+    def timed(self, name, func):
+        """
+        Wrap a function, its calls being counted in a stage.
+
+        Args:
+            name (str): The stage name.
+            func (callable): The function.
+
+        Returns:
+            callable: The timed function.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def timed_iter(self, name, iterator):
+        """
+        Count every step of an iterator in a stage.
+
+        Args:
+            name (str): The stage name.
+            iterator (iterator): The iterator.
+
+        Yields:
+            object: The iterator items.
+        """
+        state = self.thread_stages()
+        while True:
+            self.enter(state, name)
+            try:
+                item = next(iterator, StopIteration)
+            finally:
+                self.leave(state)
+            if item is StopIteration:
+                return
+            yield item
+
+    def summary(self):
+        """
+        Return the statistics as a JSON serializable dict.
+
+        Returns:
+            dict: Run, stages, cache and per provider/endpoint statistics.
+        """
+        with self.lock:
+            wall = time.perf_counter() - self.started
+            stages = dict.fromkeys(STAGES, 0.0)
+            main_staged = 0.0
+            threads = [(False, self.retired)]
+            threads += [
+                (thread.ident == self.main, seconds)
+                for thread, (_, seconds) in self.threads
+            ]
+            for main, seconds in threads:
+                for stage, value in dict(seconds).items():
+                    if stage in stages:
+                        stages[stage] += value
+                    if main:
+                        main_staged += value
+            stages["aggregate"] += max(0.0, wall - main_staged)
+            lookups = sum(self.cache.values())
+            endpoints = []
+            for (provider, endpoint), counters in sorted(self.endpoints.items()):
+                latencies = sorted(counters["latencies"])
+                statuses = counters["statuses"]
+                buckets = itertools.accumulate(counters["buckets"])
+                endpoints.append(
+                    {
+                        "provider": provider,
+                        "endpoint": endpoint,
+                        "requests": counters["count"],
+                        "statuses": {
+                            str(key): statuses[key] for key in sorted(statuses)
+                        },
+                        "errors": sum(
+                            count for key, count in statuses.items() if key >= 400
+                        ),
+                        "rate_limited": statuses.get(429, 0),
+                        "retries": counters["retries"],
+                        "bytes": counters["bytes"],
+                        "latency": {
+                            "sum": counters["sum"],
+                            "p50": percentile(latencies, 0.5),
+                            "p95": percentile(latencies, 0.95),
+                            "max": counters["max"],
+                            "buckets": dict(zip(map(str, self.buckets), buckets)),
+                        },
+                    }
+                )
+            return {
+                "timestamp": time.time(),
+                "wall": wall,
+                "stages": stages,
+                "cache": {
+                    **{outcome: self.cache[outcome] for outcome in CACHE_OUTCOMES},
+                    "hit_ratio": (
+                        (self.cache["hit"] + self.cache["revalidated"]) / lookups
+                        if lookups
+                        else 0.0
+                    ),
+                },
+                "endpoints": endpoints,
+            }
+
+    def report(self):
+        """
+        Return the statistics as a human readable report.
+
+        Returns:
+            str: The report, per provider and endpoint.
+        """
+        summary = self.summary()
+        lines = [f"=> Stats (wall {summary['wall']:.3f}s):"]
+        stages = summary["stages"]
+        lines.append(
+            "stages (s, busy time summed over threads): "
+            + ", ".join(f"{stage} {stages[stage]:.3f}" for stage in STAGES)
+        )
+        cache = summary["cache"]
+        lines.append(
+            f"cache: {cache['hit']} hits, {cache['revalidated']} revalidated, "
+            f"{cache['miss']} misses, hit ratio {cache['hit_ratio'] * 100:.1f}%"
+        )
+        header = ("provider", "endpoint", "requests", "errors", "429s", "retries")
+        header += ("p50 ms", "p95 ms", "max ms", "KiB")
+        row = "{:<8} {:<36} {:>8} {:>6} {:>5} {:>7} {:>8} {:>8} {:>8} {:>10}"
+        lines.append(row.format(*header))
+        providers = {}
+        for item in summary["endpoints"]:
+            latency = item["latency"]
+            lines.append(
+                row.format(
+                    item["provider"],
+                    item["endpoint"][-36:],
+                    item["requests"],
+                    item["errors"],
+                    item["rate_limited"],
+                    item["retries"],
+                    f"{latency['p50'] * 1000:.0f}",
+                    f"{latency['p95'] * 1000:.0f}",
+                    f"{latency['max'] * 1000:.0f}",
+                    f"{item['bytes'] / 1024:.1f}",
+                )
+            )
+            total = providers.setdefault(item["provider"], Counter())
+            for key in ("requests", "errors", "rate_limited", "retries", "bytes"):
+                total[key] += item[key]
+        for provider, total in sorted(providers.items()):
+            lines.append(
+                f"{provider}: {total['requests']} requests, {total['errors']} errors, "
+                f"{total['rate_limited']} 429s, {total['retries']} retries, "
+                f"{total['bytes'] / 1024:.1f} KiB"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """
+        Return the statistics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, for the node exporter textfile collector.
+        """
+        summary = self.summary()
+        metrics = {
+            "pbuddy_requests_total": (
+                "counter",
+                "Provider requests per HTTP status.",
+                [],
+            ),
+            "pbuddy_request_duration_seconds": (
+                "histogram",
+                "Provider request latency.",
+                [],
+            ),
+            "pbuddy_response_bytes_total": (
+                "counter",
+                "Provider response body bytes.",
+                [],
+            ),
+            "pbuddy_retries_total": (
+                "counter",
+                "Provider requests queued again after a 429.",
+                [],
+            ),
+            "pbuddy_cache_lookups_total": (
+                "counter",
+                "Response cache lookups per outcome.",
+                [],
+            ),
+            "pbuddy_stage_seconds_total": (
+                "counter",
+                "Time per stage, summed over threads.",
+                [],
+            ),
+            "pbuddy_run_seconds": ("gauge", "Wall time of the run.", []),
+            "pbuddy_last_run_timestamp_seconds": (
+                "gauge",
+                "End of the run (UNIX time).",
+                [],
+            ),
+        }
+        for item in summary["endpoints"]:
+            labels = {"provider": item["provider"], "endpoint": item["endpoint"]}
+            for status, count in item["statuses"].items():
+                metrics["pbuddy_requests_total"][2].append(
+                    f"pbuddy_requests_total{label(**labels, status=status)} {count}"
+                )
+            histogram = metrics["pbuddy_request_duration_seconds"][2]
+            latency = item["latency"]
+            for bound, count in latency["buckets"].items():
+                histogram.append(
+                    f"pbuddy_request_duration_seconds_bucket{label(**labels, le=bound)} {count}"
+                )
+            histogram.append(
+                f"pbuddy_request_duration_seconds_bucket{label(**labels, le='+Inf')} {item['requests']}"
+            )
+            histogram.append(
+                f"pbuddy_request_duration_seconds_sum{label(**labels)} {latency['sum']}"
+            )
+            histogram.append(
+                f"pbuddy_request_duration_seconds_count{label(**labels)} {item['requests']}"
+            )
+            metrics["pbuddy_response_bytes_total"][2].append(
+                f"pbuddy_response_bytes_total{label(**labels)} {item['bytes']}"
+            )
+            metrics["pbuddy_retries_total"][2].append(
+                f"pbuddy_retries_total{label(**labels)} {item['retries']}"
+            )
+        for outcome in CACHE_OUTCOMES:
+            metrics["pbuddy_cache_lookups_total"][2].append(
+                f"pbuddy_cache_lookups_total{label(outcome=outcome)} {summary['cache'][outcome]}"
+            )
+        for stage, seconds in summary["stages"].items():
+            metrics["pbuddy_stage_seconds_total"][2].append(
+                f"pbuddy_stage_seconds_total{label(stage=stage)} {seconds}"
+            )
+        metrics["pbuddy_run_seconds"][2].append(f"pbuddy_run_seconds {summary['wall']}")
+        metrics["pbuddy_last_run_timestamp_seconds"][2].append(
+            f"pbuddy_last_run_timestamp_seconds {summary['timestamp']}"
+        )
+        lines = []
+        for name, (kind, description, samples) in metrics.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Write the statistics to a file, atomically (so a scraper never reads
+        half of it): Prometheus text format for .prom files, JSON otherwise.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            None
+        """
+        if path.endswith(".prom"):
+            content = self.prometheus()
+        else:
+            content = json.dumps(self.summary(), indent=4) + "\n"
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, delete=False
+        ) as temporary:
+            temporary.write(content)
+        os.chmod(temporary.name, 0o644)
+        os.replace(temporary.name, path)
+
+
+class CountingReader:
+    """
+    Wrapper around a streamed response raw reader, counting the body bytes
+    and the time spent reading them (fetch stage).
+
+    Attributes:
+        raw (urllib3.response.HTTPResponse): The wrapped raw reader.
+    """
+
+    def __init__(self, stats, url, raw):
+        """
+        Initialize the CountingReader object.
+
+        Args:
+            stats (Stats): The run statistics.
+            url (str): The requested URL.
+            raw (urllib3.response.HTTPResponse): The raw reader.
+
+        Returns:
+            None
+        """
+        self.stats = stats
+        self.url = url
+        self.raw = raw
+
+    def stream(self, amt=None, decode_content=None):
+        """
+        Yield the body chunks, counting them.
+
+        Args:
+            amt (int): Chunk size.
+            decode_content (bool): Whether to decode the content encoding.
+
+        Yields:
+            bytes: Body chunks.
+        """
+        chunks = self.raw.stream(amt, decode_content=decode_content)
+        for chunk in self.stats.timed_iter("fetch", chunks):
+            self.stats.received(self.url, len(chunk))
+            yield chunk
+
+    def __getattr__(self, name):
+        """
+        Delegate everything else to the wrapped raw reader.
+
+        Args:
+            name (str): Attribute name.
+
+        Returns:
+            object: The raw reader attribute.
+        """
+        return getattr(self.raw, name)
+
+
+class TimedWriter:
+    """
+    Wrapper around an output stream, counting the writes in the render stage.
+
+    Attributes:
+        stream (file): The wrapped stream.
+    """
+
+    def __init__(self, stats, stream):
+        """
+        Initialize the TimedWriter object.
+
+        Args:
+            stats (Stats): The run statistics.
+            stream (file): The output stream.
+
+        Returns:
+            None
+        """
+        self.stats = stats
+        self.stream = stream
+
+    def write(self, text):
+        """
+        Write text, timed as the render stage.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: Characters written.
+        """
+        with self.stats.stage("render"):
+            return self.stream.write(text)
+
+    def flush(self):
+        """
+        Flush the stream, timed as the render stage.
+
+        Returns:
+            None
+        """
+        with self.stats.stage("render"):
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        """
+        Delegate everything else to the wrapped stream.
+
+        Args:
+            name (str): Attribute name.
+
+        Returns:
+            object: The stream attribute.
+        """
+        return getattr(self.stream, name)
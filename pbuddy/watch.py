@@ -0,0 +1,267 @@
+"""
+Peering Buddy - watch mode: poll ASNs on a schedule and report what changed.
+"""
+
+import hashlib
+import json
+import re
+import sys
+import time
+
+from pbuddy.batch import ASN_RE
+from pbuddy.config import WATCH_INTERVALS
+from pbuddy.server import ThreadOutput
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def visibility(pbuddy, asn):
+    """
+    Return the ASN visibility, rounded so float noise is not a change.
+
+    Parameters:
+        pbuddy (PBuddy): The watching PBuddy.
+        asn (str): ASN number.
+
+    Returns:
+        dict: Visibility percentage per AFI.
+    """
+    return {
+        afi: round(perc, 2) for afi, perc in pbuddy.ripe_asn_visibility(asn).items()
+    }
+
+
+def consistency(pbuddy, asn):
+    """
+    Return the -ac classification of every prefix of the ASN.
+
+    Parameters:
+        pbuddy (PBuddy): The watching PBuddy.
+        asn (str): ASN number.
+
+    Returns:
+        dict: {prefix: {"whois", "irr", "bgp", "rpki", "verdict"}}.
+    """
+    return {
+        item[1]: {
+            "whois": item[3],
+            "irr": item[5],
+            "bgp": item[7],
+            "rpki": item[9],
+            "verdict": ANSI_RE.sub("", item[10]).removeprefix(" => "),
+        }
+        for item in pbuddy.ripe_asn_announces_consistency(asn)
+    }
+
+
+def visibility_events(before, after):
+    """
+    Report the visibility changes, per AFI.
+
+    Parameters:
+        before (dict): Previous visibility().
+        after (dict): Current visibility().
+
+    Returns:
+        list: {"afi", "before", "after", "delta"} events.
+    """
+    return [
+        {
+            "afi": afi,
+            "before": before.get(afi),
+            "after": after.get(afi),
+            "delta": round(after.get(afi, 0.0) - before.get(afi, 0.0), 2),
+        }
+        for afi in sorted(before.keys() | after.keys())
+        if before.get(afi) != after.get(afi)
+    ]
+
+
+def announced_events(before, after):
+    """
+    Report the announced prefixes gained and lost.
+
+    Parameters:
+        before (list): Previously announced prefixes.
+        after (list): Announced prefixes.
+
+    Returns:
+        list: An {"added", "removed"} event.
+    """
+    return [
+        {
+            "added": sorted(set(after) - set(before)),
+            "removed": sorted(set(before) - set(after)),
+        }
+    ]
+
+
+def consistency_events(before, after):
+    """
+    Report the prefixes whose -ac classification changed.
+
+    Parameters:
+        before (dict): Previous consistency().
+        after (dict): Current consistency().
+
+    Returns:
+        list: {"prefix", "before", "after"} events, None for a prefix not
+            classified (before or after).
+    """
+    return [
+        {"prefix": prefix, "before": before.get(prefix), "after": after.get(prefix)}
+        for prefix in sorted(before.keys() | after.keys())
+        if before.get(prefix) != after.get(prefix)
+    ]
+
+
+# Dataset: (function of (pbuddy, asn) returning the normalized dataset,
+# function of (before, after) returning the change events).
+DATASETS = {
+    "visibility": (visibility, visibility_events),
+    "announced": (
+        lambda pbuddy, asn: pbuddy.ripe_asn_announced_pfx(asn),
+        announced_events,
+    ),
+    "consistency": (consistency, consistency_events),
+}
+
+
+def digest(value):
+    """
+    Hash a normalized dataset.
+
+    Parameters:
+        value (object): The JSON serializable dataset.
+
+    Returns:
+        str: The dataset digest.
+    """
+    content = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class Watcher:
+    """
+    Poll datasets of ASNs, each one once its freshness window expired, and
+    report only what changed since the previous poll.
+
+    A poll is a new run for PBuddy (its memo is cleared), its requests going
+    through the response cache: within a cache TTL nothing is fetched, past
+    it a conditional request revalidates the cached body. Datasets are hashed
+    once normalized, so an unchanged one costs a digest comparison.
+
+    Attributes:
+        pbuddy (PBuddy): The watching PBuddy.
+        intervals (dict): Freshness window (seconds) per dataset.
+        due (dict): {(asn, dataset): time.monotonic() of the next poll}.
+        state (dict): {(asn, dataset): (digest, dataset)} of the last poll.
+        output (ThreadOutput): sys.stdout while polling.
+    """
+
+    def __init__(self, pbuddy, asns, datasets, intervals=None):
+        """
+        Initialize the Watcher object, every dataset being due.
+
+        Args:
+            pbuddy (PBuddy): The watching PBuddy.
+            asns (list): ASN numbers.
+            datasets (list): Dataset names (DATASETS keys).
+            intervals (dict): Freshness window (seconds) per dataset, by
+                default WATCH_INTERVALS.
+
+        Returns:
+            None
+        """
+        self.pbuddy = pbuddy
+        self.intervals = intervals or WATCH_INTERVALS
+        self.due = dict.fromkeys(
+            ((asn, dataset) for asn in asns for dataset in datasets), 0.0
+        )
+        self.state = {}
+        # Polling threads print on their error, anything else printed while
+        # polling (provider worker threads) is kept out of the events.
+        self.output = ThreadOutput(sys.stderr)
+
+    def poll(self, key):
+        """
+        Fetch a dataset, isolating its failures (the sys.exit() of PBuddy on
+        provider errors, requests errors, unexpected payloads).
+
+        Args:
+            key (tuple): (asn, dataset).
+
+        Returns:
+            tuple: (key, normalized dataset, None) or (key, None, error).
+        """
+        asn, dataset = key
+        with self.output.capture() as output:
+            try:
+                if ASN_RE.match(asn) is None:
+                    raise ValueError("invalid ASN")
+                return key, DATASETS[dataset][0](self.pbuddy, asn), None
+            except (SystemExit, OSError, ValueError, LookupError, TypeError) as error:
+                return key, None, output.getvalue().strip() or repr(error)
+
+    def changes(self, key, value):
+        """
+        Compare a polled dataset with the previous poll, and keep it.
+
+        Args:
+            key (tuple): (asn, dataset).
+            value (object): The normalized dataset.
+
+        Returns:
+            list: The change events, none on the first poll (the baseline).
+        """
+        dataset = key[1]
+        value_digest = digest(value)
+        previous = self.state.get(key)
+        self.state[key] = value_digest, value
+        if previous is None or previous[0] == value_digest:
+            return []
+        return [
+            {"event": dataset, **event}
+            for event in DATASETS[dataset][1](previous[1], value)
+        ]
+
+    def cycle(self):
+        """
+        Poll the due datasets.
+
+        Returns:
+            list: The change (and error) events, a dataset seen for the first
+                time being the baseline of the next ones.
+        """
+        now = time.monotonic()
+        due = [key for key, when in self.due.items() if when <= now]
+        if not due:
+            return []
+        self.pbuddy.memo.clear()
+        stdout, sys.stdout = sys.stdout, self.output
+        try:
+            polls = self.pbuddy.concurrent_map(self.poll, due)
+        finally:
+            sys.stdout = stdout
+        stamp = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        events = []
+        for key, value, error in polls:
+            asn, dataset = key
+            self.due[key] = now + self.intervals[dataset]
+            if error is not None:
+                changes = [{"event": "error", "dataset": dataset, "error": error}]
+            else:
+                changes = self.changes(key, value)
+            events.extend({**stamp, "asn": asn, **change} for change in changes)
+        return events
+
+    def run(self):
+        """
+        Poll forever, sleeping until the next dataset is due.
+
+        Yields:
+            dict: The change (and error) events, as they come.
+        """
+        while self.due:
+            yield from self.cycle()
+            time.sleep(max(0.0, min(self.due.values()) - time.monotonic()))
@@ -6,10 +6,21 @@ Peering Buddy - Helping you dig data from internet for better decisions!
 """
 
 import argparse
+import atexit
 import json
 import sys
+import time
 
-from pbuddy.pbuddy import PBuddy
+from pbuddy.batch import CHECKS, read_asns, run_batch
+from pbuddy.config import (
+    BATCH_CHECKS,
+    BATCH_WORKERS,
+    GRAPH_TOP,
+    RIS_LIVE_REPORT,
+    SERVER_MEMO_TTL,
+    WATCH_INTERVALS,
+)
+from pbuddy.providers import ProviderError
 
 
 class CustomHelpFormatter(argparse.HelpFormatter):
@@ -75,6 +86,22 @@ def main():
         metavar="ASN",
         help="[RIPE] Check ASN RPKI/ROA validation for announced prefixes.",
     )
+    parser.add_argument(
+        "-vf",
+        "--vrp-file",
+        action="store",
+        dest="vrpfile",
+        metavar="FILE",
+        help="[RPKI] Validate -ar/-ac RPKI offline against a VRP export (rpki-client/routinator JSON or CSV).",
+    )
+    parser.add_argument(
+        "-mf",
+        "--mrt-file",
+        action="append",
+        dest="mrtfiles",
+        metavar="FILE",
+        help="[MRT] Answer RIPE RIS looking glass and announced prefixes (-lg/-pa/-tu/-ag...) from a local MRT TABLE_DUMP_V2 RIB dump (RIS bview, RouteViews RIB, gzip/bzip2 or not), once per dump.",
+    )
     parser.add_argument(
         "-lg",
         "--looking-glass",
@@ -164,6 +191,31 @@ def main():
         metavar="ASN",
         help="[RIPE][BGPView] Check ASN upstreams on transient paths.",
     )
+    parser.add_argument(
+        "-ag",
+        "--as-graph",
+        action="store",
+        dest="asgraph",
+        metavar=("ASN", "TARGET_ASN"),
+        help="[RIPE] Build the AS graph seen for ASN prefixes, get shortest path, ASNs in between and neighbours of TARGET_ASN.",
+        nargs=2,
+    )
+    parser.add_argument(
+        "-rl",
+        "--ris-live",
+        action="store",
+        dest="asn_rislive",
+        metavar="ASN",
+        help="[RIPE] Follow ASN routes on RIS Live, reporting visibility and AS-Path lengths as updates come in.",
+    )
+    parser.add_argument(
+        "-rr",
+        "--ris-live-replay",
+        action="store",
+        dest="rislivereplay",
+        metavar="FILE",
+        help="[RIPE] Read -rl RIS Live messages from a replay file (one JSON message per line) instead of the websocket.",
+    )
     parser.add_argument(
         "-gu",
         "--asn-upstreams",
@@ -235,6 +287,23 @@ def main():
         metavar="ASN",
         help="[PeeringDB] Get IXPs by Country Code [iso-3166-1 alpha-2].",
     )
+    parser.add_argument(
+        "-ps",
+        "--pdb-sync",
+        action="store",
+        dest="pdbsync",
+        metavar="DUMP_DIR",
+        nargs="?",
+        const="",
+        help="[PeeringDB] Sync the local PeeringDB mirror (optionally from a directory of <obj>.json dumps).",
+    )
+    parser.add_argument(
+        "-pm",
+        "--pdb-mirror",
+        action="store_true",
+        dest="pdbmirror",
+        help="[PeeringDB] Answer PeeringDB queries from the local mirror.",
+    )
     parser.add_argument(
         "-gl",
         "--lgs",
@@ -263,6 +332,46 @@ def main():
         dest="fbogonspfx6",
         help="[Team Cymrus] Get ip6 full (+unallocated) bogons list.",
     )
+    parser.add_argument(
+        "-bc",
+        "--bogons-check",
+        action="store",
+        dest="bogonscheck",
+        metavar="FILE",
+        help="[Team Cymrus] Check IPs/prefixes (one per line, - for stdin) against the full bogons lists.",
+    )
+    parser.add_argument(
+        "-bf",
+        "--batch-file",
+        action="store",
+        dest="batchfile",
+        metavar="FILE",
+        help="Run -bk checks for ASNs (one per line, - for stdin) over BATCH_WORKERS processes, one JSON record per ASN and check.",
+    )
+    parser.add_argument(
+        "-bk",
+        "--batch-checks",
+        action="store",
+        dest="batchchecks",
+        metavar="CHECKS",
+        help=f"Comma separated -bf checks among {','.join(CHECKS)} [default: {','.join(BATCH_CHECKS)}].",
+    )
+    parser.add_argument(
+        "-wa",
+        "--watch",
+        action="store",
+        dest="watchfile",
+        metavar="FILE",
+        help="Watch ASNs (one per line, - for stdin), polling -wk datasets every WATCH_INTERVALS seconds, one JSON event per change.",
+    )
+    parser.add_argument(
+        "-wk",
+        "--watch-datasets",
+        action="store",
+        dest="watchdatasets",
+        metavar="DATASETS",
+        help=f"Comma separated -wa datasets among {','.join(WATCH_INTERVALS)} [default: all].",
+    )
     parser.add_argument(
         "-ba",
         "--bogons-asn",
@@ -293,10 +402,116 @@ def main():
         dest="nonverbose",
         help="Remove human-like text to the output.",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        action="store",
+        dest="workers",
+        metavar="INTEGER",
+        help="Number of concurrent workers for per-prefix lookups [default: 8].",
+    )
+    parser.add_argument(
+        "-nc",
+        "--no-cache",
+        action="store_true",
+        dest="nocache",
+        help="Bypass the on-disk response cache.",
+    )
+    parser.add_argument(
+        "-rc",
+        "--refresh-cache",
+        action="store_true",
+        dest="refreshcache",
+        help="Revalidate/refetch every response and refresh the on-disk cache.",
+    )
+    parser.add_argument(
+        "-np",
+        "--numpy",
+        action="store_true",
+        dest="numpy",
+        help="Use the NumPy backend for -pa/-tu AS path analytics.",
+    )
+    parser.add_argument(
+        "-sr",
+        "--snapshot-record",
+        action="store",
+        dest="snapshotrecord",
+        metavar="FILE",
+        help="Record every provider response of the run on a snapshot archive.",
+    )
+    parser.add_argument(
+        "-sp",
+        "--snapshot-replay",
+        action="store",
+        dest="snapshotreplay",
+        metavar="FILE",
+        help="Serve every provider response from a -sr snapshot archive (offline, reproducible).",
+    )
+    parser.add_argument(
+        "-st",
+        "--stats",
+        action="store_true",
+        dest="stats",
+        help="Report provider requests (latency, bytes, retries, 429s), cache hits and stage timings on stderr.",
+    )
+    parser.add_argument(
+        "-sf",
+        "--stats-file",
+        action="store",
+        dest="statsfile",
+        metavar="FILE",
+        help="Write the -st statistics to FILE at exit, Prometheus textfile format for *.prom, JSON otherwise.",
+    )
+    parser.add_argument(
+        "-sv",
+        "--serve",
+        action="store",
+        nargs="?",
+        const="",
+        dest="serve",
+        metavar="ADDRESS",
+        help="Serve the PBuddy methods as a local HTTP/JSON API on [HOST:]PORT, keeping pools and caches warm [default: SERVER_HOST:SERVER_PORT].",
+    )
 
     args = parser.parse_args()
     options = all(value is True for value in vars(args).values())
-    pbuddy = PBuddy()
+    if args.snapshotrecord is not None and args.snapshotreplay is not None:
+        print("ERROR | -sr and -sp are mutually exclusive.")
+        sys.exit(1)
+    snapshot_file = args.snapshotrecord or args.snapshotreplay
+    # Imported once the arguments are valid, -h and usage errors not needing
+    # PBuddy, nor its HTTP client.
+    from pbuddy.pbuddy import PBuddy  # pylint: disable=import-outside-toplevel
+
+    try:
+        pbuddy = PBuddy(
+            cache=args.nocache is False,
+            pdb_mirror=args.pdbmirror,
+            vrp_file=args.vrpfile,
+            mrt_files=args.mrtfiles,
+            snapshot_file=snapshot_file,
+            snapshot_replay=args.snapshotreplay is not None,
+            memo_ttl=SERVER_MEMO_TTL if args.serve is not None else None,
+        )
+    except FileNotFoundError as error:
+        print(f"ERROR | {error}")
+        sys.exit(1)
+    pbuddy.http.cache_refresh = args.refreshcache
+    if args.stats is True or args.statsfile is not None:
+        from pbuddy.stats import TimedWriter  # pylint: disable=import-outside-toplevel
+
+        sys.stdout = TimedWriter(pbuddy.stats, sys.stdout)
+
+        def stats_report():
+            sys.stdout.flush()
+            if args.stats is True:
+                print(pbuddy.stats.report(), file=sys.stderr)
+            if args.statsfile is not None:
+                pbuddy.stats.dump(args.statsfile)
+
+        atexit.register(stats_report)
+    if args.numpy is True:
+        pbuddy.aspath_backend = "numpy"
 
     re_asn = "^[0-9]{0,9}$"
     re_cc = "^[a-zA-Z]{0,2}$"
@@ -306,6 +521,27 @@ def main():
     pfx_invalid = "Invalid prefix (v4/v6), please type prefix/mask."
     separator = "=" * 80
 
+    if args.workers is not None:
+        reworkers = pbuddy.regex_validation("^[1-9][0-9]{0,2}$", args.workers)
+        if reworkers is False:
+            print(
+                "That's not a valid integer, please type an integer from 1 to 3 digits."
+            )
+            sys.exit(1)
+        pbuddy.workers = int(args.workers)
+
+    if args.pdbsync is not None:
+        if args.nonverbose is False:
+            print(separator)
+            print("=> PeeringDB mirror sync:")
+            print(separator)
+        result = pbuddy.pdb_sync(args.pdbsync or None)
+        for obj, counters in result.items():
+            print(
+                f"{obj}: {counters['updated']} updated, {counters['deleted']} deleted"
+            )
+        if args.nonverbose is False:
+            print(separator)
     if args.asn_visibility is not None:
         reasn = pbuddy.regex_validation(re_asn, args.asn_visibility)
         if reasn is False:
@@ -664,6 +900,153 @@ def main():
             print("".join(map(str, item)))
         if args.nonverbose is False:
             print(separator)
+    if args.batchfile is not None:
+        checks = list(BATCH_CHECKS)
+        if args.batchchecks is not None:
+            checks = args.batchchecks.split(",")
+        if not checks or not set(checks).issubset(CHECKS):
+            print(
+                "That's not a valid list of checks, please pick among", ",".join(CHECKS)
+            )
+            sys.exit(1)
+        if args.batchfile == "-":
+            asns = read_asns(sys.stdin)
+        else:
+            with open(args.batchfile, encoding="utf-8") as asns_file:
+                asns = read_asns(asns_file)
+        pbuddy_options = {
+            "cache": args.nocache is False,
+            "pdb_mirror": args.pdbmirror,
+            "vrp_file": args.vrpfile,
+            "aspath_backend": pbuddy.aspath_backend,
+            "mrt_files": args.mrtfiles,
+            "snapshot_file": snapshot_file,
+            "snapshot_replay": args.snapshotreplay is not None,
+            "workers": pbuddy.workers,
+        }
+        for record in run_batch(asns, checks, BATCH_WORKERS, pbuddy_options):
+            print(json.dumps(record), flush=True)
+    if args.bogonscheck is not None:
+        if args.bogonscheck == "-":
+            resources = sys.stdin.read().split()
+        else:
+            with open(args.bogonscheck, encoding="utf-8") as resources_file:
+                resources = resources_file.read().split()
+        if args.nonverbose is False:
+            print(separator)
+            print("=> Bogons check (full bogons IPv4/IPv6):")
+            print(separator)
+        index = pbuddy.tc_bogons_index()
+        for resource, bogon in index.classify(resources):
+            if bogon is None:
+                print(resource, "is invalid")
+            elif bogon is True:
+                print(resource, "is bogon")
+            else:
+                print(resource, "is not bogon")
+        if args.nonverbose is False:
+            print(separator)
+    if args.asgraph is not None:
+        asn, target = args.asgraph
+        for each in (asn, target):
+            reasn = pbuddy.regex_validation(re_asn, each)
+            if reasn is False:
+                print(asn_invalid)
+                sys.exit(1)
+        if args.nonverbose is False:
+            print(separator)
+            print(
+                "=> AS graph of the AS paths seen for the ASN",
+                asn,
+                "prefixes, towards the ASN",
+                target,
+                ":",
+            )
+            print(separator)
+        graph = pbuddy.ripe_as_graph(asn)
+        print("Graph:", len(graph), "ASNs,", graph.edge_count(), "adjacencies")
+        print()
+        print(
+            "Shortest observed path from ASN",
+            target,
+            ":",
+            " ".join(map(str, graph.shortest_path(target, asn))),
+        )
+        print()
+        print(
+            "ASNs in between ASN",
+            asn,
+            "and ASN",
+            target,
+            ":",
+            graph.between(asn, target),
+        )
+        print()
+        print(
+            "Neighbours of ASN",
+            target,
+            "[ ASN:observations ]:",
+            [(":".join(map(str, item))) for item in graph.neighbours(target)],
+        )
+        print()
+        print(
+            "Most crossed ASNs towards ASN",
+            asn,
+            "[ ASN:betweenness ]:",
+            [
+                f"{item[0]}:{round(item[1], 2)}"
+                for item in graph.betweenness(asn)[:GRAPH_TOP]
+            ],
+        )
+        if args.nonverbose is False:
+            print(separator)
+    if args.asn_rislive is not None:
+        asn = args.asn_rislive
+        reasn = pbuddy.regex_validation(re_asn, asn)
+        if reasn is False:
+            print(asn_invalid)
+            sys.exit(1)
+        if args.nonverbose is False:
+            print(separator)
+            print("=> RIS Live routes of the ASN", asn, ":")
+            print(separator)
+        table = pbuddy.ris_live_table(asn)
+        messages = pbuddy.ris_live_messages(asn, table, args.rislivereplay)
+
+        def ris_live_report():
+            print(
+                "Updates applied:",
+                table.updates,
+                "| Prefixes announced:",
+                len(table.announced(asn)),
+            )
+            for afi, perc in table.visibility(asn).items():
+                print(f"Visibility for {afi}: {perc}%")
+            lengths = table.aspath_lengths(asn)
+            if lengths is not None:
+                print(
+                    "AS-Path length (prepends stripped) of",
+                    lengths[0],
+                    "paths, max:",
+                    lengths[1],
+                    "min:",
+                    lengths[2],
+                    "avg:",
+                    round(lengths[3], 2),
+                )
+            print(separator, flush=True)
+
+        ris_live_report()
+        report = time.monotonic() + RIS_LIVE_REPORT
+        try:
+            for message in messages:
+                table.apply(message)
+                if time.monotonic() >= report:
+                    ris_live_report()
+                    report = time.monotonic() + RIS_LIVE_REPORT
+        except KeyboardInterrupt:
+            pass
+        ris_live_report()
     if args.upstreams is not None:
         reasn = pbuddy.regex_validation(re_asn, args.upstreams)
         if reasn is False:
@@ -773,16 +1156,19 @@ def main():
                 ":",
             )
             print(separator)
-        result = pbuddy.ripe_bv_pfxs_aspath_length(asn, threshold, asprepend)
-        tuple_lpa = result[0]
-        first_asns = result[1]
-        second_asns = result[2]
-        third_asns = result[3]
-        nontransit = result[4]
-        transit = result[5]
-        direct = result[6]
+        from pbuddy.aspath import (  # pylint: disable=import-outside-toplevel
+            AsPathCounters,
+        )
+
+        counters = AsPathCounters()
+        for result in pbuddy.ripe_bv_pfxs_aspath_length(asn, threshold, asprepend):
+            for item in result[0]:
+                print("".join(map(str, item)))
+            sys.stdout.flush()
+            counters.update(result)
+        nontransit, transit = pbuddy.bv_asn_transit(asn, counters.direct)
         summary = pbuddy.ripe_bv_pfxs_aspath_length_summary(
-            tuple_lpa, first_asns, second_asns, third_asns, nontransit, transit, direct
+            counters, nontransit, transit
         )
         locations_d = summary[0]
         first_asn_d = summary[1]
@@ -895,30 +1281,20 @@ def main():
                 ":",
             )
             print(separator)
-        result = pbuddy.ripe_bv_upstreams_transient_path(args.asn_upstreamtransient)
-        transient_paths = result[0]
-        transient_ups = result[1]
-        aspaths = result[2]
-        full_aspaths = result[3]
-        all_locations = result[4]
-        locations = []
-        transient_upstreams = {}
-        for item in transient_paths:
-            print("".join(map(str, item)))
-            locations.append(item[0])
-        locations_u = pbuddy.list_unique(locations)
-        locations_dict = {}
-        for location in locations_u:
-            loc = locations.count(location)
-            locations_dict[location] = loc
-        asns_u = pbuddy.list_unique(transient_ups)
-        for each in asns_u:
-            rcount = aspaths.count(each[0])
-            transient_upstreams[each[0]] = rcount
-        transient_upstreams_d = sorted(
-            transient_upstreams.items(), reverse=True, key=lambda x: x[1]
+        from pbuddy.aspath import (  # pylint: disable=import-outside-toplevel
+            TransientCounters,
+        )
+
+        counters = TransientCounters()
+        for item, match in pbuddy.ripe_bv_upstreams_transient_path(
+            args.asn_upstreamtransient
+        ):
+            if match:
+                print("".join(map(str, item)), flush=True)
+            counters.update(item, match)
+        transient_upstreams_d, locations_d = pbuddy.ripe_bv_upstreams_transient_summary(
+            counters
         )
-        locations_d = sorted(locations_dict.items(), reverse=True, key=lambda x: x[1])
         if args.nonverbose is False:
             print(separator)
         print(
@@ -929,7 +1305,7 @@ def main():
         for item in transient_upstreams_d:
             upstreams_asn = item[0]
             upstreams_count = item[1]
-            total_upstreams_count = full_aspaths.count(upstreams_asn)
+            total_upstreams_count = item[2]
             upstreams_percentage = round(
                 100 * upstreams_count / total_upstreams_count, 2
             )
@@ -951,7 +1327,7 @@ def main():
         for place in locations_d:
             location = place[0]
             location_count = place[1]
-            total_location_count = all_locations.count(location)
+            total_location_count = place[2]
             location_percentage = round(100 * location_count / total_location_count, 2)
             print(
                 location,
@@ -966,6 +1342,48 @@ def main():
         if args.nonverbose is False:
             print(separator)
 
+    if args.watchfile is not None:
+        datasets = list(WATCH_INTERVALS)
+        if args.watchdatasets is not None:
+            datasets = args.watchdatasets.split(",")
+        if not datasets or not set(datasets).issubset(WATCH_INTERVALS):
+            print(
+                "That's not a valid list of datasets, please pick among",
+                ",".join(WATCH_INTERVALS),
+            )
+            sys.exit(1)
+        if args.watchfile == "-":
+            asns = read_asns(sys.stdin)
+        else:
+            with open(args.watchfile, encoding="utf-8") as asns_file:
+                asns = read_asns(asns_file)
+        # Imported here, watch mode relying on http.server (pbuddy.server).
+        from pbuddy.watch import Watcher  # pylint: disable=import-outside-toplevel
+
+        try:
+            for event in Watcher(pbuddy, asns, datasets).run():
+                print(json.dumps(event), flush=True)
+        except KeyboardInterrupt:
+            pass
+    if args.serve is not None:
+        # Imported here, http.server being of no use to the other options.
+        from pbuddy.server import (  # pylint: disable=import-outside-toplevel
+            ApiServer,
+            listen_address,
+        )
+
+        try:
+            host, port = listen_address(args.serve)
+            server = ApiServer((host, port), pbuddy)
+        except (OSError, ValueError) as error:
+            print(f"ERROR | {error}")
+            sys.exit(1)
+        if args.nonverbose is False:
+            print(separator)
+            print(f"=> API server listening on http://{host}:{port}/ (Ctrl-C to stop):")
+            print(separator, flush=True)
+        server.serve()
+
     if options is False:
         if len(sys.argv) == 1:
             parser.print_help(sys.stderr)
@@ -975,5 +1393,8 @@ def main():
 if __name__ == "__main__":
     try:
         main()
+    except ProviderError as error:
+        print(f"ERROR | {error}")
+        sys.exit(1)
     except KeyboardInterrupt:
         print("Interrupted")
@@ -0,0 +1,41 @@
+"""
+Peering Buddy - shared test fixtures.
+"""
+
+import pytest
+
+import pbuddy.pbuddy
+from benchmarks.fixtures import SIZES, Fixtures, StubTransport
+
+
+@pytest.fixture(name="stub")
+def fixture_stub():
+    """
+    Return the synthetic provider transport of the benchmark suite.
+
+    Returns:
+        StubTransport: The transport, serving small sized fixtures.
+    """
+    return StubTransport(Fixtures(SIZES["small"]))
+
+
+@pytest.fixture(name="pbuddy")
+def fixture_pbuddy(stub, tmp_path, monkeypatch):
+    """
+    Return a PBuddy served by the stub transport, keeping its state (rate
+    limits, mirror) in a temporary directory.
+
+    Args:
+        stub (StubTransport): The provider transport.
+        tmp_path (pathlib.Path): Temporary directory.
+        monkeypatch (pytest.MonkeyPatch): Patching helper.
+
+    Returns:
+        PBuddy: The PBuddy object.
+    """
+    monkeypatch.setattr(pbuddy.pbuddy, "CACHE_DIR", str(tmp_path))
+    buddy = pbuddy.pbuddy.PBuddy(cache=False)
+    buddy.http.adapter = stub
+    buddy.http.limiter = None
+    yield buddy
+    buddy.http.close()
@@ -0,0 +1,107 @@
+"""
+Peering Buddy - AS adjacency graph tests.
+"""
+
+import pytest
+
+from pbuddy import asgraph
+from pbuddy.asgraph import AsGraph
+
+PATHS = [
+    "64500 64510 64520",
+    "64500 64510 64510 64520",
+    "64501 64511 64520",
+    "64500 64512 64513 64520",
+    "64530",
+    "64531 64531",
+    "64500 {64540,64541} 64520",
+]
+
+
+@pytest.fixture(name="graph", params=[100000, 1])
+def fixture_graph(request, monkeypatch):
+    """
+    Return the graph of PATHS, parsed at once or one path at a time.
+
+    Args:
+        request (pytest.FixtureRequest): The GRAPH_BATCH parameter.
+        monkeypatch (pytest.MonkeyPatch): Patching helper.
+
+    Returns:
+        AsGraph: The graph.
+    """
+    monkeypatch.setattr(asgraph, "GRAPH_BATCH", request.param)
+    return AsGraph.from_paths(PATHS)
+
+
+def test_nodes_and_edges(graph):
+    """
+    Every plain ASN is a node, adjacencies are counted once per observation.
+    """
+    assert list(graph.asns) == [
+        64500,
+        64501,
+        64510,
+        64511,
+        64512,
+        64513,
+        64520,
+        64530,
+        64531,
+    ]
+    assert graph.edge_count() == 7
+    assert graph.neighbours(64510) == [(64500, 2), (64520, 2)]
+    assert graph.neighbours(64530) == []
+    assert graph.neighbours(65000) == []
+
+
+def test_shortest_path(graph):
+    """
+    Shortest paths prefer the most observed adjacencies.
+    """
+    assert graph.shortest_path(64500, 64520) == [64500, 64510, 64520]
+    assert graph.shortest_path("64520", "64501") == [64520, 64511, 64501]
+    assert graph.shortest_path(64530, 64530) == [64530]
+    assert graph.shortest_path(64531, 64500) == []
+    assert graph.shortest_path(65000, 64500) == []
+
+
+def test_between(graph):
+    """
+    ASNs on any shortest path are listed, closest to the source first.
+    """
+    assert graph.between(64501, 64500) == [64511, 64520, 64510]
+    assert graph.between(64530, 64530) == []
+    assert graph.between(64530, 64500) == []
+
+
+def test_betweenness(graph):
+    """
+    ASNs crossed towards an ASN are ranked by dependency.
+    """
+    assert graph.betweenness(64500) == [
+        (64510, 3.0),
+        (64520, 2.0),
+        (64511, 1.0),
+        (64512, 1.0),
+    ]
+
+
+def test_shortest_path_ties():
+    """
+    Among shortest paths of the same length, the most observed one wins,
+    whatever its ASNs and the heaviest first hop.
+    """
+    graph = AsGraph.from_counts(
+        {
+            "64600 64601 64603": 1,
+            "64600 64601": 4,
+            "64600 64602 64603": 4,
+            "64600 64604 64605 64606": 1,
+            "64600 64607 64608 64606": 2,
+        }
+    )
+    assert graph.shortest_path(64600, 64603) == [64600, 64602, 64603]
+    assert graph.shortest_path(64603, 64600) == [64603, 64602, 64600]
+    assert graph.shortest_path(64600, 64606) == [64600, 64607, 64608, 64606]
+    assert graph.between(64600, 64603) == [64601, 64602]
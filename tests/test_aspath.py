@@ -0,0 +1,182 @@
+"""
+Peering Buddy - AS path analytics tests.
+"""
+
+import pytest
+
+from pbuddy.aspath import (
+    AsPathCounters,
+    AsPathStore,
+    aspath_length,
+    aspath_length_numpy,
+)
+
+# ripe_ris_lg(prefix, "as_path") answers, prefix after prefix.
+LGS = [
+    {
+        "rrc00": {"192.0.2.0/24": ["3356 1299 64500", "3356 3356 174 64501 64500"]},
+        "rrc01": {"192.0.2.0/24": ["6939 64500 64500"]},
+    },
+    {"rrc00": {"198.51.100.0/24": ["64500", "3356 174 2914 64500"]}},
+]
+UPSTREAMS = {"1299", "2914", "6939"}
+
+
+def list_summary(first, second, third, direct, locations):
+    """
+    Summarize aspath_length() lists with list.count(), as -pa used to.
+
+    Args:
+        first (list): First ASNs.
+        second (list): Second ASNs.
+        third (list): Third ASNs.
+        direct (list): Direct ASNs.
+        locations (list): Location of each matched path.
+
+    Returns:
+        tuple: The ripe_bv_pfxs_aspath_length_summary() tuple.
+    """
+
+    def ranked(values, keys):
+        counts = {key: values.count(key) for key in keys}
+        return sorted(counts.items(), reverse=True, key=lambda x: x[1])
+
+    return (
+        ranked(locations, dict.fromkeys(locations)),
+        ranked(first, sorted(set(first))),
+        ranked(second, sorted(set(second))),
+        ranked(third, sorted(set(third))),
+        ranked(direct, sorted(set(direct) - UPSTREAMS)),
+        ranked(direct, sorted(set(direct) & UPSTREAMS)),
+    )
+
+
+def streamed_summary(pbuddy, threshold, asprepend):
+    """
+    Summarize aspath_length() runs prefix by prefix, as -pa does.
+
+    Args:
+        pbuddy (PBuddy): PBuddy served by the stub transport.
+        threshold (int): Minimum AS path length.
+        asprepend (str): "y" to keep prepends, "n" to strip them.
+
+    Returns:
+        tuple: The ripe_bv_pfxs_aspath_length_summary() tuple.
+    """
+    counters = AsPathCounters()
+    for lgs in LGS:
+        observations = pbuddy.ripe_lg_observations([lgs])
+        counters.update(aspath_length(observations, threshold, asprepend))
+    direct = set(counters.direct)
+    return pbuddy.ripe_bv_pfxs_aspath_length_summary(
+        counters, direct - UPSTREAMS, direct & UPSTREAMS
+    )
+
+
+def test_summary(pbuddy):
+    """
+    The -pa summary ranks locations, first/second/third and direct ASNs.
+    """
+    assert streamed_summary(pbuddy, 0, "n") == (
+        [("rrc00", 4), ("rrc01", 1)],
+        [("3356", 3), ("64500", 1), ("6939", 1)],
+        [("174", 1)],
+        [("2914", 1)],
+        [("64500", 1), ("64501", 1)],
+        [("1299", 1), ("2914", 1), ("6939", 1)],
+    )
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 3, 4, 5])
+@pytest.mark.parametrize("asprepend", ["y", "n"])
+def test_summary_matches_lists(pbuddy, threshold, asprepend):
+    """
+    Counting prefix by prefix ranks as the lists of the whole run did.
+    """
+    result = aspath_length(pbuddy.ripe_lg_observations(LGS), threshold, asprepend)
+    entries, first, second, third, direct, _ = result
+    locations = [entry[0] for entry in entries]
+    expected = list_summary(first, second, third, direct, locations)
+    assert streamed_summary(pbuddy, threshold, asprepend) == expected
+
+
+def test_store_round_trip():
+    """
+    Interned paths give back the original paths, hops and observations.
+    """
+    store = AsPathStore()
+    store.add("rrc00", "192.0.2.0/24", "3356 1299 64500")
+    store.extend(
+        [
+            ("rrc01", "192.0.2.0/24", ["3356 1299 64500", "6939 {64500,64501}"]),
+            ("rrc00", "198.51.100.0/24", ["64500 64500", "174 4294967295"]),
+        ]
+    )
+    assert store.paths == [
+        "3356 1299 64500",
+        "6939 {64500,64501}",
+        "64500 64500",
+        "174 4294967295",
+    ]
+    assert list(store.offsets) == [0, 3, 3, 5, 7]
+    assert list(store.hops) == [3356, 1299, 64500, 64500, 64500, 174, 4294967295]
+    assert store.raw == {1}
+    for path_id, aspath in enumerate(store.paths):
+        hops = " ".join(map(str, store.path_hops(path_id)))
+        assert hops == ("" if path_id in store.raw else aspath)
+    assert list(store) == [
+        ("rrc00", " | ", "192.0.2.0/24", " | ", "3356 1299 64500"),
+        ("rrc01", " | ", "192.0.2.0/24", " | ", "3356 1299 64500"),
+        ("rrc01", " | ", "192.0.2.0/24", " | ", "6939 {64500,64501}"),
+        ("rrc00", " | ", "198.51.100.0/24", " | ", "64500 64500"),
+        ("rrc00", " | ", "198.51.100.0/24", " | ", "174 4294967295"),
+    ]
+    assert store[-1] == store[4] == store[3:][1]
+    with pytest.raises(IndexError):
+        store[5]  # pylint: disable=pointless-statement
+
+
+@pytest.mark.parametrize(
+    "asprepend, paths",
+    [
+        (
+            "n",
+            ["3356 1299 64500", "3356 174 64501 64500", "6939 64500"],
+        ),
+        (
+            "y",
+            ["3356 1299 64500", "3356 3356 174 64501 64500", "6939 64500 64500"],
+        ),
+    ],
+)
+def test_store_prepends(pbuddy, asprepend, paths):
+    """
+    Matched paths are stored with or without their prepends.
+    """
+    observations = pbuddy.ripe_lg_observations(LGS[:1])
+    entries = aspath_length(observations, 2, asprepend)[0]
+    assert [entry[-1] for entry in entries] == paths
+    assert entries.paths == paths
+    assert [entry[0] for entry in entries] == ["rrc00", "rrc00", "rrc01"]
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 3, 4, 5])
+@pytest.mark.parametrize("asprepend", ["y", "n"])
+@pytest.mark.parametrize(
+    "lgs",
+    [
+        LGS,
+        LGS[1:] + LGS[:1],
+        [{"rrc02": {"203.0.113.0/24": ["6939 {64500,64501}", "3356 3356 64500"]}}],
+    ],
+    ids=["ordered", "reset-first", "as-set"],
+)
+def test_numpy_backend(pbuddy, lgs, threshold, asprepend):
+    """
+    The NumPy backend gives the aspath_length() result.
+    """
+    pytest.importorskip("numpy")
+    expected = aspath_length(pbuddy.ripe_lg_observations(lgs), threshold, asprepend)
+    result = aspath_length_numpy(pbuddy.ripe_lg_observations(lgs), threshold, asprepend)
+    assert list(result[0]) == list(expected[0])
+    assert result[1:] == expected[1:]
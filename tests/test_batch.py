@@ -0,0 +1,34 @@
+"""
+Peering Buddy - batch mode tests.
+"""
+
+import io
+
+from benchmarks.fixtures import ASN
+from pbuddy import batch
+
+
+def test_read_asns():
+    """
+    ASNs are read once each, AS prefixes, comments and blank lines aside.
+    """
+    source = io.StringIO("AS64500\n# comment\n\n64501 # inline\n64500\n")
+    assert batch.read_asns(source) == ["64500", "64501"]
+
+
+def test_run_check(pbuddy, monkeypatch):
+    """
+    Checks record their result or error, the worker memo only holding the
+    results of the ASN being checked.
+    """
+    monkeypatch.setattr(batch, "WORKER", {"pbuddy": pbuddy})
+    record = batch.run_check(str(ASN), "av")
+    assert record["asn"] == str(ASN) and "result" in record
+    shared = len(pbuddy.memo.results)
+    assert shared
+    batch.run_check(str(ASN), "ar")
+    assert len(pbuddy.memo.results) > shared
+    record = batch.run_check("AS64500", "av")
+    assert record["error"] == "ValueError('invalid ASN')"
+    batch.run_check("64496", "av")
+    assert all("64496" in repr(key) for key in pbuddy.memo.results)
@@ -0,0 +1,97 @@
+"""
+Peering Buddy - bogons index tests.
+"""
+
+import pytest
+
+from pbuddy.bogons import FULLBOGONS, BogonIndex, parse_resource
+from pbuddy.cache import ResponseCache
+from pbuddy.providers import teamcymru
+
+LISTS = {
+    FULLBOGONS[0]: ["0.0.0.0/8", "10.0.0.0/8", "100.64.0.0/10", "11.0.0.0/8"],
+    FULLBOGONS[1]: ["2001:db8::/32", "3ffe::/16"],
+}
+
+
+@pytest.fixture(name="bogons")
+def fixture_bogons(pbuddy, stub):
+    """
+    Serve LISTS as the Team Cymru fullbogons lists.
+
+    Args:
+        pbuddy (PBuddy): PBuddy served by the stub transport.
+        stub (StubTransport): The stub transport.
+
+    Returns:
+        PBuddy: The PBuddy object.
+    """
+    payload = stub.fixtures.payload
+
+    def bogons_payload(url):
+        if url in LISTS:
+            return "\n".join(["# fullbogons", ""] + LISTS[url]).encode()
+        return payload(url)
+
+    stub.fixtures.payload = bogons_payload
+    return pbuddy
+
+
+def test_parse_resource():
+    """
+    Addresses and prefixes are parsed into address ranges.
+    """
+    assert parse_resource("10.0.0.1") == (4, 0x0A000001, 0x0A000001)
+    assert parse_resource(" 10.0.0.1/8") == (4, 0x0A000000, 0x0AFFFFFF)
+
+
+def test_merged_intervals():
+    """
+    Overlapping and adjacent prefixes are merged into one interval.
+    """
+    index = BogonIndex.from_prefixes(LISTS[FULLBOGONS[0]] + ["10.1.0.0/16"])
+    assert index.starts[4] == [0x00000000, 0x0A000000, 0x64400000]
+    assert index.ends[4] == [0x00FFFFFF, 0x0BFFFFFF, 0x647FFFFF]
+
+
+def test_contains(tmp_path):
+    """
+    A resource is bogon when it is entirely within a bogon interval, also
+    once the index is saved and loaded back.
+    """
+    index = BogonIndex.from_prefixes(LISTS[FULLBOGONS[0]] + LISTS[FULLBOGONS[1]])
+    path = str(tmp_path / "bogons.json")
+    index.save(path)
+    for each in (index, BogonIndex.load(path)):
+        assert each.contains("10.20.30.40")
+        assert each.contains("10.0.0.0/7")
+        assert not each.contains("8.0.0.0/6")
+        assert not each.contains("12.0.0.1")
+        assert each.contains("2001:db8:1::/48")
+        assert not each.contains("2001:db9::1")
+        assert each.classify(["100.64.0.1", "1.1.1.1", "bogus"]) == [
+            ("100.64.0.1", True),
+            ("1.1.1.1", False),
+            ("bogus", None),
+        ]
+
+
+def test_index_follows_response_cache(bogons, tmp_path, monkeypatch):
+    """
+    The compiled index on disk is used with the response cache only, and
+    compiled again on refresh.
+    """
+    monkeypatch.setattr(teamcymru, "CACHE_DIR", str(tmp_path))
+    path = str(tmp_path / "bogons-fullbogons-ipv4-fullbogons-ipv6.json")
+    BogonIndex.from_prefixes(["0.0.0.0/0"]).save(path)
+    assert not bogons.tc_bogons_index().contains("8.8.8.8")
+    assert BogonIndex.load(path).contains("8.8.8.8")
+
+    bogons.memo.clear()
+    bogons.http.cache = ResponseCache(str(tmp_path / "cache"), 1 << 20)
+    assert bogons.tc_bogons_index().contains("8.8.8.8")
+
+    bogons.memo.clear()
+    bogons.http.cache_refresh = True
+    assert not bogons.tc_bogons_index().contains("8.8.8.8")
+    assert not BogonIndex.load(path).contains("8.8.8.8")
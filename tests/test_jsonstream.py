@@ -0,0 +1,133 @@
+"""
+Peering Buddy - streaming JSON decoder tests.
+"""
+
+import json
+
+import pytest
+
+from benchmarks.fixtures import SIZES, Fixtures
+from pbuddy.jsonstream import iter_json
+
+DOCUMENT = {
+    "data": {
+        "skipped": {"nested": [1, {"x": ']}{[\\"', "y": None}], "s": "}"},
+        "rrcs": [
+            {
+                "rrc": "RRC00",
+                "peers": [
+                    {"as_path": "3333 1299", "peer": "192.0.2.1", "n": -1.5e3},
+                    {"as_path": "3333", "peer": "été 🚀", "n": 0},
+                ],
+            },
+            {"rrc": "RRC01", "peers": []},
+            {"rrc": "RRC02", "peers": [{"as_path": "64500 64501", "n": 123}]},
+        ],
+        "prefixes": {"10.0.0.0/8": True, "192.0.2.0/24": False},
+        "total": 1234567890,
+    }
+}
+PATHS = (
+    ("data", "rrcs", "*", "peers", "*", "as_path"),
+    ("data", "rrcs", "*", "peers", "*", "n"),
+    ("data", "rrcs", "*", "rrc"),
+    ("data", "prefixes", "*"),
+    ("data", "total"),
+)
+
+
+def expected(value, paths, prefix=()):
+    """
+    Reference iter_json(), walking the fully decoded document.
+
+    Args:
+        value (object): The decoded document.
+        paths (tuple): Paths of the values to decode.
+        prefix (tuple): Concrete path of value.
+
+    Returns:
+        list: (concrete path, value) tuples, in document order.
+    """
+    if () in paths:
+        return [(prefix, value)]
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return []
+    result = []
+    for key, child in items:
+        children = tuple(path[1:] for path in paths if path[0] in ("*", key))
+        if children:
+            result.extend(expected(child, children, prefix + (key,)))
+    return result
+
+
+def chunked(text, size):
+    """
+    Split a document in bytes chunks.
+
+    Args:
+        text (str): The document.
+        size (int): Chunk size.
+
+    Returns:
+        list: The bytes chunks.
+    """
+    data = memoryview(text.encode())
+    return [bytes(data[start:][:size]) for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_matches_json_loads(size, indent):
+    """
+    Streamed values match the decoded document, whatever the chunk boundaries
+    (split multi-byte characters, escapes and numbers included).
+    """
+    text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+    result = list(iter_json(chunked(text, size), *PATHS))
+    assert result == expected(DOCUMENT, PATHS)
+    assert ((("data", "total"), 1234567890)) in result
+
+
+def test_leaf_objects():
+    """
+    Objects holding only requested leaves are projected on the paths.
+    """
+    text = json.dumps(DOCUMENT)
+    paths = (("data", "rrcs", "*", "peers", "*", "peer"),)
+    assert [value for _, value in iter_json(chunked(text, 5), *paths)] == [
+        "192.0.2.1",
+        "été 🚀",
+    ]
+
+
+def test_looking_glass_fixture():
+    """
+    A benchmark looking glass payload streams as it decodes.
+    """
+    payload = Fixtures(SIZES["small"]).looking_glass("10.0.0.0/24")
+    paths = (("data", "rrcs", "*", "peers", "*", "as_path"),)
+    result = list(iter_json(chunked(payload.decode(), 4096), *paths))
+    assert result == expected(json.loads(payload), paths)
+    assert len(result) == SIZES["small"]["peers"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"data": {"total": 1',
+        '{"data": {"skipped": [1, 2',
+        '{"data": {"skipped": "abc',
+        '{"data": {"total" 1}}',
+        '{"data": {"total": 1}} {}',
+    ],
+)
+def test_invalid_documents(text):
+    """
+    Truncated or malformed documents raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        list(iter_json(chunked(text, 3), ("data", "total")))
@@ -0,0 +1,56 @@
+"""
+Peering Buddy - single-flight memo tests.
+"""
+
+import pytest
+
+from pbuddy.memo import SingleFlight
+
+
+def test_shared_result():
+    """
+    A key is computed once, later callers getting the same result.
+    """
+    memo = SingleFlight()
+    calls = []
+    assert memo.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert memo.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert calls == [1]
+
+
+def test_failure_not_kept():
+    """
+    Failures are raised and computed again by the next caller.
+    """
+    memo = SingleFlight()
+    with pytest.raises(ValueError):
+        memo.do("key", int, "x")
+    assert memo.do("key", int, "1") == 1
+
+
+def test_failure_after_clear():
+    """
+    A failure in flight while the memo is cleared raises its own error.
+    """
+    memo = SingleFlight()
+
+    def failing():
+        memo.clear()
+        raise ValueError("provider failure")
+
+    with pytest.raises(ValueError, match="provider failure"):
+        memo.do("key", failing)
+    assert not memo.results
+
+
+def test_size():
+    """
+    At most size results are kept, the least recently used forgotten first.
+    """
+    memo = SingleFlight(size=2)
+    memo.do("first", str, 1)
+    memo.do("second", str, 2)
+    memo.do("first", str, 1)
+    memo.do("third", str, 3)
+    assert list(memo.results) == ["first", "third"]
+    assert memo.do("second", str, 4) == "4"
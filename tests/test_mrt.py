@@ -0,0 +1,237 @@
+"""
+Peering Buddy - MRT RIB dump looking glass tests.
+"""
+
+import bz2
+import gzip
+import ipaddress
+import struct
+
+import pytest
+
+from pbuddy.mrt import MrtRib, collector_name, key_prefix, prefix_key
+
+PEERS = [("192.0.2.1", 64600), ("2001:db8::1", 64601)]
+TIME = 1704067200
+
+
+def record(mrt_type, subtype, body):
+    """
+    Build an MRT record.
+
+    Args:
+        mrt_type (int): MRT type.
+        subtype (int): MRT subtype.
+        body (bytes): Record body.
+
+    Returns:
+        bytes: The record.
+    """
+    return struct.pack("!IHHI", TIME, mrt_type, subtype, len(body)) + body
+
+
+def peer_index_table():
+    """
+    Build the PEER_INDEX_TABLE record of PEERS.
+
+    Returns:
+        bytes: The record.
+    """
+    body = bytes(4) + struct.pack("!H", 4) + b"test" + struct.pack("!H", len(PEERS))
+    for address, asn in PEERS:
+        packed = ipaddress.ip_address(address).packed
+        body += bytes([(len(packed) == 16) | 2]) + bytes(4) + packed
+        body += struct.pack("!I", asn)
+    return record(13, 1, body)
+
+
+def attribute(code, value, flags=0x40):
+    """
+    Build a BGP path attribute.
+
+    Args:
+        code (int): Attribute type code.
+        value (bytes): Attribute value.
+        flags (int): Attribute flags (0x10 for an extended length).
+
+    Returns:
+        bytes: The attribute.
+    """
+    if flags & 0x10:
+        return bytes([flags, code]) + struct.pack("!H", len(value)) + value
+    return bytes([flags, code, len(value)]) + value
+
+
+def aspath(*segments):
+    """
+    Build an AS_PATH attribute.
+
+    Args:
+        *segments (tuple): (segment type, ASNs) tuples.
+
+    Returns:
+        bytes: The attribute.
+    """
+    value = b"".join(
+        bytes([kind, len(asns)]) + struct.pack(f"!{len(asns)}I", *asns)
+        for kind, asns in segments
+    )
+    return attribute(2, value, 0x50)
+
+
+def rib(pfx, entries, addpath=False):
+    """
+    Build a RIB_IPV4/IPV6_UNICAST (ADD-PATH) record.
+
+    Args:
+        pfx (str): The prefix.
+        entries (list): (peer index, attributes) tuples.
+        addpath (bool): Whether entries carry a path identifier.
+
+    Returns:
+        bytes: The record.
+    """
+    version, length, address = prefix_key(pfx)
+    body = struct.pack("!IB", 0, length) + address + struct.pack("!H", len(entries))
+    for peer, attributes in entries:
+        body += struct.pack("!HI", peer, TIME) + (bytes(4) if addpath else b"")
+        body += struct.pack("!H", len(attributes)) + attributes
+    subtype = (2 if version == 4 else 4) + (6 if addpath else 0)
+    return record(13, subtype, body)
+
+
+DUMP = b"".join(
+    [
+        record(16, 4, b"BGP4MP message, skipped"),
+        peer_index_table(),
+        rib(
+            "10.0.0.0/8",
+            [
+                (
+                    0,
+                    attribute(1, b"\x00")
+                    + aspath((2, [64600, 64510, 64500, 64500]))
+                    + attribute(3, ipaddress.ip_address("192.0.2.1").packed)
+                    + attribute(8, struct.pack("!4H", 64600, 100, 64600, 200))
+                    + attribute(32, struct.pack("!3I", 64600, 1, 2)),
+                ),
+                (1, attribute(1, b"\x02") + aspath((2, [64601, 64500]))),
+            ],
+        ),
+        rib("192.0.2.0/24", [(0, aspath((2, [64600]), (1, [64500, 64501])))]),
+        rib("198.51.100.0/23", [(0, aspath((2, [64600, 64502])))], addpath=True),
+        rib(
+            "2001:db8::/32",
+            [
+                (
+                    1,
+                    aspath((2, [64601, 64502, 64500]))
+                    + attribute(
+                        14,
+                        bytes([16]) + ipaddress.ip_address("2001:db8::1").packed,
+                        0x80,
+                    ),
+                )
+            ],
+        ),
+        rib("198.51.100.0/24", [(0, aspath((2, [64600, 64500])))], addpath=True),
+        # Truncated last record, ignored.
+        record(13, 2, b"\x00\x00")[:-1],
+    ]
+)
+
+
+@pytest.fixture(name="dump", params=["raw", "gzip", "bzip2"])
+def fixture_dump(request, tmp_path):
+    """
+    Write DUMP as a RIS rrc00 bview, uncompressed or compressed.
+
+    Args:
+        request (pytest.FixtureRequest): The compression parameter.
+        tmp_path (pathlib.Path): Temporary directory.
+
+    Returns:
+        str: Path to the dump.
+    """
+    compress = {"raw": bytes, "gzip": gzip.compress, "bzip2": bz2.compress}
+    path = tmp_path / "rrc00" / f"bview.20240101.0000.{request.param}"
+    path.parent.mkdir()
+    path.write_bytes(compress[request.param](DUMP))
+    return str(path)
+
+
+def test_prefix_keys():
+    """
+    Prefix keys keep the significant address bytes only, and format back.
+    """
+    assert prefix_key("10.1.2.3/8") == (4, 8, b"\x0a")
+    assert prefix_key("198.51.100.0/23") == (4, 23, b"\xc6\x33\x64")
+    for pfx in ("10.0.0.0/8", "0.0.0.0/0", "2001:db8::/33"):
+        assert key_prefix(prefix_key(pfx)) == pfx
+
+
+def test_collector_name():
+    """
+    Collectors are named after the dump path, else the view or file name.
+    """
+    assert collector_name("/data/rrc21/bview.gz", "") == "RRC21"
+    assert collector_name("/data/route-views.amsix/rib.bz2", "") == "route-views.amsix"
+    assert collector_name("/data/rib.bz2", "view") == "view"
+    assert collector_name("/data/rib.bz2", "") == "rib.bz2"
+
+
+def test_origin_prefixes(dump):
+    """
+    Origin prefixes are found on the AS path last hop, AS_SETs excluded.
+    """
+    rib_dump = MrtRib([dump])
+    assert rib_dump.origin_prefixes("AS64500") == [
+        "10.0.0.0/8",
+        "2001:db8::/32",
+        "198.51.100.0/24",
+    ]
+    assert rib_dump.origin_prefixes(64502) == ["198.51.100.0/23"]
+    assert rib_dump.origin_prefixes(64501) == []
+
+
+def test_looking_glass(dump):
+    """
+    Routes are answered as the RIPE RIS looking glass peers.
+    """
+    rib_dump = MrtRib([dump])
+    (rrc,) = rib_dump.looking_glass("10.0.0.0/8")
+    assert rrc["rrc"] == rrc["location"] == "RRC00"
+    first, second = rrc["peers"]
+    assert first == {
+        "asn_origin": "64500",
+        "as_path": "64600 64510 64500 64500",
+        "community": "64600:100 64600:200",
+        "largeCommunity": "64600:1:2",
+        "origin": "IGP",
+        "next_hop": "192.0.2.1",
+        "prefix": "10.0.0.0/8",
+        "peer": "192.0.2.1",
+        "last_updated": "2024-01-01T00:00:00",
+        "latest_time": "2024-01-01T00:00:00",
+    }
+    assert (second["peer"], second["origin"]) == ("2001:db8::1", "INCOMPLETE")
+    (rrc,) = rib_dump.looking_glass("192.0.2.0/24")
+    assert rrc["peers"][0]["as_path"] == "64600 {64500,64501}"
+    (rrc,) = rib_dump.looking_glass("2001:db8::/32")
+    assert rrc["peers"][0]["next_hop"] == "2001:db8::1"
+    (rrc,) = rib_dump.looking_glass("198.51.100.0/23")
+    assert rrc["peers"][0]["asn_origin"] == "64502"
+    assert rib_dump.looking_glass("203.0.113.0/24") == []
+
+
+def test_several_dumps(dump, tmp_path):
+    """
+    Each dump is a collector of the looking glass answers.
+    """
+    other = tmp_path / "route-views2" / "rib.20240101.0000"
+    other.parent.mkdir()
+    other.write_bytes(DUMP)
+    rib_dump = MrtRib([dump, str(other)])
+    assert rib_dump.origin_prefixes(64502) == ["198.51.100.0/23"]
+    collectors = [rrc["rrc"] for rrc in rib_dump.looking_glass("10.0.0.0/8")]
+    assert collectors == ["RRC00", "route-views2"]
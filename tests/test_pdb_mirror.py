@@ -0,0 +1,97 @@
+"""
+Peering Buddy - local PeeringDB mirror tests.
+"""
+
+import json
+
+import pytest
+
+from pbuddy.pdb_mirror import OBJECTS, PeeringDBMirror
+from pbuddy.providers import ProviderError
+
+DUMPS = {
+    "net": [
+        {"id": 1, "asn": 64500, "irr_as_set": "AS-ONE"},
+        {"id": 2, "asn": 64501, "irr_as_set": "AS-TWO"},
+    ],
+    "ix": [{"id": 10, "country": "NL"}, {"id": 11, "country": "DE"}],
+    "ixlan": [{"id": 20, "ix_id": 10}],
+    "ixpfx": [{"id": 30, "ixlan_id": 20, "prefix": "192.0.2.0/24"}],
+    "netixlan": [{"id": 40, "asn": 64500, "net_id": 1}],
+    "poc": [
+        {"id": 50, "net_id": 1, "role": "NOC"},
+        {"id": 51, "net_id": 2, "role": "Policy"},
+    ],
+}
+
+
+@pytest.fixture(name="mirror")
+def fixture_mirror(tmp_path):
+    """
+    Return a mirror synced from a dump directory.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory.
+
+    Returns:
+        PeeringDBMirror: The synced mirror.
+    """
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    for obj, rows in DUMPS.items():
+        (dumps / f"{obj}.json").write_text(json.dumps({"data": rows}))
+    mirror = PeeringDBMirror(str(tmp_path))
+    result = mirror.sync(None, str(dumps))
+    for obj, rows in DUMPS.items():
+        assert result[obj] == {"updated": len(rows), "deleted": 0}
+    return mirror
+
+
+def test_dump_sync_queries(mirror):
+    """
+    Synced objects are answered API style, on their indexed fields.
+    """
+    assert mirror.query("net", asn=64501) == [DUMPS["net"][1]]
+    assert mirror.query("ix", country="nl") == [DUMPS["ix"][0]]
+    assert mirror.query("poc", net_id__in=[1, 2, 3]) == DUMPS["poc"]
+    assert mirror.query("ixpfx") == DUMPS["ixpfx"]
+    assert mirror.as_set("64500") == [{"64500": "AS-ONE"}]
+    with pytest.raises(ValueError):
+        mirror.query("net", name="AS-ONE")
+
+
+def test_incremental_sync(mirror):
+    """
+    Following syncs ask for changes since the last one, and apply deletions.
+    """
+    calls = []
+
+    def fetch(obj, **filters):
+        calls.append((obj, filters))
+        if obj == "poc":
+            return [{"id": 50, "status": "deleted"}, {"id": 52, "net_id": 2}]
+        return []
+
+    result = mirror.sync(fetch)
+    assert [obj for obj, _ in calls] == list(OBJECTS)
+    assert all(set(filters) == {"since"} for _, filters in calls)
+    assert result["poc"] == {"updated": 1, "deleted": 1}
+    assert [poc["id"] for poc in mirror.query("poc")] == [51, 52]
+
+
+def test_unsynced_mirror(tmp_path):
+    """
+    A mirror never synced refuses to answer instead of answering nothing.
+    """
+    mirror = PeeringDBMirror(str(tmp_path))
+    with pytest.raises(ProviderError, match="--pdb-sync"):
+        mirror.query("netixlan", asn=64500)
+
+
+def test_api_errors(pbuddy):
+    """
+    PeeringDB API errors are raised, not exited on.
+    """
+    assert pbuddy.pdb_api("net", asn=64500)[0]["asn"] == 64500
+    with pytest.raises(ProviderError, match="HTTP status"):
+        pbuddy.pdb_api("poc", net_id__in=[1])
@@ -0,0 +1,200 @@
+"""
+Peering Buddy - rate limiter tests.
+"""
+
+import types
+from email.utils import formatdate
+
+import pytest
+
+import pbuddy.ratelimit
+from benchmarks.fixtures import StubTransport
+from pbuddy.cache import ResponseCache
+from pbuddy.http_client import HttpClient
+from pbuddy.ratelimit import RateLimiter, retry_after
+
+
+class Clock:
+    """
+    Fake clock, sleeping only moves the time forward.
+
+    Attributes:
+        now (float): Current time.
+        slept (list): Sleep durations.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Clock object.
+
+        Returns:
+            None
+        """
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def time(self):
+        """
+        Return the current time.
+
+        Returns:
+            float: The current time.
+        """
+        return self.now
+
+    def sleep(self, seconds):
+        """
+        Move the time forward.
+
+        Args:
+            seconds (float): Seconds to sleep.
+
+        Returns:
+            None
+        """
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class RateLimitedTransport(StubTransport):
+    """
+    Stub transport answering 429 (Retry-After) to the first requests.
+
+    Attributes:
+        limited (int): Requests still to answer with a 429.
+        retry (str): Retry-After header value.
+    """
+
+    def __init__(self, fixtures, limited, retry):
+        """
+        Initialize the RateLimitedTransport object.
+
+        Args:
+            fixtures (Fixtures): The payloads.
+            limited (int): Requests to answer with a 429.
+            retry (str): Retry-After header value.
+
+        Returns:
+            None
+        """
+        super().__init__(fixtures)
+        self.limited = limited
+        self.retry = retry
+
+    def send(self, request, *args, **kwargs):
+        """
+        Answer a prepared request, with a 429 while still limited.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            *args: StubTransport.send() arguments.
+            **kwargs: StubTransport.send() arguments.
+
+        Returns:
+            requests.Response: The response.
+        """
+        response = super().send(request, *args, **kwargs)
+        if self.limited > 0:
+            self.limited -= 1
+            response.status_code = 429
+            response.headers["Retry-After"] = self.retry
+        return response
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch):
+    """
+    Run the rate limiter on a fake clock.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Patching helper.
+
+    Returns:
+        Clock: The fake clock.
+    """
+    clock = Clock()
+    fake = types.SimpleNamespace(time=clock.time, sleep=clock.sleep)
+    monkeypatch.setattr(pbuddy.ratelimit, "time", fake)
+    return clock
+
+
+def test_retry_after():
+    """
+    Retry-After is read as seconds or HTTP date, else the default applies.
+    """
+    response = types.SimpleNamespace(headers={})
+    assert retry_after(response, 5) == 5
+    response.headers["Retry-After"] = "12"
+    assert retry_after(response, 5) == 12.0
+    response.headers["Retry-After"] = "soon"
+    assert retry_after(response, 5) == 5
+    response.headers["Retry-After"] = formatdate(0, usegmt=True)
+    assert retry_after(response, 5) == 0.0
+
+
+def test_token_bucket(tmp_path, clock):
+    """
+    A bucket serves its budget at once, then one token per refill period.
+    """
+    limiter = RateLimiter(str(tmp_path), {"bv": (2, 10)})
+    assert limiter.take("bv") == 0
+    assert limiter.take("bv") == 0
+    assert limiter.take("bv") == pytest.approx(5.0)
+    assert limiter.acquire("bv") == pytest.approx(5.0)
+    assert clock.slept == [pytest.approx(5.0)]
+
+
+def test_shared_budget(tmp_path, clock):
+    """
+    Limiters on the same state directory draw from the same budget.
+    """
+    first = RateLimiter(str(tmp_path), {"ii": (1, 4)})
+    second = RateLimiter(str(tmp_path), {"ii": (1, 4)})
+    assert first.acquire("ii") == 0
+    assert second.acquire("ii") == pytest.approx(4.0)
+    assert clock.slept == [pytest.approx(4.0)]
+
+
+def test_block_without_rate(tmp_path, clock):
+    """
+    A blocked bucket waits, even for a provider without rate.
+    """
+    limiter = RateLimiter(str(tmp_path), {"bv": (2, 1)})
+    assert limiter.acquire("tc") == 0
+    limiter.block("tc", 30)
+    assert limiter.acquire("tc") == pytest.approx(30.0)
+    assert limiter.acquire("tc") == 0
+    assert limiter.acquire("ntt") == 0
+    assert clock.slept == [pytest.approx(30.0)]
+
+
+def test_fetch_retries_after_429(stub, tmp_path, clock):
+    """
+    Rate limited requests are retried once the Retry-After block ended, for
+    providers without rate too.
+    """
+    transport = RateLimitedTransport(stub.fixtures, 2, "7")
+    client = HttpClient(state_dir=str(tmp_path), rates={})
+    client.adapter = transport
+    url = "https://www.team-cymru.org/Services/Bogons/fullbogons-ipv4.txt"
+    response = client.fetch(url, None, 1)
+    assert response.status_code == 404
+    assert transport.served == 3
+    assert clock.slept == [pytest.approx(7.0), pytest.approx(7.0)]
+
+
+def test_state_opened_on_first_use(tmp_path):
+    """
+    The response cache and the rate limiter create their state directory on
+    first use only.
+    """
+    state_dir = tmp_path / "state"
+    client = HttpClient(state_dir=str(state_dir), cache_size=1024, rates={})
+    assert not state_dir.exists()
+    limiter = client.limiter
+    assert isinstance(limiter, RateLimiter)
+    cache = client.cache
+    assert isinstance(cache, ResponseCache)
+    assert client.cache is cache and client.limiter is limiter
+    assert state_dir.exists()
+    assert HttpClient(state_dir=str(state_dir)).cache is None
@@ -0,0 +1,145 @@
+"""
+Peering Buddy - RIS Live route table tests.
+"""
+
+import json
+from collections import Counter
+
+import pytest
+
+from pbuddy.rislive import RouteTable, replay_messages
+
+SEED = [
+    {
+        "rrc": "rrc00",
+        "location": "Amsterdam, Netherlands",
+        "peers": [{"peer": "192.0.2.1", "as_path": "3333 64500"}],
+    }
+]
+
+
+def update(path, announced=(), withdrawn=()):
+    """
+    Build a RIS Live UPDATE message of the 192.0.2.2 peer of RRC00.
+
+    Args:
+        path (list): The AS path.
+        announced (tuple): The announced prefixes.
+        withdrawn (tuple): The withdrawn prefixes.
+
+    Returns:
+        dict: The message.
+    """
+    data = {"type": "UPDATE", "host": "rrc00.ripe.net", "peer": "192.0.2.2"}
+    data["path"] = path
+    data["announcements"] = [{"next_hop": "192.0.2.2", "prefixes": list(announced)}]
+    data["withdrawals"] = list(withdrawn)
+    return {"type": "ris_message", "data": data}
+
+
+MESSAGES = [
+    update([3356, 64500, 64500], announced=("192.0.2.0/24", "2001:db8::/32")),
+    {"type": "ris_message", "data": {"type": "RIS_PEER_STATE", "state": "up"}},
+    update([1299, [174, 6939], 64501], announced=("192.0.2.0/24",)),
+    update([], withdrawn=("192.0.2.0/24", "2001:db8::/32")),
+]
+
+# visibility, announced and aspath_lengths of 64500 and 64501, and the
+# looking glass of 192.0.2.0/24, after each message.
+EXPECTED = [
+    (
+        {"v4": 100.0, "v6": 100.0},
+        ["192.0.2.0/24", "2001:db8::/32"],
+        (3, 2, 2, 2.0),
+        {"v4": 0.0, "v6": 0.0},
+        [],
+        None,
+        ["3333 64500", "3356 64500 64500"],
+    ),
+    None,
+    (
+        {"v4": 50.0, "v6": 100.0},
+        ["192.0.2.0/24", "2001:db8::/32"],
+        (2, 2, 2, 2.0),
+        {"v4": 50.0, "v6": 0.0},
+        ["192.0.2.0/24"],
+        (1, 3, 3, 3.0),
+        ["3333 64500", "1299 {174,6939} 64501"],
+    ),
+    (
+        {"v4": 100.0},
+        ["192.0.2.0/24"],
+        (1, 2, 2, 2.0),
+        {"v4": 0.0},
+        [],
+        None,
+        ["3333 64500"],
+    ),
+]
+
+
+def origin_counters(table):
+    """
+    Return every per origin counter of the table aggregates.
+
+    Args:
+        table (RouteTable): The table.
+
+    Returns:
+        list: The counters.
+    """
+    result = list(table.origin_prefixes.values()) + list(table.lengths.values())
+    for families in table.origin_peers.values():
+        result += list(families.values())
+    return result
+
+
+@pytest.fixture(name="replay")
+def fixture_replay(tmp_path):
+    """
+    Return a replay file of MESSAGES.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory.
+
+    Returns:
+        str: The replay file path.
+    """
+    path = tmp_path / "ris-live.jsonl"
+    path.write_text("\n".join(map(json.dumps, MESSAGES)) + "\n\n")
+    return str(path)
+
+
+def test_replay(replay):
+    """
+    Announcements, replacing announcements and withdrawals keep the
+    aggregates in line with the routes, without zero counts left behind.
+    """
+    table = RouteTable()
+    table.seed("192.0.2.0/24", SEED)
+    assert table.visibility("64500") == {"v4": 100.0}
+    assert table.aspath_lengths("64500") == (1, 2, 2, 2.0)
+    for message, expected in zip(replay_messages(replay), EXPECTED):
+        applied = table.apply(message)
+        if expected is None:
+            assert applied == 0
+            continue
+        assert (
+            table.visibility("64500"),
+            table.announced("64500"),
+            table.aspath_lengths("64500"),
+            table.visibility("64501"),
+            table.announced("64501"),
+            table.aspath_lengths("64501"),
+            table.looking_glass("192.0.2.0/24")["Amsterdam, Netherlands"][
+                "192.0.2.0/24"
+            ],
+        ) == expected
+        assert all(origin_counters(table))
+        every = origin_counters(table) + list(table.peers.values())
+        assert all(count > 0 for each in every for count in each.values())
+    assert table.updates == 6
+    assert not table.looking_glass("2001:db8::/32")
+    assert set(table.routes) == {"192.0.2.0/24"}
+    assert set(table.origin_prefixes) == set(table.lengths) == {"64500"}
+    assert table.origin_peers == {"64500": {"v4": Counter({("RRC00", "192.0.2.1"): 1})}}
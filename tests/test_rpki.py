@@ -0,0 +1,88 @@
+"""
+Peering Buddy - offline RPKI origin validation tests.
+"""
+
+import json
+
+import pytest
+
+from pbuddy.rpki import VrpIndex, parse_asn, parse_prefix
+
+ROAS = [
+    {"asn": "AS64500", "prefix": "192.0.2.0/24", "maxLength": 24},
+    {"asn": "AS64500", "prefix": "198.51.100.0/22", "maxLength": 24},
+    {"asn": "AS0", "prefix": "203.0.113.0/24", "maxLength": 24},
+    {"asn": "AS64501", "prefix": "2001:db8::/32", "maxLength": 48},
+]
+
+
+@pytest.fixture(name="vrps", params=["json", "csv"])
+def fixture_vrps(request, tmp_path):
+    """
+    Return an index loaded from a JSON or a CSV VRP export of ROAS.
+
+    Args:
+        request (pytest.FixtureRequest): The export format parameter.
+        tmp_path (pathlib.Path): Temporary directory.
+
+    Returns:
+        VrpIndex: The loaded index.
+    """
+    path = tmp_path / f"vrps.{request.param}"
+    if request.param == "json":
+        path.write_text(json.dumps({"roas": ROAS}))
+    else:
+        rows = ["ASN,IP Prefix,Max Length,Trust Anchor"]
+        for roa in ROAS:
+            rows.append(",".join((roa["asn"], roa["prefix"], str(roa["maxLength"]))))
+        path.write_text("\n".join(rows))
+    return VrpIndex.load(str(path))
+
+
+def test_parsers():
+    """
+    ASNs and prefixes are parsed whatever their notation.
+    """
+    assert parse_asn("as64500") == parse_asn(64500) == 64500
+    assert parse_prefix("192.0.2.1/24") == (4, 0xC0000200, 24)
+    assert parse_prefix("2001:db8::/32") == (6, 0x20010DB8 << 96, 32)
+
+
+@pytest.mark.parametrize(
+    "asn, pfx, validity",
+    [
+        ("64500", "192.0.2.0/24", "valid"),
+        ("AS64500", "198.51.101.0/24", "valid"),
+        ("64500", "198.51.101.0/25", "invalid"),
+        ("64666", "192.0.2.0/24", "invalid"),
+        ("0", "203.0.113.0/24", "invalid"),
+        ("64500", "203.0.113.0/24", "invalid"),
+        ("64501", "2001:db8:1::/48", "valid"),
+        ("64501", "2001:db8:1:1::/64", "invalid"),
+        ("64500", "192.0.0.0/16", "unknown"),
+        ("64501", "2001:db9::/32", "unknown"),
+    ],
+)
+def test_validate(vrps, asn, pfx, validity):
+    """
+    Route origins are validated as RFC 6811 does.
+    """
+    assert vrps.validate(asn, pfx) == validity
+
+
+def test_validate_many(vrps):
+    """
+    Many routes are validated in order.
+    """
+    routes = [("64500", "192.0.2.0/24"), ("64500", "10.0.0.0/8")]
+    assert vrps.validate_many(routes) == ["valid", "unknown"]
+
+
+def test_default_max_length():
+    """
+    A VRP without maxLength only covers its own prefix length.
+    """
+    vrps = VrpIndex()
+    vrps.add(64500, "192.0.2.0/24")
+    assert vrps.validate(64500, "192.0.2.0/24") == "valid"
+    assert vrps.validate(64500, "192.0.2.128/25") == "invalid"
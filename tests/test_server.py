@@ -0,0 +1,118 @@
+"""
+Peering Buddy - HTTP/JSON API server tests.
+"""
+
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from benchmarks.fixtures import ASN
+from pbuddy.server import PARAMS, ApiServer
+
+
+@pytest.fixture(name="server")
+def fixture_server(pbuddy):
+    """
+    Return an API server over the stub served PBuddy, on a free local port.
+
+    Args:
+        pbuddy (PBuddy): PBuddy served by the stub transport.
+
+    Returns:
+        ApiServer: The server, not serving yet.
+    """
+    server = ApiServer(("127.0.0.1", 0), pbuddy)
+    yield server
+    server.server_close()
+
+
+def answer(server, path):
+    """
+    Answer a JSON API request.
+
+    Args:
+        server (ApiServer): The server.
+        path (str): The requested path and query string.
+
+    Returns:
+        tuple: (HTTP status, decoded answer).
+    """
+    status, content_type, body = server.answer(path)
+    assert content_type == "application/json"
+    return status, json.loads(body)
+
+
+def test_unknown_endpoint(server):
+    """
+    Unknown endpoints answer 404, / lists the known ones.
+    """
+    assert answer(server, "/nope?asn=64500") == (
+        404,
+        {"error": "unknown endpoint /nope"},
+    )
+    status, result = answer(server, "/")
+    assert status == 200
+    assert result["result"]["/pdb-asn-info"] == ["asn"]
+
+
+@pytest.mark.parametrize(
+    "path, error",
+    [
+        ("/pdb-asn-info", "missing parameter asn"),
+        ("/pdb-asn-info?asn=AS64500", PARAMS["asn"][1]),
+        ("/looking-glass?prefix=192.0.2", PARAMS["prefix"][1]),
+        ("/asn-pfxs-aspath-length?asn=64500&threshold=5", "missing parameter prepend"),
+        (
+            "/asn-pfxs-aspath-length?asn=64500&threshold=5&prepend=x",
+            PARAMS["prepend"][1],
+        ),
+    ],
+)
+def test_invalid_parameters(server, stub, path, error):
+    """
+    Missing or invalid parameters answer 400, without calling a provider.
+    """
+    assert answer(server, path) == (400, {"error": error})
+    assert stub.served == 0
+
+
+def test_provider_failure(server, stub, monkeypatch):
+    """
+    A failing provider answers 502 with its error, the server keeps
+    answering.
+    """
+    assert answer(server, f"/pdb-asn-info?asn={ASN}")[0] == 200
+    server.pbuddy.memo.clear()
+    monkeypatch.setattr(stub.fixtures, "payload", lambda url: None)
+    status, result = answer(server, f"/pdb-asn-info?asn={ASN}")
+    assert status == 502
+    assert "HTTP status != 200" in result["error"]
+    assert answer(server, "/nope")[0] == 404
+
+
+def test_metrics(server):
+    """
+    /metrics answers the run statistics as Prometheus text, over HTTP.
+    """
+    assert answer(server, f"/pdb-asn-info?asn={ASN}")[0] == 200
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            content_type = response.headers["Content-Type"]
+            lines = response.read().decode().splitlines()
+    finally:
+        server.shutdown()
+        thread.join()
+    assert content_type == "text/plain; version=0.0.4"
+    assert lines[:2] == [
+        "# HELP pbuddy_requests_total Provider requests per HTTP status.",
+        "# TYPE pbuddy_requests_total counter",
+    ]
+    assert (
+        'pbuddy_requests_total{provider="pdb",endpoint="/api/net",status="200"} 1'
+        in lines
+    )
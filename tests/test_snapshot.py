@@ -0,0 +1,32 @@
+"""
+Peering Buddy - snapshot archive tests.
+"""
+
+import pytest
+
+from pbuddy.http_client import HttpClient
+from pbuddy.providers import ProviderError
+from pbuddy.snapshot import Snapshot
+
+URL = "https://www.team-cymru.org/Services/Bogons/fullbogons-ipv4.txt"
+
+
+def test_replay(stub, tmp_path):
+    """
+    Recorded responses are replayed, the others raise a ProviderError.
+    """
+    path = str(tmp_path / "run.snapshot")
+    recording = HttpClient(snapshot=Snapshot(path))
+    recording.adapter = stub
+    recorded = recording.get(URL)
+    recording.close()
+    replaying = HttpClient(snapshot=Snapshot(path, replay=True))
+    response = replaying.get(URL)
+    assert (response.status_code, response.content) == (
+        recorded.status_code,
+        recorded.content,
+    )
+    assert stub.served == 1
+    with pytest.raises(ProviderError, match="not recorded on snapshot"):
+        replaying.get(URL.replace("ipv4", "ipv6"))
+    replaying.close()
@@ -0,0 +1,73 @@
+"""
+Peering Buddy - run statistics tests.
+"""
+
+import json
+import os
+
+import pytest
+
+from pbuddy.stats import Stats
+
+URL = "https://stat.ripe.net/data/routing-status/data.json?resource=AS64500"
+LABELS = 'provider="ripe",endpoint="/data/routing-status/data.json"'
+
+
+@pytest.fixture(name="stats")
+def fixture_stats():
+    """
+    Return statistics of known requests.
+
+    Returns:
+        Stats: Three requests (one on a bucket bound, one past the last
+            bucket), a retry and a cache hit.
+    """
+    stats = Stats(buckets=(0.1, 1), window=10)
+    stats.request(URL, 200, 0.05, 10)
+    stats.request(URL, 200, 0.1, 20)
+    stats.request(URL, 404, 5.0)
+    stats.retry(URL)
+    stats.cache_lookup("hit")
+    return stats
+
+
+def test_prometheus(stats):
+    """
+    Histogram buckets are cumulative, bounds included, +Inf counting every
+    request.
+    """
+    lines = stats.prometheus().splitlines()
+    expected = [
+        "# TYPE pbuddy_request_duration_seconds histogram",
+        f'pbuddy_request_duration_seconds_bucket{{{LABELS},le="0.1"}} 2',
+        f'pbuddy_request_duration_seconds_bucket{{{LABELS},le="1"}} 2',
+        f'pbuddy_request_duration_seconds_bucket{{{LABELS},le="+Inf"}} 3',
+        f"pbuddy_request_duration_seconds_sum{{{LABELS}}} 5.15",
+        f"pbuddy_request_duration_seconds_count{{{LABELS}}} 3",
+    ]
+    start = lines.index(expected[0])
+    end = start + len(expected)
+    assert lines[start:end] == expected
+    assert f'pbuddy_requests_total{{{LABELS},status="200"}} 2' in lines
+    assert f'pbuddy_requests_total{{{LABELS},status="404"}} 1' in lines
+    assert f"pbuddy_response_bytes_total{{{LABELS}}} 30" in lines
+    assert f"pbuddy_retries_total{{{LABELS}}} 1" in lines
+    assert 'pbuddy_cache_lookups_total{outcome="hit"} 1' in lines
+    assert 'pbuddy_cache_lookups_total{outcome="miss"} 0' in lines
+
+
+def test_dump(stats, tmp_path):
+    """
+    Dumps replace the file at once, in Prometheus or JSON format.
+    """
+    prom = tmp_path / "pbuddy.prom"
+    prom.write_text("stale")
+    stats.dump(str(prom))
+    content = prom.read_text()
+    assert content.startswith("# HELP pbuddy_requests_total")
+    assert f'pbuddy_request_duration_seconds_bucket{{{LABELS},le="+Inf"}} 3' in content
+    assert os.stat(prom).st_mode & 0o777 == 0o644
+    stats.dump(str(tmp_path / "pbuddy.json"))
+    summary = json.loads((tmp_path / "pbuddy.json").read_text())
+    assert summary["endpoints"][0]["latency"]["buckets"] == {"0.1": 2, "1": 2}
+    assert sorted(os.listdir(tmp_path)) == ["pbuddy.json", "pbuddy.prom"]
@@ -0,0 +1,87 @@
+"""
+Peering Buddy - upstreams on transient paths tests.
+"""
+
+import pytest
+
+from benchmarks.fixtures import ASN
+from pbuddy.aspath import TransientCounters
+from pbuddy.providers import ripe
+
+
+def test_spilled_paths_keep_the_output(pbuddy, monkeypatch):
+    """
+    Paths held past TRANSIENT_PENDING wait on a temporary file, without
+    changing what is yielded nor its order.
+    """
+    expected = list(pbuddy.ripe_bv_upstreams_transient_path(str(ASN)))
+    assert any(match for _, match in expected)
+    pbuddy.memo.clear()
+    monkeypatch.setattr(ripe, "TRANSIENT_PENDING", 1)
+    assert list(pbuddy.ripe_bv_upstreams_transient_path(str(ASN))) == expected
+
+
+def list_summary(pbuddy):
+    """
+    Summarize upstreams on transient paths with lists, as -tu used to, once
+    every prefix is checked.
+
+    Args:
+        pbuddy (PBuddy): PBuddy served by the stub transport.
+
+    Returns:
+        tuple: The ripe_bv_upstreams_transient_summary() tuple.
+    """
+    entries = []
+    direct = []
+    for result in pbuddy.ripe_bv_pfxs_aspath_length(str(ASN), 0, "n"):
+        entries.extend(result[0])
+        direct.extend(result[4])
+    upstreams = set(pbuddy.bv_asn_upstreams_asns(str(ASN))) & set(direct)
+    full_aspaths, all_locations, aspaths, locations = [], [], [], []
+    firsts = {}
+    for entry in entries:
+        aspath = entry[-1].split()
+        full_aspaths.extend(aspath)
+        all_locations.append(entry[0])
+        del aspath[-2:]
+        match = upstreams.intersection(aspath)
+        if match:
+            locations.append(entry[0])
+            firsts.setdefault(min(match))
+            aspaths.extend(aspath)
+    transient = {upstream: aspaths.count(upstream) for upstream in firsts}
+    locations = {location: locations.count(location) for location in locations}
+    return (
+        [
+            (upstream, count, full_aspaths.count(upstream))
+            for upstream, count in sorted(
+                transient.items(), reverse=True, key=lambda x: x[1]
+            )
+        ],
+        [
+            (location, count, all_locations.count(location))
+            for location, count in sorted(
+                locations.items(), reverse=True, key=lambda x: x[1]
+            )
+        ],
+    )
+
+
+@pytest.mark.parametrize("pending", [None, 0, 1, 2, "half", "all"])
+def test_summary_matches_lists(pbuddy, monkeypatch, pending):
+    """
+    The streamed -tu summary ranks upstreams and locations as the lists of
+    the whole run did, whether paths wait in memory or on the spill file.
+    """
+    expected = list_summary(pbuddy)
+    assert expected[0] and expected[1]
+    if pending is not None:
+        paths = len(list(pbuddy.ripe_bv_upstreams_transient_path(str(ASN))))
+        pending = {"half": paths // 2, "all": paths}.get(pending, pending)
+        monkeypatch.setattr(ripe, "TRANSIENT_PENDING", pending)
+    pbuddy.memo.clear()
+    counters = TransientCounters()
+    for entry, match in pbuddy.ripe_bv_upstreams_transient_path(str(ASN)):
+        counters.update(entry, match)
+    assert pbuddy.ripe_bv_upstreams_transient_summary(counters) == expected
@@ -0,0 +1,113 @@
+"""
+Peering Buddy - watch mode tests.
+"""
+
+import pytest
+
+from benchmarks.fixtures import ASN
+from pbuddy.watch import DATASETS, Watcher
+
+
+@pytest.fixture(name="watcher")
+def fixture_watcher(pbuddy):
+    """
+    Return a Watcher of every dataset of the fixtures ASN, always due.
+
+    Args:
+        pbuddy (PBuddy): PBuddy served by the stub transport.
+
+    Returns:
+        Watcher: The watcher, not polled yet.
+    """
+    return Watcher(pbuddy, [str(ASN)], list(DATASETS), dict.fromkeys(DATASETS, 0))
+
+
+def events(watcher):
+    """
+    Poll the due datasets.
+
+    Args:
+        watcher (Watcher): The watcher.
+
+    Returns:
+        list: The events, without their time.
+    """
+    return [
+        {key: value for key, value in event.items() if key != "time"}
+        for event in watcher.cycle()
+    ]
+
+
+def test_baseline(watcher):
+    """
+    The first poll of a dataset is only the baseline of the next ones.
+    """
+    assert not events(watcher)
+    assert sorted(watcher.state) == [
+        (str(ASN), dataset) for dataset in sorted(DATASETS)
+    ]
+    assert watcher.state[(str(ASN), "visibility")][1] == {"v4": 93.75, "v6": 93.75}
+
+
+def test_unchanged(watcher):
+    """
+    An unchanged dataset digest reports nothing.
+    """
+    events(watcher)
+    state = dict(watcher.state)
+    assert not events(watcher)
+    assert watcher.state == state
+    key = (str(ASN), "announced")
+    assert not watcher.changes(key, list(state[key][1]))
+
+
+def test_changed(watcher, stub, monkeypatch):
+    """
+    Changed datasets report the visibility delta, the prefixes gained and
+    lost, and the prefixes whose classification changed.
+    """
+    events(watcher)
+    before = watcher.state[(str(ASN), "consistency")][1]
+    payload = stub.fixtures.payload
+
+    def changed(url):
+        body = payload(url)
+        if "/routing-status/" in url:
+            visibility = {"ris_peers_seeing": 240, "total_ris_peers": 320}
+            body["data"]["visibility"]["v4"] = visibility
+        return body
+
+    monkeypatch.setattr(stub.fixtures, "payload", changed)
+    removed = stub.fixtures.prefixes[-1]
+    stub.fixtures.prefixes[-1] = "10.0.200.0/24"
+    assert events(watcher) == [
+        {
+            "asn": str(ASN),
+            "event": "visibility",
+            "afi": "v4",
+            "before": 93.75,
+            "after": 75.0,
+            "delta": -18.75,
+        },
+        {
+            "asn": str(ASN),
+            "event": "announced",
+            "added": ["10.0.200.0/24"],
+            "removed": [removed],
+        },
+        {
+            "asn": str(ASN),
+            "event": "consistency",
+            "prefix": "10.0.200.0/24",
+            "before": None,
+            "after": watcher.state[(str(ASN), "consistency")][1]["10.0.200.0/24"],
+        },
+        {
+            "asn": str(ASN),
+            "event": "consistency",
+            "prefix": removed,
+            "before": before[removed],
+            "after": None,
+        },
+    ]
+    assert not events(watcher)